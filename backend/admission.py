@@ -0,0 +1,206 @@
+import asyncio
+import json
+import os
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Optional
+
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+import metrics
+
+# Admission control: each route class runs at most LIMIT requests at once; up to QUEUE more wait
+# (served round-robin across clients, at most ADMISSION_CLIENT_QUEUE per client) and the rest are
+# rejected straight away with 503 + Retry-After. A limit of 0 disables the class.
+ADMISSION_UPLOAD_LIMIT = int(os.environ.get('ADMISSION_UPLOAD_LIMIT', 8))
+ADMISSION_UPLOAD_QUEUE = int(os.environ.get('ADMISSION_UPLOAD_QUEUE', 32))
+ADMISSION_ANALYSIS_LIMIT = int(os.environ.get('ADMISSION_ANALYSIS_LIMIT', 32))
+ADMISSION_ANALYSIS_QUEUE = int(os.environ.get('ADMISSION_ANALYSIS_QUEUE', 128))
+ADMISSION_READ_LIMIT = int(os.environ.get('ADMISSION_READ_LIMIT', 256))
+ADMISSION_READ_QUEUE = int(os.environ.get('ADMISSION_READ_QUEUE', 1024))
+ADMISSION_CLIENT_QUEUE = int(os.environ.get('ADMISSION_CLIENT_QUEUE', 4))
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 10))
+ADMISSION_RETRY_AFTER = int(os.environ.get('ADMISSION_RETRY_AFTER', 2))
+
+# (class, methods, path pattern); the first match wins and unmatched requests are not limited
+ROUTE_CLASSES = (
+    ("uploads", {"POST", "PUT"}, re.compile(r"/api/interviews/[^/]+/(responses(/bulk)?|uploads/[^/]+/(chunks/[^/]+|complete))")),
+    ("analysis", None, re.compile(r"/api/interviews/[^/]+/(analyze|analysis(/status)?)")),
+    ("reads", {"GET", "HEAD"}, re.compile(r"/api/.*")),
+)
+
+class Rejected(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+class FairLimiter:
+    """Concurrency limit with a bounded wait queue that takes turns between clients.
+
+    Waiters are grouped per client and a freed slot goes to the next client in
+    rotation, so one client retrying in a loop only ever delays its own requests.
+    Runs on the event loop; no locking needed.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, max_client_queue: int, timeout: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_client_queue = max_client_queue
+        self.timeout = timeout
+        self.running = 0
+        self.queued = 0
+        self.waiters = OrderedDict()  # client -> deque of futures
+        self.in_flight_gauge = metrics.ADMISSION_IN_FLIGHT.labels(name)
+        self.queue_gauge = metrics.ADMISSION_QUEUE_DEPTH.labels(name)
+
+    def _update_gauges(self):
+        self.in_flight_gauge.set(self.running)
+        self.queue_gauge.set(self.queued)
+
+    async def acquire(self, client: str):
+        if self.running < self.limit and not self.queued:
+            self.running += 1
+            self._update_gauges()
+            return
+
+        if self.queued >= self.max_queue:
+            raise Rejected("queue_full")
+        queue = self.waiters.setdefault(client, deque())
+        if len(queue) >= self.max_client_queue:
+            raise Rejected("client_queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        queue.append(future)
+        self.queued += 1
+        self._update_gauges()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(future, self.timeout)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                # The slot was handed over as we gave up (wait_for can time out on a completed future)
+                self.release()
+            else:
+                self._discard(client, future)
+            if isinstance(e, asyncio.TimeoutError):
+                raise Rejected("timeout")
+            raise
+        finally:
+            metrics.ADMISSION_WAIT.labels(self.name).observe(time.perf_counter() - started)
+
+    def _discard(self, client: str, future: asyncio.Future):
+        queue = self.waiters.get(client)
+        if queue is None or future not in queue:
+            return
+        queue.remove(future)
+        self.queued -= 1
+        if not queue:
+            del self.waiters[client]
+        self._update_gauges()
+
+    def release(self):
+        while self.waiters:
+            client, queue = next(iter(self.waiters.items()))
+            future = queue.popleft()
+            self.queued -= 1
+            # Rotate: this client goes to the back of the line
+            if queue:
+                self.waiters.move_to_end(client)
+            else:
+                del self.waiters[client]
+            if not future.done():
+                # The slot passes straight to the waiter
+                future.set_result(None)
+                self._update_gauges()
+                return
+        self.running -= 1
+        self._update_gauges()
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "running": self.running, "queued": self.queued, "clients_waiting": len(self.waiters)}
+
+def create_limiters() -> dict:
+    settings = {
+        "uploads": (ADMISSION_UPLOAD_LIMIT, ADMISSION_UPLOAD_QUEUE),
+        "analysis": (ADMISSION_ANALYSIS_LIMIT, ADMISSION_ANALYSIS_QUEUE),
+        "reads": (ADMISSION_READ_LIMIT, ADMISSION_READ_QUEUE)
+    }
+    return {
+        name: FairLimiter(name, limit, queue, ADMISSION_CLIENT_QUEUE, ADMISSION_QUEUE_TIMEOUT)
+        for name, (limit, queue) in settings.items()
+        if limit > 0
+    }
+
+limiters = create_limiters()
+
+def route_class(method: str, path: str) -> Optional[str]:
+    for name, methods, pattern in ROUTE_CLASSES:
+        if (methods is None or method in methods) and pattern.fullmatch(path):
+            return name
+    return None
+
+def client_key(scope: Scope, known_session: Callable[[str], bool]) -> str:
+    # A session token identifies a client before the request is authenticated, but only one
+    # this process has already seen: otherwise a fresh random token per request would make
+    # every request its own client and sidestep the per-client share
+    connection = HTTPConnection(scope)
+    token = connection.cookies.get('session_token')
+    if not token:
+        authorization = connection.headers.get('authorization', '')
+        token = authorization[7:] if authorization.lower().startswith('bearer ') else None
+    if token and known_session(token):
+        return f"session:{token}"
+    return f"ip:{connection.client.host if connection.client else 'unknown'}"
+
+def stats() -> dict:
+    return {name: limiter.stats() for name, limiter in limiters.items()}
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware applying the route-class limits before the body is read.
+
+    Rejected uploads are turned away without receiving the recording.
+    """
+
+    def __init__(self, app: ASGIApp, limiters: dict = limiters, known_session: Callable[[str], bool] = lambda token: False):
+        self.app = app
+        self.limiters = limiters
+        # Cheap, in-process check of a session token (no database round trip before admission)
+        self.known_session = known_session
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters.get(route_class(scope["method"], scope["path"]))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire(client_key(scope, self.known_session))
+        except Rejected as e:
+            metrics.ADMISSION_REJECTED.labels(limiter.name, e.reason).inc()
+            await self.reject(send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def reject(self, send: Send):
+        body = json.dumps({"detail": "Server is busy, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(ADMISSION_RETRY_AFTER).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,211 @@
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+# Audio is decoded to 16 kHz mono; frames are 40 ms long with a 10 ms hop
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 640
+HOP_LENGTH = 160
+FFT_SIZE = 1024  # >= FRAME_LENGTH + max lag, so the FFT autocorrelation does not wrap at lags we search
+
+# Frames are processed in fixed-size batches to keep peak memory flat on long answers
+FRAME_BATCH = int(os.environ.get('ANALYSIS_FRAME_BATCH', 1024))
+
+F0_MIN = 75.0
+F0_MAX = 400.0
+VOICING_THRESHOLD = 0.45
+OCTAVE_COST = 0.05  # per octave below F0_MAX; favours the true period over its multiples
+MAX_PERIOD_FACTOR = 1.3  # adjacent periods further apart than this are tracking errors, not jitter
+MIN_SPEECH_FRAMES = 50  # half a second of speech
+
+FFMPEG_BINARY = os.environ.get('FFMPEG_BINARY', 'ffmpeg')
+# Seconds before an ffmpeg run is killed; a malformed recording must not hold a worker forever
+FFMPEG_TIMEOUT = float(os.environ.get('FFMPEG_TIMEOUT', 600))
+
+class AudioDecodeError(Exception):
+    pass
+
+def decode_audio(path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode the audio track of a recording to mono float32 PCM in [-1, 1]."""
+    ffmpeg = shutil.which(FFMPEG_BINARY)
+    if not ffmpeg:
+        raise AudioDecodeError("ffmpeg is not installed")
+
+    if not Path(path).exists():
+        raise AudioDecodeError(f"Recording not found: {path}")
+
+    try:
+        proc = subprocess.run(
+            [
+                ffmpeg, '-nostdin', '-v', 'error',
+                '-i', str(path),
+                '-vn', '-ac', '1', '-ar', str(sample_rate),
+                '-f', 's16le', '-'
+            ],
+            capture_output=True,
+            timeout=FFMPEG_TIMEOUT
+        )
+    except subprocess.TimeoutExpired:
+        raise AudioDecodeError(f"ffmpeg timed out after {FFMPEG_TIMEOUT:g}s")
+    if proc.returncode != 0:
+        raise AudioDecodeError(proc.stderr.decode(errors='replace').strip() or "ffmpeg failed")
+
+    return np.frombuffer(proc.stdout, dtype='<i2').astype(np.float32) / 32768.0
+
+def window_autocorrelation(length: int) -> np.ndarray:
+    window = np.hanning(length + 2)[1:-1]
+    spectrum = np.fft.rfft(window, n=FFT_SIZE)
+    autocorr = np.fft.irfft(np.abs(spectrum) ** 2, n=FFT_SIZE)[:length]
+    return np.maximum(autocorr / autocorr[0], 1e-3)
+
+def frame_features(frames: np.ndarray, sample_rate: int = SAMPLE_RATE) -> dict:
+    """Per-frame RMS, peak amplitude, F0 and voicing strength for a (n_frames, FRAME_LENGTH) batch."""
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    peak = np.max(np.abs(frames), axis=1)
+
+    # Autocorrelation of every frame at once via the Wiener-Khinchin theorem
+    window = np.hanning(frames.shape[1] + 2)[1:-1].astype(np.float32)
+    windowed = (frames - frames.mean(axis=1, keepdims=True)) * window
+    spectrum = np.fft.rfft(windowed, n=FFT_SIZE, axis=1)
+    autocorr = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=FFT_SIZE, axis=1)[:, :frames.shape[1]]
+
+    # Dividing by the window's own autocorrelation removes the taper bias towards short lags
+    energy = autocorr[:, 0]
+    safe_energy = np.where(energy > 0, energy, 1.0)
+    normalized = autocorr / safe_energy[:, None] / window_autocorrelation(frames.shape[1])
+
+    min_lag = int(sample_rate / F0_MAX)
+    max_lag = min(int(sample_rate / F0_MIN), frames.shape[1] - 2)
+    search = normalized[:, min_lag:max_lag + 1]
+    octave_penalty = OCTAVE_COST * np.log2(np.arange(min_lag, max_lag + 1) / min_lag)
+    best = np.argmax(search - octave_penalty, axis=1)
+    strength = search[np.arange(len(best)), best]
+
+    # Parabolic interpolation around the peak for sub-sample period resolution
+    lag = best + min_lag
+    rows = np.arange(len(lag))
+    left = normalized[rows, lag - 1]
+    center = normalized[rows, lag]
+    right = normalized[rows, lag + 1]
+    denom = left - 2 * center + right
+    offset = np.where(np.abs(denom) > 1e-12, 0.5 * (left - right) / np.where(denom == 0, 1, denom), 0.0)
+    period = (lag + np.clip(offset, -0.5, 0.5)) / sample_rate
+
+    return {
+        "rms": rms,
+        "peak": peak,
+        "f0": 1.0 / period,
+        "voicing": np.where(energy > 0, strength, 0.0)
+    }
+
+def extract_features(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> dict:
+    """Compute utterance-level prosodic features from mono PCM."""
+    duration = len(samples) / sample_rate
+    if len(samples) < FRAME_LENGTH:
+        return {"duration_seconds": round(duration, 2), "speech_seconds": 0.0}
+
+    # Strided view over the signal; only one batch of frames is materialized at a time
+    all_frames = np.lib.stride_tricks.sliding_window_view(samples, FRAME_LENGTH)[::HOP_LENGTH]
+    batches = [
+        frame_features(np.ascontiguousarray(all_frames[start:start + FRAME_BATCH]), sample_rate)
+        for start in range(0, len(all_frames), FRAME_BATCH)
+    ]
+    per_frame = {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+
+    return summarize_frames(per_frame, duration, sample_rate)
+
+def summarize_frames(per_frame: dict, duration: float, sample_rate: int = SAMPLE_RATE) -> dict:
+    """Utterance-level features from chronologically ordered per-frame arrays."""
+    rms = per_frame["rms"]
+    threshold = max(np.percentile(rms, 20) * 2.0, np.percentile(rms, 95) * 0.1, 1e-4)
+    speech = rms > threshold
+    voiced = speech & (per_frame["voicing"] > VOICING_THRESHOLD)
+
+    features = {
+        "duration_seconds": round(duration, 2),
+        "speech_seconds": round(float(speech.sum()) * HOP_LENGTH / sample_rate, 2),
+        "pause_ratio": round(1.0 - float(speech.mean()), 4)
+    }
+    if speech.sum() < MIN_SPEECH_FRAMES:
+        return features
+
+    rms_db = 20 * np.log10(rms[speech] + 1e-10)
+    features["rms_db_mean"] = round(float(rms_db.mean()), 2)
+    features["rms_db_std"] = round(float(rms_db.std()), 2)
+
+    if voiced.sum() >= 2:
+        # Median/MAD so onset frames and octave slips do not dominate the pitch statistics
+        f0 = per_frame["f0"][voiced]
+        f0_median = float(np.median(f0))
+        f0_mad = 1.4826 * float(np.median(np.abs(f0 - f0_median)))
+        features["f0_median"] = round(f0_median, 2)
+        features["f0_mad"] = round(f0_mad, 2)
+        features["f0_cv"] = round(f0_mad / f0_median, 4)
+
+        # Jitter/shimmer over pairs of adjacent voiced frames
+        period = 1.0 / per_frame["f0"]
+        ratio = period[1:] / period[:-1]
+        pairs = voiced[1:] & voiced[:-1] & (ratio < MAX_PERIOD_FACTOR) & (ratio > 1 / MAX_PERIOD_FACTOR)
+        if pairs.any():
+            period_diff = np.abs(np.diff(period))[pairs]
+            peak_diff = np.abs(np.diff(per_frame["peak"]))[pairs]
+            features["jitter"] = round(float(period_diff.mean() / period[voiced].mean()), 4)
+            features["shimmer"] = round(float(peak_diff.mean() / per_frame["peak"][voiced].mean()), 4)
+
+    # Syllable nuclei approximated as local maxima of the smoothed voiced energy envelope
+    envelope = np.convolve(np.where(voiced, rms, 0.0), np.ones(5) / 5, mode='same')
+    is_peak = (envelope[1:-1] > envelope[:-2]) & (envelope[1:-1] >= envelope[2:]) & voiced[1:-1]
+    peaks = np.flatnonzero(is_peak) + 1
+    if len(peaks):
+        peaks = peaks[np.diff(peaks, prepend=-10) >= 10]  # at most one nucleus per 100 ms
+    features["syllables"] = int(len(peaks))
+    features["speech_rate"] = round(len(peaks) / max(features["speech_seconds"], 1e-6), 2)
+
+    return features
+
+def ramp(value: Optional[float], low: float, high: float) -> float:
+    """Map value linearly onto [0, 1] between low and high."""
+    if value is None:
+        return 0.5
+    return float(np.clip((value - low) / (high - low), 0.0, 1.0))
+
+def score_features(features: dict) -> dict:
+    """Heuristic mapping from prosodic features to 0-100 stress and confidence scores."""
+    if "rms_db_mean" not in features:
+        return {"stress_score": None, "confidence_score": None}
+
+    jitter = ramp(features.get("jitter"), 0.02, 0.08)
+    shimmer = ramp(features.get("shimmer"), 0.10, 0.35)
+    pitch_variability = ramp(features.get("f0_cv"), 0.10, 0.35)
+    pauses = ramp(features.get("pause_ratio"), 0.20, 0.60)
+    rushed = ramp(features.get("speech_rate"), 5.0, 7.0)
+    hesitant = 1.0 - ramp(features.get("speech_rate"), 2.0, 3.5)
+    loudness = ramp(features.get("rms_db_mean"), -40.0, -18.0)
+
+    stress = (
+        0.25 * jitter
+        + 0.20 * shimmer
+        + 0.20 * pitch_variability
+        + 0.15 * pauses
+        + 0.20 * rushed
+    )
+    confidence = (
+        0.30 * (1.0 - pauses)
+        + 0.25 * loudness
+        + 0.20 * (1.0 - max(rushed, hesitant))
+        + 0.25 * (1.0 - (jitter + shimmer) / 2)
+    )
+
+    return {
+        "stress_score": round(100 * stress, 1),
+        "confidence_score": round(100 * confidence, 1)
+    }
+
+def analyze_recording(path: str) -> dict:
+    """Decode a stored recording and return its features and scores."""
+    features = extract_features(decode_audio(path))
+    return {"features": features, **score_features(features)}
@@ -0,0 +1,409 @@
+"""Concurrent load benchmark for the API routes.
+
+    python benchmarks/load.py --concurrency 32 --requests 500 --output results.json
+    python benchmarks/load.py --output results.json --baseline baseline.json
+    python benchmarks/load.py --target http://127.0.0.1:8000 --scenarios interviews,upload
+
+Runs from the backend directory against the MongoDB in MONGO_URL. The benchmark
+database (--db) is dropped and seeded on every run with --users users, each with
+interviews, analyzed answers and recordings, using the same models the API writes.
+Requests go through the ASGI app in-process by default; with --target they go over
+HTTP to a server started with DB_NAME set to the benchmark database.
+
+Each scenario sends --requests requests from --concurrency concurrent clients, as
+random seeded users. Per route the run reports p50/p95/p99 latency and requests/s,
+optionally written to --output as JSON. With --baseline, a route whose p95 or
+throughput is more than --tolerance worse than in the stored run (or which fails
+more often) is reported as a regression and the exit status is 1.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import secrets
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+MB = 1024 * 1024
+INSERT_BATCH_SIZE = 1000
+
+class Recorder:
+    """Sends requests and keeps per-route latencies and error counts."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.elapsed = defaultdict(float)
+
+    async def request(self, route: str, method: str, url: str, user: dict, expect=(200,), **kwargs):
+        headers = {"Authorization": f"Bearer {user['token']}", **kwargs.pop('headers', {})}
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        self.latencies[route].append(time.perf_counter() - start)
+        if response is None or response.status_code not in expect:
+            self.errors[route] += 1
+        return response
+
+    def report(self) -> dict:
+        routes = {}
+        for route, latencies in self.latencies.items():
+            milliseconds = np.array(latencies) * 1000
+            p50, p95, p99 = np.percentile(milliseconds, [50, 95, 99])
+            routes[route] = {
+                "requests": len(latencies),
+                "errors": self.errors[route],
+                "rps": round(len(latencies) / self.elapsed[route], 1),
+                "p50_ms": round(float(p50), 2),
+                "p95_ms": round(float(p95), 2),
+                "p99_ms": round(float(p99), 2),
+                "mean_ms": round(float(milliseconds.mean()), 2),
+                "max_ms": round(float(milliseconds.max()), 2)
+            }
+        return routes
+
+# Scenarios: one user action each, possibly several requests
+async def me(recorder, user, rng, args):
+    await recorder.request("GET /auth/me", "GET", "/api/auth/me", user)
+
+async def categories(recorder, user, rng, args):
+    await recorder.request("GET /categories", "GET", "/api/categories", user)
+
+async def questions(recorder, user, rng, args):
+    category_id = rng.choice(["technical", "hr", "behavioral"])
+    await recorder.request("GET /questions/{category_id}", "GET", f"/api/questions/{category_id}", user)
+
+async def interviews(recorder, user, rng, args):
+    await recorder.request("GET /interviews", "GET", "/api/interviews", user, params={"limit": 50})
+
+async def interviews_summary(recorder, user, rng, args):
+    await recorder.request("GET /interviews?view=summary", "GET", "/api/interviews", user, params={"view": "summary", "limit": 100})
+
+async def interview(recorder, user, rng, args):
+    await recorder.request("GET /interviews/{id}", "GET", f"/api/interviews/{rng.choice(user['interviews'])}", user)
+
+async def bootstrap(recorder, user, rng, args):
+    await recorder.request("GET /interviews/{id}/bootstrap", "GET", f"/api/interviews/{rng.choice(user['interviews'])}/bootstrap", user)
+
+async def responses(recorder, user, rng, args):
+    await recorder.request("GET /interviews/{id}/responses", "GET", f"/api/interviews/{rng.choice(user['interviews'])}/responses", user)
+
+async def user_stats(recorder, user, rng, args):
+    await recorder.request("GET /stats/me", "GET", "/api/stats/me", user)
+
+async def analysis(recorder, user, rng, args):
+    await recorder.request("GET /interviews/{id}/analysis", "GET", f"/api/interviews/{rng.choice(user['interviews'])}/analysis", user)
+
+async def analysis_status(recorder, user, rng, args):
+    await recorder.request(
+        "GET /interviews/{id}/analysis/status", "GET", f"/api/interviews/{rng.choice(user['interviews'])}/analysis/status", user
+    )
+
+async def media(recorder, user, rng, args):
+    # A player's first request: the opening megabyte of the recording
+    await recorder.request(
+        "GET /responses/{id}/media (range)", "GET", f"/api/responses/{rng.choice(user['responses'])}/media", user,
+        expect=(206,), headers={"Range": f"bytes=0-{MB - 1}"}
+    )
+
+async def create_interview(recorder, user, rng, args):
+    response = await recorder.request("POST /interviews", "POST", "/api/interviews", user, json={"category_id": "technical"})
+    if response is not None and response.status_code == 200:
+        user['interviews'].append(response.json()['id'])
+
+def recording(rng, args) -> bytes:
+    # Distinct content per upload, so the blob store cannot dedupe it away
+    return rng.randbytes(16) + args.upload_payload[16:]
+
+async def upload(recorder, user, rng, args):
+    await recorder.request(
+        "POST /interviews/{id}/responses", "POST", f"/api/interviews/{rng.choice(user['interviews'])}/responses", user,
+        data={"question_id": "benchmark", "question_text": "Benchmark answer"},
+        files={"video": ("answer.webm", recording(rng, args), "video/webm")}
+    )
+
+async def bulk_upload(recorder, user, rng, args):
+    manifest = [{"question_id": f"benchmark-{i}", "question_text": "Benchmark answer", "video": f"video{i}"} for i in range(3)]
+    await recorder.request(
+        "POST /interviews/{id}/responses/bulk", "POST", f"/api/interviews/{rng.choice(user['interviews'])}/responses/bulk", user,
+        data={"manifest": json.dumps(manifest)},
+        files={f"video{i}": (f"answer{i}.webm", recording(rng, args), "video/webm") for i in range(3)}
+    )
+
+async def resumable_upload(recorder, user, rng, args):
+    interview_id = rng.choice(user['interviews'])
+    response = await recorder.request(
+        "POST /interviews/{id}/uploads", "POST", f"/api/interviews/{interview_id}/uploads", user,
+        json={"question_id": "benchmark", "question_text": "Benchmark answer", "kind": "video"}
+    )
+    if response is None or response.status_code != 200:
+        return
+
+    base = f"/api/interviews/{interview_id}/uploads/{response.json()['id']}"
+    data = recording(rng, args)
+    for index, offset in enumerate(range(0, len(data), MB)):
+        await recorder.request(
+            "PUT /interviews/{id}/uploads/{id}/chunks/{n}", "PUT", f"{base}/chunks/{index}", user,
+            content=data[offset:offset + MB]
+        )
+    await recorder.request("POST /interviews/{id}/uploads/{id}/complete", "POST", f"{base}/complete", user)
+
+async def analyze(recorder, user, rng, args):
+    # Only the enqueue is measured; the benchmark runs without analysis workers
+    await recorder.request(
+        "POST /interviews/{id}/analyze", "POST", f"/api/interviews/{rng.choice(user['interviews'])}/analyze", user,
+        expect=(202,), json={}
+    )
+
+async def healthz(recorder, user, rng, args):
+    await recorder.request("GET /healthz", "GET", "/healthz", user)
+
+async def readyz(recorder, user, rng, args):
+    await recorder.request("GET /readyz", "GET", "/readyz", user)
+
+# Read scenarios first, so writes do not change the data they read mid-run
+SCENARIOS = {
+    "me": me,
+    "categories": categories,
+    "questions": questions,
+    "interviews": interviews,
+    "interviews-summary": interviews_summary,
+    "interview": interview,
+    "bootstrap": bootstrap,
+    "responses": responses,
+    "stats": user_stats,
+    "analysis": analysis,
+    "analysis-status": analysis_status,
+    "media": media,
+    "healthz": healthz,
+    "readyz": readyz,
+    "create-interview": create_interview,
+    "upload": upload,
+    "bulk-upload": bulk_upload,
+    "resumable-upload": resumable_upload,
+    "analyze": analyze,
+}
+
+async def run_scenario(recorder: Recorder, scenario, users: list, rng: random.Random, args):
+    remaining = iter(range(args.requests))
+    before = set(recorder.latencies)
+
+    async def client():
+        for _ in remaining:
+            await scenario(recorder, rng.choice(users), rng, args)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    # Every route the scenario touched shares its wall time
+    for route in set(recorder.latencies) - before:
+        recorder.elapsed[route] += elapsed
+
+async def seed(server, blob_store, staging: Path, rng: random.Random, args) -> list:
+    """Reset the benchmark database and fill it with users, interviews, answers and recordings."""
+    import storage
+    from indexes import ensure_indexes
+    from seed import seed_catalog
+
+    db = server.db
+    await server.client.drop_database(args.db)
+    await ensure_indexes(db)
+    await seed_catalog(db)
+
+    # A few distinct recordings shared by every answer, as content-addressed storage would leave them
+    size = int(args.upload_mb * MB)
+    recordings = []
+    for i in range(args.recordings):
+        path = staging / f"benchmark-{i}.webm"
+        path.write_bytes(rng.randbytes(size))
+        sha256 = storage.hash_file(path)
+        recordings.append({"path": await storage.store_file(db, blob_store, path, sha256, size), "size": size, "sha256": sha256})
+
+    now = datetime.now(timezone.utc)
+    users, docs = [], defaultdict(list)
+    for i in range(args.users):
+        user = server.User(email=f"benchmark-{i}@example.com", name=f"Benchmark User {i}")
+        user_dict = user.model_dump()
+        user_dict['created_at'] = user_dict['created_at'].isoformat()
+        docs['users'].append(user_dict)
+
+        token = secrets.token_urlsafe(32)
+        docs['user_sessions'].append(server.UserSession(user_id=user.id, session_token=token, expires_at=now + timedelta(days=1)).model_dump())
+        seeded = {"token": token, "interviews": [], "responses": []}
+
+        for j in range(args.interviews):
+            started = now - timedelta(days=rng.uniform(0, 365))
+            stress, confidence = round(rng.uniform(10, 90), 1), round(rng.uniform(10, 90), 1)
+            interview = server.Interview(
+                user_id=user.id, category_id="technical", category_name="Technical Interview", status="completed",
+                started_at=started, completed_at=started + timedelta(minutes=20),
+                overall_stress_score=stress, overall_confidence_score=confidence
+            )
+            interview_dict = interview.model_dump()
+            interview_dict['started_at'] = interview_dict['started_at'].isoformat()
+            interview_dict['completed_at'] = interview_dict['completed_at'].isoformat()
+
+            scored = []
+            for k in range(args.responses):
+                response = server.new_response(interview.id, f"question-{k}", f"Benchmark question {k}", {"video": rng.choice(recordings)})
+                response.stress_score, response.confidence_score = round(rng.uniform(10, 90), 1), round(rng.uniform(10, 90), 1)
+                docs['interview_responses'].append(server.response_document(response))
+                seeded['responses'].append(response.id)
+                scored.append({"response_id": response.id, "stress": response.stress_score, "confidence": response.confidence_score})
+
+            analysis = server.AnalysisResult(
+                interview_id=interview.id, overall_stress=stress, overall_confidence=confidence,
+                detailed_metrics={"source": "server", "responses": scored}
+            ).model_dump()
+            analysis['created_at'] = analysis['created_at'].isoformat()
+            interview_dict['analysis'] = analysis
+            docs['interviews'].append(interview_dict)
+            seeded['interviews'].append(interview.id)
+        users.append(seeded)
+
+    for collection, documents in docs.items():
+        for offset in range(0, len(documents), INSERT_BATCH_SIZE):
+            await db[collection].insert_many(documents[offset:offset + INSERT_BATCH_SIZE], ordered=False)
+
+    for blob in recordings:
+        await db.blobs.update_one(
+            {"sha256": blob['sha256']},
+            {"$set": {"refcount": await db.interview_responses.count_documents({"video_sha256": blob['sha256']})}}
+        )
+
+    import stats
+    await stats.backfill_user_stats(db)
+    return users
+
+def compare(routes: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for route, current in routes.items():
+        previous = baseline.get('routes', {}).get(route)
+        if not previous:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{route}: p95 {current['p95_ms']} ms (baseline {previous['p95_ms']} ms)")
+        if current['rps'] < previous['rps'] * (1 - tolerance):
+            regressions.append(f"{route}: {current['rps']} req/s (baseline {previous['rps']} req/s)")
+        if current['errors'] / current['requests'] > previous['errors'] / previous['requests']:
+            regressions.append(f"{route}: {current['errors']}/{current['requests']} errors (baseline {previous['errors']}/{previous['requests']})")
+    return regressions
+
+def print_report(routes: dict):
+    print(f"{'route':<52} {'reqs':>6} {'err':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for route, result in routes.items():
+        print(
+            f"{route:<52} {result['requests']:>6} {result['errors']:>5} {result['rps']:>8} "
+            f"{result['p50_ms']:>8} {result['p95_ms']:>8} {result['p99_ms']:>8}"
+        )
+
+async def run(args) -> int:
+    # Configured before importing the app so it connects to the benchmark database
+    os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+    os.environ['DB_NAME'] = args.db
+    os.environ.setdefault('ANALYSIS_EMBEDDED_WORKERS', '0')
+    import server
+    import storage
+
+    rng = random.Random(args.seed)
+    args.upload_payload = rng.randbytes(int(args.upload_mb * MB))
+
+    with tempfile.TemporaryDirectory(prefix='benchmark-') as temp_dir:
+        if args.target:
+            # The server under test owns the blob store; seed it through the same configuration
+            blob_store, staging = server.blob_store, server.PARTIAL_UPLOAD_DIR
+            transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.concurrency))
+            base_url = args.target
+        else:
+            staging = Path(temp_dir) / 'partial'
+            staging.mkdir()
+            blob_store = storage.LocalBackend(Path(temp_dir) / 'blobs', staging)
+            server.UPLOAD_DIR, server.PARTIAL_UPLOAD_DIR, server.blob_store = Path(temp_dir), staging, blob_store
+            await server.startup_db()
+            transport = httpx.ASGITransport(app=server.app)
+            base_url = "http://benchmark"
+
+        print(f"Seeding {args.users} users x {args.interviews} interviews x {args.responses} answers into {args.db}...")
+        start = time.perf_counter()
+        users = await seed(server, blob_store, staging, rng, args)
+        print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+        selected = args.scenarios.split(',') if args.scenarios else list(SCENARIOS)
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as client:
+            recorder = Recorder(client)
+            for name in selected:
+                print(f"  {name}...", flush=True)
+                await run_scenario(recorder, SCENARIOS[name], users, rng, args)
+
+    routes = recorder.report()
+    print_report(routes)
+
+    results = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "target": args.target or "in-process",
+            "concurrency": args.concurrency,
+            "requests_per_scenario": args.requests,
+            "users": args.users,
+            "interviews_per_user": args.interviews,
+            "responses_per_interview": args.responses,
+            "upload_mb": args.upload_mb,
+            "seed": args.seed,
+            "python": platform.python_version()
+        },
+        "routes": routes
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        regressions = compare(routes, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} of {args.baseline}")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', help="Base URL of a running server (default: drive the app in-process)")
+    parser.add_argument('--db', default='stress_benchmark', help="Database to drop and seed")
+    parser.add_argument('--scenarios', help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=500, help="Requests per scenario")
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--interviews', type=int, default=3, help="Interviews per user")
+    parser.add_argument('--responses', type=int, default=5, help="Answers per interview")
+    parser.add_argument('--recordings', type=int, default=8, help="Distinct seeded recordings")
+    parser.add_argument('--upload-mb', type=float, default=4)
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="Write results as JSON")
+    parser.add_argument('--baseline', help="Compare against a previous --output file")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed p95/throughput regression (fraction)")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios.split(',')) - set(SCENARIOS) if args.scenarios else set()
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    sys.exit(asyncio.run(run(args)))
+
+if __name__ == "__main__":
+    main()
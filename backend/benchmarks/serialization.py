@@ -0,0 +1,84 @@
+"""Per-request CPU cost of the default and fast JSON response paths.
+
+    python benchmarks/serialization.py --items 1000 --repeat 200
+
+Runs from the backend directory. Both paths serialize the same list of raw
+interview documents: the default path is what FastAPI does for a route with
+response_model=List[Interview] (validate, jsonable_encoder, stdlib json); the
+fast path is server.json_response, used when FAST_JSON_RESPONSES=true.
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'benchmark')
+os.environ.setdefault('ANALYSIS_EMBEDDED_WORKERS', '0')
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+import server
+
+def make_interviews(count: int) -> List[dict]:
+    started = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": "benchmark-user",
+            "category_id": "technical",
+            "category_name": "Technical Interview",
+            "status": "completed",
+            "started_at": (started - timedelta(minutes=i)).isoformat(),
+            "completed_at": (started - timedelta(minutes=i) + timedelta(minutes=20)).isoformat(),
+            "overall_stress_score": 42.5,
+            "overall_confidence_score": 67.1
+        }
+        for i in range(count)
+    ]
+
+async def default_path(field, docs):
+    content = await serialize_response(field=field, response_content=docs)
+    return JSONResponse(content=content).body
+
+async def fast_path(field, docs):
+    return server.json_response(docs).body
+
+def cpu_per_call(path, field, docs, repeat: int) -> float:
+    import asyncio
+
+    async def run():
+        start = time.process_time()
+        for _ in range(repeat):
+            await path(field, docs)
+        return (time.process_time() - start) / repeat
+
+    return asyncio.run(run())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    docs = make_interviews(args.items)
+    field = create_response_field(name="response", type_=List[server.Interview])
+
+    default = cpu_per_call(default_path, field, docs, args.repeat)
+    fast = cpu_per_call(fast_path, field, docs, args.repeat)
+
+    encoder = "orjson" if server.orjson else "stdlib json (orjson not installed)"
+    print(f"{args.items} interviews per response, {args.repeat} iterations, fast encoder: {encoder}")
+    print(f"  default (validate + jsonable_encoder + json): {default * 1000:8.3f} ms CPU/request")
+    print(f"  fast    (trusted documents)                 : {fast * 1000:8.3f} ms CPU/request")
+    print(f"  saved: {(default - fast) * 1000:.3f} ms CPU/request ({default / fast:.1f}x)")
+
+if __name__ == "__main__":
+    main()
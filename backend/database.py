@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import os
+import threading
+from datetime import datetime, timezone, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+# Connection pool and driver options; unset values keep the driver defaults
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 100))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 10))
+MONGO_MAX_IDLE_TIME_MS = os.environ.get('MONGO_MAX_IDLE_TIME_MS')
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 10000))
+MONGO_SOCKET_TIMEOUT_MS = os.environ.get('MONGO_SOCKET_TIMEOUT_MS')
+MONGO_WAIT_QUEUE_TIMEOUT_MS = os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS')
+MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS')  # e.g. "zstd,snappy,zlib"
+MONGO_READ_PREFERENCE = os.environ.get('MONGO_READ_PREFERENCE')  # e.g. "primaryPreferred"
+
+# Readiness: connections opened before serving, and the pool use at which a pod stops taking traffic
+MONGO_WARMUP_CONNECTIONS = int(os.environ.get('MONGO_WARMUP_CONNECTIONS', MONGO_MIN_POOL_SIZE))
+READY_MAX_POOL_UTILIZATION = float(os.environ.get('READY_MAX_POOL_UTILIZATION', 0.9))
+READY_PING_TIMEOUT = float(os.environ.get('READY_PING_TIMEOUT', 2))
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Connection counts across the client's pools (one per server), from driver events.
+
+    Events arrive on driver threads, so counters are updated under a lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.checkout_failures = 0
+        self.pools_cleared = 0
+
+    def _add(self, **deltas):
+        with self.lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def connection_created(self, event):
+        self._add(open=1)
+
+    def connection_closed(self, event):
+        self._add(open=-1)
+
+    def connection_check_out_started(self, event):
+        self._add(waiting=1)
+
+    def connection_checked_out(self, event):
+        self._add(waiting=-1, checked_out=1)
+
+    def connection_check_out_failed(self, event):
+        self._add(waiting=-1, checkout_failures=1)
+
+    def connection_checked_in(self, event):
+        self._add(checked_out=-1)
+
+    def pool_cleared(self, event):
+        self._add(pools_cleared=1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "max_pool_size": MONGO_MAX_POOL_SIZE,
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "waiting": self.waiting,
+                "utilization": round(self.checked_out / MONGO_MAX_POOL_SIZE, 3),
+                "checkout_failures": self.checkout_failures,
+                "pools_cleared": self.pools_cleared
+            }
+
+pool_monitor = PoolMonitor()
+
+def client_options(listeners: list = ()) -> dict:
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "event_listeners": [pool_monitor, *listeners]
+    }
+    optional = {
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS and int(MONGO_MAX_IDLE_TIME_MS),
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS and int(MONGO_SOCKET_TIMEOUT_MS),
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS and int(MONGO_WAIT_QUEUE_TIMEOUT_MS),
+        "compressors": MONGO_COMPRESSORS,
+        "readPreference": MONGO_READ_PREFERENCE
+    }
+    options.update({name: value for name, value in optional.items() if value})
+    return options
+
+def create_client(mongo_url: str, listeners: list = ()) -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(mongo_url, **client_options(listeners))
+
+async def warm_up(db, connections: int = MONGO_WARMUP_CONNECTIONS):
+    """Open connections before serving so the first requests do not pay for TCP/TLS/auth handshakes.
+
+    Concurrent pings each need their own connection, so the pool grows to about `connections`.
+    """
+    await asyncio.gather(*(db.command('ping') for _ in range(max(connections, 1))))
+    logger.info(f"MongoDB connection pool warmed up ({pool_monitor.stats()['open']} connections open)")
+
+async def check_ready(db) -> tuple:
+    """(ready, reason) for the readiness probe: the database answers and the pool is not saturated."""
+    try:
+        await asyncio.wait_for(db.command('ping'), READY_PING_TIMEOUT)
+    except Exception as e:
+        return False, f"database unreachable: {type(e).__name__}"
+
+    stats = pool_monitor.stats()
+    if stats["utilization"] >= READY_MAX_POOL_UTILIZATION:
+        return False, "connection pool saturated"
+    return True, "ready"
+
+async def acquire_lock(db, name: str, owner: str, ttl: timedelta) -> bool:
+    """Take a named lease in the `locks` collection; expired leases can be taken over."""
+    now = datetime.now(timezone.utc)
+    try:
+        await db.locks.update_one(
+            {"_id": name, "$or": [{"expires_at": {"$lt": now}}, {"owner": owner}]},
+            {"$set": {"owner": owner, "expires_at": now + ttl}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        # Held by someone else: the upsert collided with their document
+        return False
+
+async def release_lock(db, name: str, owner: str):
+    await db.locks.delete_one({"_id": name, "owner": owner})
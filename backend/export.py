@@ -0,0 +1,144 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+
+# Exports stream interviews joined with their responses and analysis straight from a cursor,
+# so memory stays flat whatever the export size. Output is flushed in EXPORT_CHUNK_BYTES pieces.
+EXPORT_BATCH_SIZE = 200
+EXPORT_CHUNK_BYTES = 64 * 1024
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# One CSV row per response; interviews without responses get a single row
+CSV_COLUMNS = [
+    "interview_id", "user_id", "category_id", "category_name", "status", "started_at", "completed_at",
+    "overall_stress_score", "overall_confidence_score", "analysis_source", "analyzed_at",
+    "response_id", "question_id", "question_text", "stress_score", "confidence_score", "response_created_at"
+]
+
+# Where recordings live in the blob store is not part of an export
+INTERNAL_RESPONSE_FIELDS = (
+    "video_path", "audio_path", "video_size", "video_sha256", "audio_size", "audio_sha256",
+    "originals", "archived_originals", "originals_expire_at", "tiered_at"
+)
+
+# Spreadsheets evaluate cells starting with these as formulas (OWASP CSV injection)
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def export_pipeline(match: dict) -> list:
+    return [
+        {"$match": match},
+        {"$sort": {"started_at": 1}},
+        {"$lookup": {"from": "interview_responses", "localField": "id", "foreignField": "interview_id", "as": "responses"}},
+        # Analyses stored before results were embedded in the interview
+        {"$lookup": {"from": "analysis_results", "localField": "id", "foreignField": "interview_id", "as": "legacy_analysis"}},
+        {"$set": {"analysis": {"$ifNull": ["$analysis", {"$arrayElemAt": ["$legacy_analysis", 0]}]}}},
+        {"$project": {
+            "_id": 0, "legacy_analysis": 0, "rollup_baseline": 0, "analysis._id": 0, "responses._id": 0,
+            **{f"responses.{field}": 0 for field in INTERNAL_RESPONSE_FIELDS}
+        }}
+    ]
+
+def export_cursor(db, match: dict):
+    return db.interviews.aggregate(export_pipeline(match), batchSize=EXPORT_BATCH_SIZE)
+
+def as_utc(value: datetime) -> datetime:
+    # Naive datetimes are taken as UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def date_range(start: Optional[datetime], end: Optional[datetime]) -> dict:
+    """Filter on started_at in [start, end); interviews store it as an ISO string in UTC."""
+    bounds = {}
+    if start:
+        bounds["$gte"] = as_utc(start).isoformat()
+    if end:
+        bounds["$lt"] = as_utc(end).isoformat()
+    return {"started_at": bounds} if bounds else {}
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def ndjson_line(interview: dict) -> str:
+    # Never analyzed: the $ifNull above leaves the field out
+    interview.setdefault('analysis', None)
+    interview['responses'].sort(key=lambda response: str(response.get('created_at')))
+    return json.dumps(interview, default=json_default, separators=(',', ':')) + "\n"
+
+def csv_cell(value):
+    # Quoting as text keeps user-supplied strings such as question_text inert
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def csv_rows(interview: dict):
+    analysis = interview.get('analysis') or {}
+    base = {
+        "interview_id": interview.get('id'),
+        "user_id": interview.get('user_id'),
+        "category_id": interview.get('category_id'),
+        "category_name": interview.get('category_name'),
+        "status": interview.get('status'),
+        "started_at": interview.get('started_at'),
+        "completed_at": interview.get('completed_at'),
+        "overall_stress_score": interview.get('overall_stress_score'),
+        "overall_confidence_score": interview.get('overall_confidence_score'),
+        "analysis_source": (analysis.get('detailed_metrics') or {}).get('source'),
+        "analyzed_at": analysis.get('created_at')
+    }
+    responses = sorted(interview['responses'], key=lambda response: str(response.get('created_at')))
+    for response in responses or [{}]:
+        row = {
+            **base,
+            "response_id": response.get('id'),
+            "question_id": response.get('question_id'),
+            "question_text": response.get('question_text'),
+            "stress_score": response.get('stress_score'),
+            "confidence_score": response.get('confidence_score'),
+            "response_created_at": response.get('created_at')
+        }
+        yield {column: csv_cell(value) for column, value in row.items()}
+
+async def encode(cursor, format: str) -> AsyncIterator[str]:
+    if format == "ndjson":
+        async for interview in cursor:
+            yield ndjson_line(interview)
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    async for interview in cursor:
+        writer.writerows(csv_rows(interview))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+async def stream_export(cursor, format: str, compress: bool = False) -> AsyncIterator[bytes]:
+    """Encode the cursor as `format`, optionally gzipped, in chunks of about EXPORT_CHUNK_BYTES."""
+    # wbits 31: gzip container rather than a bare zlib stream
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    pending = []
+    size = 0
+    try:
+        async for text in encode(cursor, format):
+            data = text.encode()
+            if compressor:
+                data = compressor.compress(data)
+            if data:
+                pending.append(data)
+                size += len(data)
+            if size >= EXPORT_CHUNK_BYTES:
+                yield b"".join(pending)
+                pending, size = [], 0
+        if compressor:
+            pending.append(compressor.flush())
+        if pending:
+            yield b"".join(pending)
+    finally:
+        # Also reached when the client disconnects mid-export
+        await cursor.close()
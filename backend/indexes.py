@@ -0,0 +1,127 @@
+import logging
+from datetime import datetime, timezone
+
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+from pymongo.errors import OperationFailure
+
+from jobs import ACTIVE_STATUSES
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_BATCH_SIZE = 1000
+
+# Every query the API issues by filter or sort should be covered here
+INDEXES = {
+    "users": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "user_sessions": [
+        IndexModel([("session_token", ASCENDING)], unique=True),
+        IndexModel([("user_id", ASCENDING)]),
+        # Mongo removes sessions on its own once expires_at has passed
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "interview_categories": [
+        IndexModel([("id", ASCENDING)], unique=True),
+    ],
+    "questions": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("category_id", ASCENDING)]),
+    ],
+    "interviews": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("user_id", ASCENDING), ("started_at", DESCENDING), ("id", DESCENDING)]),
+        # Date-range exports across all users
+        IndexModel([("started_at", ASCENDING)]),
+    ],
+    "interview_responses": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("interview_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)]),
+        # Sparse: only tiered responses still holding their originals have it
+        IndexModel([("originals_expire_at", ASCENDING)], sparse=True),
+    ],
+    "analysis_results": [
+        IndexModel([("interview_id", ASCENDING)]),
+    ],
+    "analysis_jobs": [
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("interview_id", ASCENDING), ("created_at", DESCENDING)]),
+        IndexModel([("status", ASCENDING), ("run_after", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)]),
+        # At most one active job per interview and type, so concurrent enqueues cannot both insert
+        # (needs MongoDB 6.0+, see MIN_SERVER_VERSION)
+        IndexModel(
+            [("interview_id", ASCENDING), ("type", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"status": {"$in": ACTIVE_STATUSES}},
+            name="interview_id_1_type_1_active"
+        ),
+    ],
+    "user_stats": [
+        # Also required by the $merge in stats.backfill_user_stats
+        IndexModel([("user_id", ASCENDING)], unique=True),
+    ],
+    "upload_sessions": [
+        IndexModel([("id", ASCENDING)], unique=True),
+    ],
+    "blobs": [
+        IndexModel([("sha256", ASCENDING)], unique=True),
+        IndexModel([("refcount", ASCENDING), ("released_at", ASCENDING)]),
+    ],
+}
+
+# Indexes older servers cannot build, by name: $in in a partial filter arrived in MongoDB 6.0.
+# Without the active-job index, two enqueues racing for the same interview can both insert.
+MIN_SERVER_VERSION = {
+    "interview_id_1_type_1_active": (6, 0),
+}
+
+async def ensure_indexes(db):
+    """Create any missing indexes. Existing indexes are left untouched, so this is safe on every boot."""
+    build = await db.command("buildInfo")
+    version = tuple(build.get("versionArray", [0, 0])[:2])
+    for collection, indexes in INDEXES.items():
+        for index in indexes:
+            required = MIN_SERVER_VERSION.get(index.document['name'])
+            if required and version < required:
+                logger.warning(
+                    f"MongoDB {build.get('version')} cannot build index {index.document['name']} on {collection} "
+                    f"(needs {'.'.join(map(str, required))}+); concurrent analysis enqueues may duplicate jobs"
+                )
+                continue
+            try:
+                await db[collection].create_indexes([index])
+            except OperationFailure as e:
+                # e.g. duplicate data blocking a unique index; keep serving and surface it in the logs
+                logger.warning(f"Could not create index {index.document['key']} on {collection}: {e}")
+
+async def migrate_session_timestamps(db):
+    """Convert ISO-string session timestamps to native BSON datetimes so the TTL index applies."""
+    fields = ("expires_at", "created_at")
+    cursor = db.user_sessions.find(
+        {"$or": [{field: {"$type": "string"}} for field in fields]},
+        {field: 1 for field in fields}
+    )
+
+    batch = []
+    migrated = 0
+    async for session in cursor:
+        update = {
+            field: datetime.fromisoformat(session[field]).astimezone(timezone.utc)
+            for field in fields
+            if isinstance(session.get(field), str)
+        }
+        batch.append(UpdateOne({"_id": session["_id"]}, {"$set": update}))
+
+        if len(batch) >= MIGRATION_BATCH_SIZE:
+            await db.user_sessions.bulk_write(batch, ordered=False)
+            migrated += len(batch)
+            batch = []
+
+    if batch:
+        await db.user_sessions.bulk_write(batch, ordered=False)
+        migrated += len(batch)
+
+    if migrated:
+        logger.info(f"Migrated {migrated} session timestamps to native datetimes")
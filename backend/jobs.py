@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Awaitable, Callable, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+# Job tuning
+JOB_LEASE_SECONDS = int(os.environ.get('ANALYSIS_LEASE_SECONDS', 300))
+JOB_MAX_ATTEMPTS = int(os.environ.get('ANALYSIS_MAX_ATTEMPTS', 5))
+JOB_RETRY_BASE_SECONDS = float(os.environ.get('ANALYSIS_RETRY_BASE_SECONDS', 10))
+JOB_RETRY_MAX_SECONDS = float(os.environ.get('ANALYSIS_RETRY_MAX_SECONDS', 600))
+JOB_POLL_SECONDS = float(os.environ.get('ANALYSIS_POLL_SECONDS', 1))
+
+# Concurrency: jobs run at once inside one worker process, and across all workers (0 = unlimited)
+WORKER_CONCURRENCY = int(os.environ.get('ANALYSIS_WORKER_CONCURRENCY', 2))
+GLOBAL_CONCURRENCY = int(os.environ.get('ANALYSIS_GLOBAL_CONCURRENCY', 0))
+
+ACTIVE_STATUSES = ["queued", "running"]
+
+# Job types sharing the queue; handlers are dispatched on `type`
+ANALYSIS_JOB = "analysis"
+TIERING_JOB = "tiering"
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+JobHandler = Callable[[dict, ProgressCallback], Awaitable[None]]
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def public_job(job: dict) -> dict:
+    """Fields of a job document that are safe to return to the interview owner."""
+    return {
+        key: job.get(key)
+        for key in ("id", "type", "interview_id", "status", "attempts", "progress", "last_error",
+                    "created_at", "updated_at", "completed_at")
+    }
+
+def job_type_filter(job_type: str):
+    # Jobs queued before job types existed are analysis jobs
+    return {"$in": [job_type, None]} if job_type == ANALYSIS_JOB else job_type
+
+async def enqueue_analysis_job(db, interview_id: str, user_id: str, payload: dict, job_type: str = ANALYSIS_JOB) -> dict:
+    """Queue a job, reusing the interview's active job of the same type if there already is one."""
+    now = utcnow()
+    try:
+        return await upsert_active_job(db, interview_id, user_id, payload, job_type, now)
+    except DuplicateKeyError:
+        # Two enqueues raced to insert; the unique active-job index kept the first, so reuse it
+        return await upsert_active_job(db, interview_id, user_id, payload, job_type, now)
+
+async def upsert_active_job(db, interview_id: str, user_id: str, payload: dict, job_type: str, now: datetime) -> dict:
+    return await db.analysis_jobs.find_one_and_update(
+        {"interview_id": interview_id, "type": job_type_filter(job_type), "status": {"$in": ACTIVE_STATUSES}},
+        {
+            "$setOnInsert": {
+                "id": str(uuid.uuid4()),
+                "type": job_type,
+                "user_id": user_id,
+                "status": "queued",
+                "attempts": 0,
+                "progress": {"done": 0, "total": 0},
+                "payload": payload,
+                "run_after": now,
+                "lease_expires_at": None,
+                "worker_id": None,
+                "last_error": None,
+                "created_at": now,
+                "completed_at": None
+            },
+            "$set": {"updated_at": now}
+        },
+        projection={"_id": 0},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+
+async def get_latest_job(db, interview_id: str, job_type: str = ANALYSIS_JOB) -> Optional[dict]:
+    return await db.analysis_jobs.find_one(
+        {"interview_id": interview_id, "type": job_type_filter(job_type)},
+        {"_id": 0},
+        sort=[("created_at", -1)]
+    )
+
+async def claim_job(db, worker_id: str) -> Optional[dict]:
+    """Atomically lease the next runnable job, including ones whose previous lease expired."""
+    now = utcnow()
+
+    if GLOBAL_CONCURRENCY > 0:
+        # Soft cap: two workers can race past this check, but never by more than their own concurrency
+        running = await db.analysis_jobs.count_documents({"status": "running", "lease_expires_at": {"$gt": now}})
+        if running >= GLOBAL_CONCURRENCY:
+            return None
+
+    return await db.analysis_jobs.find_one_and_update(
+        {
+            "$or": [
+                {"status": "queued", "run_after": {"$lte": now}},
+                {"status": "running", "lease_expires_at": {"$lte": now}}
+            ]
+        },
+        {
+            "$set": {
+                "status": "running",
+                "worker_id": worker_id,
+                "lease_expires_at": now + timedelta(seconds=JOB_LEASE_SECONDS),
+                "updated_at": now
+            },
+            "$inc": {"attempts": 1}
+        },
+        projection={"_id": 0},
+        sort=[("run_after", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+def retry_delay(attempts: int) -> float:
+    return min(JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), JOB_RETRY_MAX_SECONDS)
+
+async def finish_job(db, job: dict, worker_id: str, error: Optional[BaseException] = None):
+    now = utcnow()
+    owned = {"id": job["id"], "worker_id": worker_id, "status": "running"}
+
+    if error is None:
+        update = {"status": "completed", "completed_at": now, "lease_expires_at": None, "last_error": None}
+    elif job["attempts"] >= JOB_MAX_ATTEMPTS:
+        update = {"status": "failed", "completed_at": now, "lease_expires_at": None, "last_error": str(error)}
+    else:
+        update = {
+            "status": "queued",
+            "run_after": now + timedelta(seconds=retry_delay(job["attempts"])),
+            "lease_expires_at": None,
+            "last_error": str(error)
+        }
+
+    update["updated_at"] = now
+    await db.analysis_jobs.update_one(owned, {"$set": update})
+
+async def run_job(db, job: dict, handler: JobHandler, worker_id: str):
+    if job["attempts"] > JOB_MAX_ATTEMPTS:
+        # Lease expired on the last allowed attempt, e.g. the worker was killed mid-job
+        await finish_job(db, {**job, "attempts": JOB_MAX_ATTEMPTS}, worker_id, RuntimeError("Lease expired"))
+        return
+
+    async def report_progress(done: int, total: int):
+        await db.analysis_jobs.update_one(
+            {"id": job["id"], "worker_id": worker_id},
+            {"$set": {"progress": {"done": done, "total": total}, "updated_at": utcnow()}}
+        )
+
+    async def keep_lease():
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            await db.analysis_jobs.update_one(
+                {"id": job["id"], "worker_id": worker_id, "status": "running"},
+                {"$set": {"lease_expires_at": utcnow() + timedelta(seconds=JOB_LEASE_SECONDS)}}
+            )
+
+    heartbeat = asyncio.create_task(keep_lease())
+    try:
+        await handler(job, report_progress)
+    except Exception as e:
+        logger.exception(f"{job.get('type', ANALYSIS_JOB).capitalize()} job {job['id']} failed on attempt {job['attempts']}")
+        await finish_job(db, job, worker_id, e)
+    else:
+        await finish_job(db, job, worker_id)
+    finally:
+        heartbeat.cancel()
+
+async def run_worker(db, handler: JobHandler, concurrency: int = WORKER_CONCURRENCY, worker_id: Optional[str] = None):
+    """Claim and run jobs forever, with at most `concurrency` in flight."""
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    slots = asyncio.Semaphore(concurrency)
+    running = set()
+    logger.info(f"Analysis worker {worker_id} started with concurrency {concurrency}")
+
+    try:
+        while True:
+            await slots.acquire()
+            try:
+                job = await claim_job(db, worker_id)
+            except Exception:
+                logger.exception("Failed to claim analysis job")
+                job = None
+
+            if not job:
+                slots.release()
+                await asyncio.sleep(JOB_POLL_SECONDS)
+                continue
+
+            task = asyncio.create_task(run_job(db, job, handler, worker_id))
+            running.add(task)
+            task.add_done_callback(running.discard)
+            task.add_done_callback(lambda _: slots.release())
+    finally:
+        for task in running:
+            task.cancel()
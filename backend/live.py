@@ -0,0 +1,90 @@
+import os
+from typing import Optional
+
+import numpy as np
+
+from analysis import FRAME_LENGTH, HOP_LENGTH, SAMPLE_RATE, frame_features, score_features, summarize_frames
+
+# Live scoring over /api/interviews/{id}/live: clients stream 16 kHz mono s16le PCM
+LIVE_WINDOW_SECONDS = float(os.environ.get('LIVE_WINDOW_SECONDS', 3))
+LIVE_SCORE_INTERVAL = float(os.environ.get('LIVE_SCORE_INTERVAL', 0.5))
+LIVE_BUFFER_SECONDS = float(os.environ.get('LIVE_BUFFER_SECONDS', 2))
+LIVE_MAX_MESSAGE_BYTES = int(os.environ.get('LIVE_MAX_MESSAGE_BYTES', 32 * 1024))
+LIVE_MAX_CONNECTIONS = int(os.environ.get('LIVE_MAX_CONNECTIONS', 500))
+
+FRAME_KEYS = ("rms", "peak", "f0", "voicing")
+
+class LiveScorer:
+    """Sliding-window stress/confidence estimator for one live audio stream.
+
+    Incoming PCM is converted into a preallocated pending buffer. Each update() turns
+    the complete frames in it into per-frame features, which are kept in fixed-size
+    rings covering the last LIVE_WINDOW_SECONDS, so work per update is proportional to
+    the new audio and nothing is allocated per received message.
+    """
+
+    def __init__(self, window_seconds: float = LIVE_WINDOW_SECONDS, buffer_seconds: float = LIVE_BUFFER_SECONDS):
+        # Always large enough for one maximum-size message on top of the unconsumed frame tail
+        capacity = max(int(buffer_seconds * SAMPLE_RATE), LIVE_MAX_MESSAGE_BYTES // 2)
+        self.pending = np.zeros(FRAME_LENGTH + HOP_LENGTH + capacity, dtype=np.float32)
+        self.pending_len = 0
+        self.window_frames = int(window_seconds * SAMPLE_RATE / HOP_LENGTH)
+        self.rings = {key: np.zeros(self.window_frames, dtype=np.float32) for key in FRAME_KEYS}
+        self.ring_pos = 0
+        self.ring_count = 0
+        self.samples_received = 0
+
+    def has_room(self, sample_count: int) -> bool:
+        return self.pending_len + sample_count <= len(self.pending)
+
+    def push(self, pcm: bytes):
+        """Append s16le samples; callers must check has_room() first."""
+        samples = np.frombuffer(pcm, dtype='<i2')
+        end = self.pending_len + len(samples)
+        np.multiply(samples, np.float32(1 / 32768), out=self.pending[self.pending_len:end], casting='unsafe')
+        self.pending_len = end
+        self.samples_received += len(samples)
+
+    def consume_frames(self) -> int:
+        """Move every complete frame from the pending buffer into the feature rings."""
+        if self.pending_len < FRAME_LENGTH:
+            return 0
+
+        count = (self.pending_len - FRAME_LENGTH) // HOP_LENGTH + 1
+        frames = np.lib.stride_tricks.sliding_window_view(self.pending[:self.pending_len], FRAME_LENGTH)[::HOP_LENGTH][:count]
+        features = frame_features(np.ascontiguousarray(frames))
+
+        # Only the newest window's worth of frames can survive in the rings
+        keep = min(count, self.window_frames)
+        first = self.ring_pos
+        head = min(keep, self.window_frames - first)
+        for key, ring in self.rings.items():
+            values = features[key][count - keep:]
+            ring[first:first + head] = values[:head]
+            ring[:keep - head] = values[head:]
+        self.ring_pos = (self.ring_pos + keep) % self.window_frames
+        self.ring_count = min(self.ring_count + keep, self.window_frames)
+
+        # Keep the overlap the next frame still needs
+        consumed = count * HOP_LENGTH
+        remaining = self.pending_len - consumed
+        self.pending[:remaining] = self.pending[consumed:self.pending_len]
+        self.pending_len = remaining
+        return count
+
+    def update(self) -> Optional[dict]:
+        """Score the current window, or None if no new frame arrived since the last call."""
+        if not self.consume_frames():
+            return None
+
+        if self.ring_count < self.window_frames:
+            ordered = {key: ring[:self.ring_count] for key, ring in self.rings.items()}
+        else:
+            ordered = {key: np.concatenate((ring[self.ring_pos:], ring[:self.ring_pos])) for key, ring in self.rings.items()}
+
+        features = summarize_frames(ordered, self.ring_count * HOP_LENGTH / SAMPLE_RATE)
+        return {
+            **score_features(features),
+            "audio_seconds": round(self.samples_received / SAMPLE_RATE, 2),
+            "features": features
+        }
@@ -0,0 +1,122 @@
+"""Maintenance commands run against the configured database.
+
+    python manage.py backfill-stats
+    python manage.py rebuild-rankings
+    python manage.py migrate-uploads [--dry-run]
+    python manage.py gc-blobs [--grace-hours 24]
+    python manage.py expire-uploads [--max-age-hours 48]
+    python manage.py tier-backlog
+    python manage.py expire-originals [--archive] [--grace-hours 24]
+    python manage.py export [--format ndjson|csv] [--user-id ID] [--start DATE] [--end DATE] [--gzip] [--output FILE]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime, timedelta
+
+import export
+import jobs
+import rankings
+import stats
+import storage
+import tiering
+
+logger = logging.getLogger(__name__)
+
+async def backfill_stats(server, args):
+    await stats.backfill_user_stats(server.db)
+
+async def rebuild_rankings(server, args):
+    await rankings.rebuild_sketches(server.db)
+
+async def migrate_uploads(server, args):
+    await storage.migrate_flat_uploads(server.db, server.UPLOAD_DIR, server.blob_store, dry_run=args.dry_run)
+
+async def gc_blobs(server, args):
+    await storage.collect_garbage(server.db, server.blob_store, timedelta(hours=args.grace_hours))
+
+async def expire_uploads(server, args):
+    await storage.expire_upload_sessions(server.db, server.PARTIAL_UPLOAD_DIR, timedelta(hours=args.max_age_hours))
+
+async def tier_backlog(server, args):
+    async def enqueue(interview_id, user_id):
+        await jobs.enqueue_analysis_job(server.db, interview_id, user_id, {}, job_type=jobs.TIERING_JOB)
+
+    queued = await tiering.enqueue_untiered(server.db, enqueue)
+    logger.info(f"Queued tiering for {queued} interviews")
+
+async def expire_originals(server, args):
+    expired = await tiering.expire_originals(server.db, server.blob_store, archive=args.archive or tiering.TIERING_ORIGINALS == 'archive')
+    collected = await storage.collect_garbage(server.db, server.blob_store, timedelta(hours=args.grace_hours))
+    logger.info(
+        f"Released {expired['released_bytes']} bytes of originals from {expired['expired']} responses; "
+        f"reclaimed {collected['reclaimed_bytes']} bytes from {collected['deleted']} blobs"
+    )
+
+async def export_interviews(server, args):
+    match = export.date_range(args.start, args.end)
+    if args.user_id:
+        match["user_id"] = args.user_id
+
+    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    written = 0
+    try:
+        async for chunk in export.stream_export(export.export_cursor(server.db, match), args.format, args.gzip):
+            output.write(chunk)
+            written += len(chunk)
+    finally:
+        if args.output:
+            output.close()
+    logger.info(f"Exported {written} bytes")
+
+# name -> (handler, help, [(flag, add_argument kwargs)]); handlers get the configured server module
+COMMANDS = {
+    "backfill-stats": (backfill_stats, "Rebuild per-user dashboard rollups from interviews", []),
+    "rebuild-rankings": (rebuild_rankings, "Rebuild per-category score distributions used for percentiles", []),
+    "migrate-uploads": (migrate_uploads, "Move flat upload files into the content-addressed blob store", [
+        ("--dry-run", {"action": "store_true", "help": "Only report what would be migrated"}),
+    ]),
+    "gc-blobs": (gc_blobs, "Delete stored recordings no response refers to any more", [
+        ("--grace-hours", {"type": float, "default": 24, "help": "Keep unreferenced blobs at least this long"}),
+    ]),
+    "expire-uploads": (expire_uploads, "Expire abandoned resumable uploads and delete their partial files", [
+        ("--max-age-hours", {"type": float, "default": 48, "help": "Expire sessions idle for longer than this"}),
+    ]),
+    "tier-backlog": (tier_backlog, "Queue tiering for analyzed interviews that were never tiered", []),
+    "expire-originals": (expire_originals, "Delete or archive original recordings past retention, then collect garbage", [
+        ("--archive", {"action": "store_true", "help": "Archive originals instead of deleting them (default: TIERING_ORIGINALS)"}),
+        ("--grace-hours", {"type": float, "default": 24, "help": "Keep unreferenced blobs at least this long"}),
+    ]),
+    "export": (export_interviews, "Stream interviews with their responses and analysis as NDJSON or CSV", [
+        ("--format", {"choices": sorted(export.EXPORT_FORMATS), "default": "ndjson"}),
+        ("--user-id", {"help": "Only this user's interviews"}),
+        ("--start", {"type": datetime.fromisoformat, "help": "Interviews started at or after this ISO date (UTC if no offset)"}),
+        ("--end", {"type": datetime.fromisoformat, "help": "Interviews started before this ISO date"}),
+        ("--gzip", {"action": "store_true", "help": "Compress the output"}),
+        ("--output", {"help": "File to write (default: stdout)"}),
+    ]),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress analyzer maintenance commands")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, (_, help_text, arguments) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        for flag, options in arguments:
+            subparser.add_argument(flag, **options)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    # Imported late so --help works without a database configuration
+    import server
+
+    command, _, _ = COMMANDS[args.command]
+    asyncio.run(command(server, args))
+
+if __name__ == "__main__":
+    main()
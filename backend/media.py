@@ -0,0 +1,147 @@
+import asyncio
+import os
+import stat
+from email.utils import formatdate
+from pathlib import Path
+from typing import Optional, Tuple
+
+import anyio
+from fastapi import HTTPException, Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+MEDIA_TYPES = {"video": "video/webm", "audio": "audio/webm"}
+
+def not_satisfiable(size: int) -> HTTPException:
+    return HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Resolve a Range header to an inclusive (start, end) byte span.
+
+    Returns None when the whole file should be sent instead (unsupported unit, multiple
+    ranges, malformed); raises 416 when the range lies entirely beyond the file.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+
+    first, _, last = spec.strip().partition('-')
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            if size == 0:
+                # No last byte to count back from
+                raise not_satisfiable(size)
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+            if start >= size:
+                raise not_satisfiable(size)
+            if end < start:
+                return None
+            end = min(end, size - 1)
+    except ValueError:
+        return None
+
+    return start, end
+
+class FileRangeResponse(Response):
+    """Serves a byte span of a file without reading it into Python where the server allows.
+
+    Uses the ASGI zero-copy extension (sendfile) when the server offers it, path-send for
+    whole files, and bounded chunked reads otherwise.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: Path, start: int, end: int, status_code: int, headers: dict, media_type: str):
+        self.path = path
+        self.start = start
+        self.count = end - start + 1
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers({**headers, "content-length": str(self.count)})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+        extensions = scope.get("extensions", {})
+        whole_file = self.status_code == 200
+        if "http.response.zerocopy" in extensions:
+            with open(self.path, 'rb') as f:
+                await send({"type": "http.response.zerocopy", "file": f, "offset": self.start, "count": self.count, "more_body": False})
+        elif whole_file and "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+        else:
+            remaining = self.count
+            async with await anyio.open_file(self.path, 'rb') as f:
+                await f.seek(self.start)
+                while remaining:
+                    chunk = await f.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": bool(remaining)})
+            if remaining:
+                # The file shrank underneath us; end the body rather than hang the client
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+async def serve_file(
+    request: Request,
+    path: Path,
+    media_type: str,
+    etag: Optional[str] = None,
+    accel_root: Optional[Path] = None,
+    accel_prefix: Optional[str] = None
+) -> Response:
+    """Respond with a stored recording, honouring Range, If-Range and If-None-Match.
+
+    With accel_prefix set, files under accel_root are handed to nginx via X-Accel-Redirect,
+    which then does the range handling and sendfile itself.
+    """
+    try:
+        stat_result = await asyncio.to_thread(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Recording not found")
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail="Recording not found")
+
+    size = stat_result.st_size
+    # Blobs are content-addressed, so their hash is a strong validator
+    etag = f'"{etag}"' if etag else f'"{int(stat_result.st_mtime)}-{size}"'
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+    headers = {
+        "accept-ranges": "bytes",
+        "etag": etag,
+        "last-modified": last_modified,
+        "cache-control": "private, max-age=3600"
+    }
+
+    if accel_prefix and accel_root and path.is_relative_to(accel_root):
+        return Response(
+            headers={**headers, "x-accel-redirect": accel_prefix.rstrip('/') + '/' + path.relative_to(accel_root).as_posix()},
+            media_type=media_type
+        )
+
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=headers)
+
+    span = None
+    range_header = request.headers.get('range')
+    # If-Range: only honour Range when the client's copy is still current (exact match, RFC 9110)
+    if range_header and request.headers.get('if-range', etag) in (etag, last_modified):
+        span = parse_range(range_header, size)
+
+    if span is None:
+        if size == 0:
+            return Response(headers=headers, media_type=media_type)
+        return FileRangeResponse(path, 0, size - 1, 200, headers, media_type)
+
+    start, end = span
+    headers["content-range"] = f"bytes {start}-{end}/{size}"
+    return FileRangeResponse(path, start, end, 206, headers, media_type)
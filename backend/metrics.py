@@ -0,0 +1,162 @@
+import os
+import re
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from pymongo import monitoring
+from starlette.responses import Response
+from starlette.routing import Route
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Metrics are kept per process; with several uvicorn workers set PROMETHEUS_MULTIPROC_DIR so
+# /metrics aggregates them (see prometheus_client's multiprocess mode)
+MULTIPROCESS = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+UPLOAD_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route template',
+    ['method', 'route', 'status'], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress', 'HTTP requests being handled', ['method', 'route'],
+    multiprocess_mode='livesum'
+)
+
+MONGO_COMMAND_DURATION = Histogram(
+    'mongodb_command_duration_seconds', 'MongoDB command latency as reported by the driver',
+    ['command', 'collection'], buckets=MONGO_BUCKETS
+)
+MONGO_COMMAND_FAILURES = Counter(
+    'mongodb_command_failures_total', 'MongoDB commands that returned an error', ['command', 'collection']
+)
+MONGO_POOL_CONNECTIONS = Gauge(
+    'mongodb_pool_connections', 'MongoDB driver connections by state', ['state'],
+    multiprocess_mode='livesum'
+)
+
+UPLOAD_BYTES = Counter('recording_upload_bytes_total', 'Recording bytes received', ['source'])
+UPLOAD_DURATION = Histogram(
+    'recording_upload_duration_seconds', 'Time spent receiving one recording (or chunk)',
+    ['source', 'outcome'], buckets=UPLOAD_BUCKETS
+)
+
+EVENT_LOOP_LAG = Histogram(
+    'event_loop_lag_seconds', 'How late the event loop ran a scheduled heartbeat',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    'admission_in_flight_requests', 'Requests admitted and running, by route class', ['route_class'],
+    multiprocess_mode='livesum'
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    'admission_queue_depth', 'Requests waiting for admission, by route class', ['route_class'],
+    multiprocess_mode='livesum'
+)
+ADMISSION_WAIT = Histogram(
+    'admission_wait_seconds', 'Time queued requests waited for a slot', ['route_class'], buckets=LATENCY_BUCKETS
+)
+ADMISSION_REJECTED = Counter(
+    'admission_rejected_total', 'Requests turned away with 503', ['route_class', 'reason']
+)
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request under its route template.
+
+    The route is resolved before the request runs so the in-flight gauge can carry it.
+    All route patterns are folded into one regex, so that costs a single match rather
+    than a scan of the routing table; unmatched paths share one label.
+    """
+
+    def __init__(self, app: ASGIApp, routes):
+        self.app = app
+        self.routes = routes
+        self.pattern = None
+        self.paths = []
+
+    def compile_routes(self):
+        self.paths = [route.path for route in self.routes if isinstance(route, Route)]
+        alternatives = []
+        for index, route in enumerate(route for route in self.routes if isinstance(route, Route)):
+            # Route regexes are anchored and name their parameters; names would clash across routes
+            body = re.sub(r'\(\?P<\w+>', '(?:', route.path_regex.pattern[1:-1])
+            alternatives.append(f"(?P<r{index}>{body})")
+        self.pattern = re.compile('|'.join(alternatives))
+        self.route_count = len(self.routes)
+
+    def route_name(self, scope: Scope) -> str:
+        if self.pattern is None or self.route_count != len(self.routes):
+            self.compile_routes()
+        match = self.pattern.fullmatch(scope["path"])
+        return self.paths[int(match.lastgroup[1:])] if match else "unmatched"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self.route_name(scope)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            REQUEST_DURATION.labels(method, route, str(status)).observe(time.perf_counter() - start)
+
+class CommandMetrics(monitoring.CommandListener):
+    """Per command and collection latency from driver events (durations are measured by pymongo)."""
+
+    def __init__(self):
+        # (connection, request id) -> collection; only the started event carries the command document
+        self.collections = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if not isinstance(target, str):
+            # e.g. getMore names its collection separately; ping/hello have none
+            target = event.command.get('collection', '')
+        self.collections[(event.connection_id, event.request_id)] = target
+
+    def succeeded(self, event):
+        collection = self.collections.pop((event.connection_id, event.request_id), '')
+        MONGO_COMMAND_DURATION.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self.collections.pop((event.connection_id, event.request_id), '')
+        MONGO_COMMAND_DURATION.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(event.command_name, collection).inc()
+
+command_metrics = CommandMetrics()
+
+def track_pool(pool_monitor):
+    if MULTIPROCESS:
+        # Callback gauges cannot be aggregated across processes; /healthz still reports the pool
+        return
+    for state in ("open", "checked_out", "waiting"):
+        MONGO_POOL_CONNECTIONS.labels(state).set_function(lambda state=state: pool_monitor.stats()[state])
+
+def record_upload(source: str, size: int, seconds: float, outcome: str):
+    UPLOAD_BYTES.labels(source).inc(size)
+    UPLOAD_DURATION.labels(source, outcome).observe(seconds)
+
+def metrics_response() -> Response:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,258 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Requests are profiled when they carry `X-Profile: 1` with a valid X-Admin-Token, or at random
+# with probability PROFILE_SAMPLE_RATE. Profiles are written to PROFILE_DIR in speedscope format
+# (open them at https://www.speedscope.app).
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_INTERVAL = float(os.environ.get('PROFILE_INTERVAL', 0.005))
+PROFILE_DIR = Path(os.environ.get('PROFILE_DIR', Path(__file__).parent / 'profiles'))
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 200))
+PROFILE_MAX_DEPTH = 128
+
+# Event-loop watchdog: log the loop thread's stack when a callback blocks it for longer than this
+LOOP_LAG_THRESHOLD = float(os.environ.get('LOOP_LAG_THRESHOLD', 0.25))
+LOOP_LAG_INTERVAL = float(os.environ.get('LOOP_LAG_INTERVAL', 0.05))
+
+def frame_key(frame) -> tuple:
+    code = frame.f_code
+    return code.co_name, code.co_filename, code.co_firstlineno
+
+def running_stack(thread_frame, root_frame) -> Optional[list]:
+    """The loop thread's frames from root_frame down to the leaf, or None if root_frame is not on it."""
+    stack = []
+    frame = thread_frame
+    while frame is not None and len(stack) < PROFILE_MAX_DEPTH:
+        stack.append(frame_key(frame))
+        if frame is root_frame:
+            stack.reverse()
+            return stack
+        frame = frame.f_back
+    return None
+
+def awaiting_stack(awaitable) -> list:
+    """Where a suspended coroutine chain is parked, outermost first."""
+    stack = []
+    while awaitable is not None and len(stack) < PROFILE_MAX_DEPTH:
+        frame = getattr(awaitable, 'cr_frame', None) or getattr(awaitable, 'ag_frame', None) or getattr(awaitable, 'gi_frame', None)
+        if frame is None:
+            # A future or other awaitable: the request is waiting on I/O, a thread or a lock
+            stack.append((f"<{type(awaitable).__name__}>", "", 0))
+            break
+        stack.append(frame_key(frame))
+        awaitable = getattr(awaitable, 'cr_await', None) or getattr(awaitable, 'ag_await', None) or getattr(awaitable, 'gi_yieldfrom', None)
+    return stack
+
+class ProfileSession:
+    def __init__(self, name: str, coroutine, thread_id: int):
+        self.name = name
+        self.coroutine = coroutine
+        self.thread_id = thread_id
+        self.started = time.perf_counter()
+        self.samples = []
+        self.weights = []
+
+    def sample(self, thread_frame, elapsed: float):
+        frame = self.coroutine.cr_frame
+        if frame is None:
+            return
+        if self.coroutine.cr_running and thread_frame is not None:
+            stack = running_stack(thread_frame, frame)
+            if stack:
+                self.samples.append([("[running on event loop]", "", 0), *stack])
+                self.weights.append(elapsed)
+                return
+        self.samples.append([("[awaiting]", "", 0), *awaiting_stack(self.coroutine)])
+        self.weights.append(elapsed)
+
+    def to_speedscope(self) -> dict:
+        frames, index = [], {}
+        samples = []
+        for stack in self.samples:
+            indices = []
+            for key in stack:
+                if key not in index:
+                    index[key] = len(frames)
+                    name, file, line = key
+                    frames.append({"name": name, "file": file, "line": line} if file else {"name": name})
+                indices.append(index[key])
+            samples.append(indices)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "stress-analyzer profiling middleware",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(sum(self.weights), 6),
+                "samples": samples,
+                "weights": [round(weight, 6) for weight in self.weights]
+            }]
+        }
+
+class Sampler:
+    """One background thread sampling every active session every PROFILE_INTERVAL seconds.
+
+    The thread only runs while at least one request is being profiled.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.sessions = set()
+        self.thread = None
+
+    def add(self, session: ProfileSession):
+        with self.lock:
+            self.sessions.add(session)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="profiler", daemon=True)
+                self.thread.start()
+
+    def remove(self, session: ProfileSession):
+        with self.lock:
+            self.sessions.discard(session)
+
+    def run(self):
+        last = time.perf_counter()
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                if not self.sessions:
+                    self.thread = None
+                    return
+                sessions = list(self.sessions)
+            now = time.perf_counter()
+            frames = sys._current_frames()
+            for session in sessions:
+                session.sample(frames.get(session.thread_id), now - last)
+            last = now
+
+sampler = Sampler(PROFILE_INTERVAL)
+
+def write_profile(session: ProfileSession, path: Path):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(session.to_speedscope(), separators=(',', ':')))
+
+    # Keep the newest PROFILE_MAX_FILES profiles
+    profiles = sorted(PROFILE_DIR.glob('*.speedscope.json'), key=lambda p: p.stat().st_mtime)
+    for old in profiles[:-PROFILE_MAX_FILES]:
+        old.unlink(missing_ok=True)
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware capturing a sampled wall-clock profile of selected requests.
+
+    Samples show either the request's own frames while it runs on the event loop, or
+    the await chain it is suspended in (a Mongo call, a thread, a lock), so the profile
+    tells CPU in the loop apart from time spent waiting.
+    """
+
+    def __init__(self, app: ASGIApp, admin_token: Optional[str] = None, sample_rate: float = PROFILE_SAMPLE_RATE):
+        self.app = app
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+
+    def requested(self, scope: Scope) -> bool:
+        headers = dict(scope["headers"])
+        if b"x-profile" in headers and self.admin_token:
+            token = headers.get(b"x-admin-token", b"").decode('latin-1')
+            if secrets.compare_digest(token, self.admin_token):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        timestamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+        profile_id = f"{timestamp}-{scope['method']}-{uuid.uuid4().hex[:8]}"
+        path = PROFILE_DIR / f"{profile_id}.speedscope.json"
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        coroutine = self.app(scope, receive, send_with_profile_id)
+        session = ProfileSession(f"{scope['method']} {scope['path']}", coroutine, threading.get_ident())
+        sampler.add(session)
+        try:
+            await coroutine
+        finally:
+            sampler.remove(session)
+            await asyncio.to_thread(write_profile, session, path)
+            logger.info(f"Profiled {session.name} ({len(session.samples)} samples) -> {path.name}")
+
+class LoopLagMonitor:
+    """Watchdog for callbacks that block the event loop.
+
+    A heartbeat scheduled on the loop records when it last ran; a thread checks it and,
+    once the loop has been stuck for LOOP_LAG_THRESHOLD, logs the loop thread's stack
+    (once per stall) so the blocking code can be found.
+    """
+
+    def __init__(self, threshold: float = LOOP_LAG_THRESHOLD, interval: float = LOOP_LAG_INTERVAL):
+        self.threshold = threshold
+        self.interval = interval
+        self.last_beat = time.monotonic()
+        self.stopped = threading.Event()
+        self.heartbeat_task = None
+
+    async def heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            metrics.EVENT_LOOP_LAG.observe(max(now - expected, 0))
+            self.last_beat = now
+
+    def watch(self, loop_thread_id: int):
+        reported = None
+        while not self.stopped.wait(self.interval):
+            beat = self.last_beat
+            stalled = time.monotonic() - beat
+            if stalled < self.threshold:
+                if reported is not None:
+                    logger.warning(f"Event loop unblocked after {time.monotonic() - reported:.3f}s")
+                    reported = None
+                continue
+            if reported is not None:
+                continue
+
+            frame = sys._current_frames().get(loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame else "(no frame)"
+            logger.warning(f"Event loop blocked for {stalled:.3f}s; loop thread stack:\n{stack}")
+            reported = beat
+
+    def start(self):
+        self.last_beat = time.monotonic()
+        self.heartbeat_task = asyncio.create_task(self.heartbeat())
+        threading.Thread(target=self.watch, args=(threading.get_ident(),), name="loop-lag-monitor", daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.heartbeat_task:
+            self.heartbeat_task.cancel()
@@ -0,0 +1,205 @@
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+
+from pymongo import DeleteMany, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from stats import applied_once
+
+logger = logging.getLogger(__name__)
+
+# Score distributions per category, overall and per question, kept in category_score_sketches as
+# fixed-bin histograms over the 0-100 score range. Bins are summed rather than interviews scanned,
+# so a percentile costs one document read whatever the population, and two sketches merge by
+# adding their bins:
+#   _id: "<category_id>:<question_id or *>", category_id, question_id, count,
+#   stress.<bin>, confidence.<bin>   (sparse: only non-empty bins are stored)
+SKETCH_BINS = 100
+SCORE_RANGE = 100.0
+METRICS = ("stress", "confidence")
+
+def sketch_id(category_id: str, question_id: Optional[str] = None) -> str:
+    return f"{category_id}:{question_id or '*'}"
+
+def score_bin(score: float) -> int:
+    return min(max(int(score * SKETCH_BINS / SCORE_RANGE), 0), SKETCH_BINS - 1)
+
+def scores_of(document: Optional[dict], prefix: str = "") -> Optional[tuple]:
+    """(stress, confidence) from a document's score fields, or None if it has no scores."""
+    if not document or document.get(f"{prefix}stress_score") is None:
+        return None
+    return document[f"{prefix}stress_score"], document[f"{prefix}confidence_score"]
+
+def sketch_update(category_id: str, question_id: Optional[str], previous: Optional[tuple], current: Optional[tuple],
+                  job_id: str) -> Optional[UpdateOne]:
+    """Move one sample from its previous bins (when re-scored) to its current ones, once per job."""
+    increments = Counter()
+    for scores, step in ((previous, -1), (current, 1)):
+        if scores is None:
+            continue
+        increments["count"] += step
+        for metric, score in zip(METRICS, scores):
+            increments[f"{metric}.{score_bin(score)}"] += step
+
+    increments = {field: step for field, step in increments.items() if step}
+    if not increments:
+        return None
+
+    return UpdateOne(
+        {"_id": sketch_id(category_id, question_id), "applied_jobs": {"$ne": job_id}},
+        {
+            "$inc": increments,
+            "$set": {"category_id": category_id, "question_id": question_id, "updated_at": datetime.now(timezone.utc)},
+            **applied_once(job_id)
+        },
+        upsert=True
+    )
+
+async def record_interview_scored(db, previous: dict, overall_stress: float, overall_confidence: float, answers: list,
+                                  job_id: str):
+    """Fold a finished analysis into its category's sketches, once per job.
+
+    `previous` is the interview as the sketches count it (see stats.pin_rollup_baseline)
+    and `answers` lists (question_id, previous scores, current scores) for every re-scored
+    response, so re-analysis moves samples instead of counting them twice. Only a
+    completed interview has samples in the sketches.
+    """
+    category_id = previous['category_id']
+    was_completed = previous.get('status') == 'completed'
+    updates = [sketch_update(
+        category_id,
+        None,
+        scores_of(previous, "overall_") if was_completed else None,
+        (overall_stress, overall_confidence),
+        job_id
+    )]
+    updates.extend(
+        sketch_update(category_id, question_id, before if was_completed else None, after, job_id)
+        for question_id, before, after in answers
+    )
+
+    updates = [update for update in updates if update]
+    if not updates:
+        return
+    try:
+        await db.category_score_sketches.bulk_write(updates, ordered=False)
+    except BulkWriteError as e:
+        # Sketches already holding this job make their upsert collide on _id; the rest applied
+        if any(error['code'] != 11000 for error in e.details['writeErrors']):
+            raise
+
+def percentile(sketch: Optional[dict], metric: str, score: float) -> Optional[float]:
+    """Share of the population scoring below `score`, interpolated within its bin."""
+    total = (sketch or {}).get("count", 0)
+    if total <= 0:
+        return None
+
+    bins = sketch.get(metric, {})
+    index = score_bin(score)
+    below = sum(count for key, count in bins.items() if int(key) < index)
+    width = SCORE_RANGE / SKETCH_BINS
+    fraction = min(max((score - index * width) / width, 0.0), 1.0)
+    below += bins.get(str(index), 0) * fraction
+    return round(100 * below / total, 1)
+
+def rank(sketch: Optional[dict], scores: Optional[tuple]) -> Optional[dict]:
+    if scores is None:
+        return None
+    return {
+        "sample_size": (sketch or {}).get("count", 0),
+        **{
+            metric: {"score": score, "percentile": percentile(sketch, metric, score)}
+            for metric, score in zip(METRICS, scores)
+        }
+    }
+
+async def get_interview_ranking(db, interview: dict) -> dict:
+    """Percentiles of an interview and each of its answers within its category."""
+    responses = await db.interview_responses.find(
+        {"interview_id": interview['id'], "stress_score": {"$ne": None}},
+        {"_id": 0, "id": 1, "question_id": 1, "question_text": 1, "stress_score": 1, "confidence_score": 1}
+    ).to_list(1000)
+
+    category_id = interview['category_id']
+    ids = [sketch_id(category_id)] + [sketch_id(category_id, response['question_id']) for response in responses]
+    sketches = {
+        sketch['_id']: sketch
+        async for sketch in db.category_score_sketches.find({"_id": {"$in": ids}}, {"applied_jobs": 0})
+    }
+
+    return {
+        "interview_id": interview['id'],
+        "category_id": category_id,
+        "overall": rank(sketches.get(ids[0]), scores_of(interview, "overall_")),
+        "responses": [
+            {
+                "response_id": response['id'],
+                "question_id": response['question_id'],
+                "question_text": response['question_text'],
+                **rank(sketches.get(sketch_id(category_id, response['question_id'])), scores_of(response))
+            }
+            for response in responses
+        ]
+    }
+
+def bin_expression(field: str) -> dict:
+    scaled = {"$floor": {"$multiply": [f"${field}", SKETCH_BINS / SCORE_RANGE]}}
+    return {"$min": [{"$max": [scaled, 0]}, SKETCH_BINS - 1]}
+
+def score_bins_stage(stress_field: str, confidence_field: str) -> list:
+    # At most SKETCH_BINS² groups per sketch, however many samples there are
+    return [
+        {"$group": {
+            "_id": {
+                "category_id": "$category_id",
+                "question_id": "$question_id",
+                "stress": bin_expression(stress_field),
+                "confidence": bin_expression(confidence_field)
+            },
+            "count": {"$sum": 1}
+        }}
+    ]
+
+async def rebuild_sketches(db):
+    """Recompute every sketch from completed interviews and their scored responses."""
+    overall = db.interviews.aggregate([
+        {"$match": {"status": "completed", "overall_stress_score": {"$ne": None}}},
+        {"$set": {"question_id": None}},
+        *score_bins_stage("overall_stress_score", "overall_confidence_score")
+    ])
+    answers = db.interview_responses.aggregate([
+        {"$match": {"stress_score": {"$ne": None}}},
+        {"$lookup": {"from": "interviews", "localField": "interview_id", "foreignField": "id", "as": "interview"}},
+        {"$unwind": "$interview"},
+        # As in record_interview_scored: answers count once their interview has completed
+        {"$match": {"interview.status": "completed"}},
+        {"$set": {"category_id": "$interview.category_id"}},
+        *score_bins_stage("stress_score", "confidence_score")
+    ])
+
+    sketches = {}
+    for cursor in (overall, answers):
+        async for group in cursor:
+            key = group['_id']
+            _id = sketch_id(key['category_id'], key.get('question_id'))
+            sketch = sketches.setdefault(_id, {
+                "_id": _id,
+                "category_id": key['category_id'],
+                "question_id": key.get('question_id'),
+                "count": 0,
+                **{metric: {} for metric in METRICS}
+            })
+            sketch["count"] += group['count']
+            for metric in METRICS:
+                index = str(int(key[metric]))
+                sketch[metric][index] = sketch[metric].get(index, 0) + group['count']
+
+    now = datetime.now(timezone.utc)
+    operations = [ReplaceOne({"_id": _id}, {**sketch, "updated_at": now}, upsert=True) for _id, sketch in sketches.items()]
+    operations.append(DeleteMany({"_id": {"$nin": list(sketches)}}))
+    await db.category_score_sketches.bulk_write(operations, ordered=True)
+
+    logger.info(f"Rebuilt {len(sketches)} score sketches")
+    return len(sketches)
@@ -0,0 +1,88 @@
+import logging
+import os
+import uuid
+from datetime import datetime, timezone, timedelta
+
+from pymongo import UpdateOne
+
+import database
+
+logger = logging.getLogger(__name__)
+
+# Bump when the built-in catalog below changes so existing databases pick it up
+SEED_VERSION = 1
+SEED_LOCK_TTL = timedelta(minutes=5)
+
+CATEGORIES = [
+    {
+        "id": "technical",
+        "name": "Technical Interview",
+        "description": "Assess technical knowledge and problem-solving skills"
+    },
+    {
+        "id": "hr",
+        "name": "HR Interview",
+        "description": "Evaluate communication and cultural fit"
+    },
+    {
+        "id": "behavioral",
+        "name": "Behavioral Interview",
+        "description": "Understand past experiences and behavioral patterns"
+    }
+]
+
+# (category_id, text) of the built-in questions
+QUESTIONS = [
+    # Technical
+    ("technical", "Explain the difference between process and thread."),
+    ("technical", "What is the time complexity of binary search?"),
+    ("technical", "Describe RESTful API design principles."),
+    ("technical", "What are the SOLID principles in software design?"),
+    ("technical", "Explain database normalization and its importance."),
+    # HR
+    ("hr", "Tell me about yourself."),
+    ("hr", "Why do you want to work for our company?"),
+    ("hr", "What are your greatest strengths and weaknesses?"),
+    ("hr", "Where do you see yourself in 5 years?"),
+    ("hr", "Why should we hire you?"),
+    # Behavioral
+    ("behavioral", "Describe a time when you faced a challenging situation at work."),
+    ("behavioral", "Tell me about a time you worked on a team project."),
+    ("behavioral", "Give an example of a goal you set and how you achieved it."),
+    ("behavioral", "Describe a situation where you had to deal with a difficult colleague."),
+    ("behavioral", "Tell me about a time when you had to adapt to a significant change.")
+]
+
+async def seed_catalog(db):
+    """Insert the built-in categories and questions that are missing.
+
+    Upserts keyed on category id and question text make this idempotent, the version
+    marker lets later boots skip it with one lookup, and the lock keeps workers booting
+    together from all doing the same writes.
+    """
+    if await db.app_meta.find_one({"_id": "seed", "version": SEED_VERSION}):
+        return
+
+    owner = f"{os.getpid()}-{uuid.uuid4()}"
+    if not await database.acquire_lock(db, "seed", owner, SEED_LOCK_TTL):
+        logger.info("Catalog seeding is running in another worker")
+        return
+
+    try:
+        created_at = datetime.now(timezone.utc).isoformat()
+        await db.interview_categories.bulk_write([
+            UpdateOne({"id": category["id"]}, {"$setOnInsert": {**category, "created_at": created_at}}, upsert=True)
+            for category in CATEGORIES
+        ], ordered=False)
+        await db.questions.bulk_write([
+            UpdateOne(
+                {"category_id": category_id, "text": text, "is_custom": False},
+                {"$setOnInsert": {"id": str(uuid.uuid4()), "created_at": created_at}},
+                upsert=True
+            )
+            for category_id, text in QUESTIONS
+        ], ordered=False)
+        await db.app_meta.update_one({"_id": "seed"}, {"$set": {"version": SEED_VERSION}}, upsert=True)
+        logger.info(f"Seeded catalog version {SEED_VERSION}")
+    finally:
+        await database.release_lock(db, "seed", owner)
@@ -1,29 +1,102 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, Response, UploadFile, File, Form
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, Request, Response, UploadFile, File, Form, WebSocket
+from starlette.datastructures import UploadFile as StarletteUploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
+from cachetools import TTLCache
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from typing import List, Optional
 import uuid
 from datetime import datetime, timezone, timedelta
 import aiofiles
+import asyncio
+import base64
+import hashlib
 import json
+import secrets
+import time
+
+import admission
+import database
+import export
+import jobs
+import live
+import media
+import metrics
+import profiling
+import rankings
+import stats
+import storage
+import tiering
+import video
+from indexes import ensure_indexes, migrate_session_timestamps
+from seed import seed_catalog
+from analysis import AudioDecodeError, analyze_recording
+
+try:
+    import orjson
+except ImportError:  # optional: fast mode falls back to the stdlib encoder
+    orjson = None
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection (pool, timeouts, compression and read preference: see database.py)
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = database.create_client(mongo_url, [metrics.command_metrics])
 db = client[os.environ['DB_NAME']]
 
 # Create upload directory
 UPLOAD_DIR = ROOT_DIR / 'uploads'
 UPLOAD_DIR.mkdir(exist_ok=True)
+PARTIAL_UPLOAD_DIR = UPLOAD_DIR / 'partial'
+PARTIAL_UPLOAD_DIR.mkdir(exist_ok=True)
+# Finished recordings live in the content-addressed store (see storage.py)
+BLOB_DIR = UPLOAD_DIR / 'blobs'
+BLOB_DIR.mkdir(exist_ok=True)
+blob_store = storage.create_backend(BLOB_DIR, PARTIAL_UPLOAD_DIR)
+
+# Behind nginx, set to an internal location aliased to UPLOAD_DIR to let it serve playback
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX')
+
+# Uploads are copied to disk in fixed-size chunks so per-request memory stays bounded
+UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 1024 * 1024))
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', 512 * 1024 * 1024))
+# A finalize that has not finished within this many seconds (e.g. the process died) can be retried
+UPLOAD_FINALIZE_LEASE = float(os.environ.get('UPLOAD_FINALIZE_LEASE', 300))
+# Answers accepted in one bulk submission (offline/kiosk clients uploading a whole interview)
+BULK_MAX_RESPONSES = int(os.environ.get('BULK_MAX_RESPONSES', 50))
+
+# Resolved sessions are cached per process; logout elsewhere is picked up within the TTL
+SESSION_CACHE_SIZE = int(os.environ.get('SESSION_CACHE_SIZE', 10000))
+SESSION_CACHE_TTL = float(os.environ.get('SESSION_CACHE_TTL', 60))
+
+# Categories and question banks are served from memory and revalidated with ETags
+CATALOG_CACHE_SIZE = int(os.environ.get('CATALOG_CACHE_SIZE', 256))
+CATALOG_CACHE_TTL = float(os.environ.get('CATALOG_CACHE_TTL', 300))
+CATALOG_MAX_AGE = int(os.environ.get('CATALOG_MAX_AGE', 60))
+# Catalog writes bump a version in app_meta; each process checks it this often (seconds) and
+# drops its cache when it moved, so other workers pick up a new question within this delay
+CATALOG_VERSION_CHECK = float(os.environ.get('CATALOG_VERSION_CHECK', 5))
+
+# Keyset pagination for interview and response listings
+PAGE_SIZE = int(os.environ.get('PAGE_SIZE', 100))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 500))
+
+# Serialize trusted documents from our own collections directly instead of re-validating them
+FAST_JSON_RESPONSES = os.environ.get('FAST_JSON_RESPONSES', 'false').lower() == 'true'
+
+# Analysis worker tasks started inside the API process (0 = rely on worker.py only)
+ANALYSIS_EMBEDDED_WORKERS = int(os.environ.get('ANALYSIS_EMBEDDED_WORKERS', 1))
+
+# Operator endpoints (profiles) and on-demand request profiling require this X-Admin-Token; unset disables them
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
 
 # Create the main app without a prefix
 app = FastAPI()
@@ -94,11 +167,41 @@ class InterviewResponse(BaseModel):
     question_text: str
     video_path: Optional[str] = None
     audio_path: Optional[str] = None
+    video_size: Optional[int] = None
+    video_sha256: Optional[str] = None
+    audio_size: Optional[int] = None
+    audio_sha256: Optional[str] = None
     stress_score: Optional[float] = None
     confidence_score: Optional[float] = None
     analysis_data: Optional[dict] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class BulkResponseItem(BaseModel):
+    question_id: str
+    question_text: str
+    video: Optional[str] = None  # name of the multipart field holding the recording
+    audio: Optional[str] = None
+
+class UploadSessionCreate(BaseModel):
+    question_id: str
+    question_text: str
+    kind: str = "video"  # 'video', 'audio'
+
+class UploadSession(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    interview_id: str
+    user_id: str
+    question_id: str
+    question_text: str
+    kind: str
+    status: str = "open"  # 'open', 'finalizing', 'stored', 'completed', 'expired'
+    received_bytes: int = 0
+    next_chunk: int = 0
+    response_id: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
 class AnalysisResult(BaseModel):
     model_config = ConfigDict(extra="ignore")
     
@@ -110,6 +213,87 @@ class AnalysisResult(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 # Helper Functions
+def as_utc_datetime(value) -> datetime:
+    """Normalize a stored timestamp (ISO string or naive BSON datetime) to an aware UTC datetime."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+class SessionCache:
+    """Bounded LRU/TTL cache of session token -> (User, session expiry)."""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, session_token: str) -> Optional[User]:
+        entry = self._entries.get(session_token)
+        if entry is not None:
+            user, expires_at = entry
+            if expires_at > datetime.now(timezone.utc):
+                self.hits += 1
+                return user
+            self._entries.pop(session_token, None)
+        
+        self.misses += 1
+        return None
+    
+    def put(self, session_token: str, user: User, expires_at: datetime):
+        self._entries[session_token] = (user, expires_at)
+    
+    def invalidate(self, session_token: str):
+        self._entries.pop(session_token, None)
+    
+    def contains(self, session_token: str) -> bool:
+        # No hit/miss accounting: used by admission control on every request
+        return session_token in self._entries
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self._entries.maxsize
+        }
+
+session_cache = SessionCache(SESSION_CACHE_SIZE, SESSION_CACHE_TTL)
+
+async def resolve_session_user(session_token: str) -> User:
+    cached_user = session_cache.get(session_token)
+    if cached_user:
+        return cached_user
+    
+    # Find session and its user in a single round-trip
+    matches = await db.user_sessions.aggregate([
+        {"$match": {
+            "session_token": session_token,
+            "expires_at": {"$gt": datetime.now(timezone.utc)}
+        }},
+        {"$limit": 1},
+        {"$lookup": {"from": "users", "localField": "user_id", "foreignField": "id", "as": "user"}},
+        {"$unwind": {"path": "$user", "preserveNullAndEmptyArrays": True}},
+        {"$project": {"_id": 0, "expires_at": 1, "user": 1}}
+    ]).to_list(1)
+    
+    if not matches:
+        raise HTTPException(status_code=401, detail="Invalid or expired session")
+    
+    user_doc = matches[0].get('user')
+    
+    if not user_doc:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    user_doc.pop('_id', None)
+    user = User(**user_doc)
+    session_cache.put(session_token, user, as_utc_datetime(matches[0]['expires_at']))
+    
+    return user
+
 async def get_current_user(request: Request, credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> User:
     # First check cookie
     session_token = request.cookies.get('session_token')
@@ -121,22 +305,145 @@ async def get_current_user(request: Request, credentials: Optional[HTTPAuthoriza
     if not session_token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    # Find session
-    session = await db.user_sessions.find_one({
-        "session_token": session_token,
-        "expires_at": {"$gt": datetime.now(timezone.utc).isoformat()}
-    })
+    return await resolve_session_user(session_token)
+
+async def require_admin(request: Request):
+    token = request.headers.get('x-admin-token', '')
+    if not ADMIN_TOKEN or not secrets.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+# Interviews without the embedded analysis result, which is served by its own route
+INTERVIEW_PROJECTION = {"_id": 0, "analysis": 0, "rollup_baseline": 0}
+# Fields returned by ?view=summary on list routes
+INTERVIEW_SUMMARY_PROJECTION = {
+    "_id": 0, "id": 1, "category_id": 1, "category_name": 1, "status": 1,
+    "started_at": 1, "overall_stress_score": 1, "overall_confidence_score": 1
+}
+RESPONSE_SUMMARY_PROJECTION = {
+    "_id": 0, "id": 1, "interview_id": 1, "question_id": 1, "question_text": 1,
+    "stress_score": 1, "confidence_score": 1, "created_at": 1
+}
+
+def encode_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Both values go into the keyset query: only the (ISO timestamp, id) strings encode_cursor writes are accepted
+    if not isinstance(values, list) or len(values) != 2 or not all(isinstance(value, str) for value in values):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+async def keyset_page(collection, query: dict, sort_field: str, descending: bool, cursor: Optional[str], limit: int, projection: dict):
+    """Fetch one page ordered by (sort_field, id) and return it with the cursor for the next page."""
+    op = "$lt" if descending else "$gt"
+    if cursor:
+        value, last_id = decode_cursor(cursor)
+        query = {**query, "$or": [{sort_field: {op: value}}, {sort_field: value, "id": {op: last_id}}]}
     
-    if not session:
-        raise HTTPException(status_code=401, detail="Invalid or expired session")
+    direction = DESCENDING if descending else ASCENDING
+    docs = await collection.find(query, projection).sort([(sort_field, direction), ("id", direction)]).limit(limit + 1).to_list(limit + 1)
     
-    # Find user
-    user_doc = await db.users.find_one({"id": session["user_id"]}, {"_id": 0})
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1][sort_field], docs[-1]["id"])
     
-    if not user_doc:
-        raise HTTPException(status_code=404, detail="User not found")
+    return docs, next_cursor
+
+class TrustedJSONResponse(JSONResponse):
+    """orjson-rendered response; naive BSON datetimes are emitted as UTC."""
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content,
+            default=str,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+def json_response(content, headers: Optional[dict] = None) -> Response:
+    """Serialize content straight to a response, skipping response_model validation and jsonable_encoder."""
+    if isinstance(content, BaseModel):
+        return Response(content=content.model_dump_json(), media_type="application/json", headers=headers)
+    if orjson is not None:
+        return TrustedJSONResponse(content=content, headers=headers)
+    return JSONResponse(content=jsonable_encoder(content), headers=headers)
+
+def fast_json(content):
+    """Serialize trusted content directly in fast mode; otherwise leave it to FastAPI's default path."""
+    return json_response(content) if FAST_JSON_RESPONSES else content
+
+def page_response(response: Response, docs: list, next_cursor: Optional[str], summary: bool):
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if summary or FAST_JSON_RESPONSES:
+        # Partial documents would not pass response_model validation anyway
+        return json_response(docs, headers)
+    response.headers.update(headers)
+    return docs
+
+async def stream_upload(upload: UploadFile) -> dict:
+    """Stream an upload to the storage backend chunk by chunk, hashing and enforcing MAX_UPLOAD_BYTES on the way."""
+    writer = blob_store.create_writer()
+    hasher = hashlib.sha256()
+    size = 0
+    started = time.perf_counter()
+    outcome = "failed"
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                outcome = "too_large"
+                raise HTTPException(status_code=413, detail="Upload exceeds maximum allowed size")
+            hasher.update(chunk)
+            await writer.write(chunk)
+        await writer.close()
+        outcome = "stored"
+    except BaseException:
+        await writer.abort()
+        raise
+    finally:
+        await upload.close()
+        metrics.record_upload("form", size, time.perf_counter() - started, outcome)
     
-    return User(**user_doc)
+    return {"writer": writer, "size": size, "sha256": hasher.hexdigest()}
+
+async def store_recording(staged: dict) -> dict:
+    """Hand a fully written upload to the blob store, which dedupes it by content hash."""
+    location = await storage.store_blob(db, blob_store, staged["writer"], staged["sha256"], staged["size"])
+    return {"path": location, "size": staged["size"], "sha256": staged["sha256"]}
+
+async def release_recordings(saved: dict):
+    for stored in saved.values():
+        await storage.release_blob(db, stored["sha256"])
+
+def new_response(interview_id: str, question_id: str, question_text: str, saved: dict) -> InterviewResponse:
+    """A response record for recordings already in the blob store."""
+    return InterviewResponse(
+        interview_id=interview_id,
+        question_id=question_id,
+        question_text=question_text,
+        **{
+            f"{kind}_{field}": stored[field]
+            for kind, stored in saved.items()
+            for field in ("path", "size", "sha256")
+        }
+    )
+
+def response_document(response: InterviewResponse) -> dict:
+    response_dict = response.model_dump()
+    response_dict['created_at'] = response_dict['created_at'].isoformat()
+    return response_dict
+
+async def insert_response(interview_id: str, question_id: str, question_text: str, saved: dict) -> InterviewResponse:
+    response = new_response(interview_id, question_id, question_text, saved)
+    await db.interview_responses.insert_one(response_document(response))
+    return response
 
 # Auth Routes
 @api_router.post("/auth/session")
@@ -183,10 +490,17 @@ async def create_session(request: Request, response: Response):
         expires_at=expires_at
     )
     
-    session_dict = new_session.model_dump()
-    session_dict['expires_at'] = session_dict['expires_at'].isoformat()
-    session_dict['created_at'] = session_dict['created_at'].isoformat()
-    await db.user_sessions.insert_one(session_dict)
+    # Native datetimes so the TTL index on expires_at can purge the session. Upserted on the
+    # (unique) token so posting the same session_id again refreshes it instead of failing
+    await db.user_sessions.update_one(
+        {"session_token": session_token},
+        {
+            "$set": {"user_id": new_session.user_id, "expires_at": new_session.expires_at},
+            "$setOnInsert": {"created_at": new_session.created_at}
+        },
+        upsert=True
+    )
+    session_cache.invalidate(session_token)
     
     # Set cookie - adjusted for local development
     is_development = os.environ.get('CORS_ORIGINS', '').startswith('http://localhost')
@@ -204,7 +518,7 @@ async def create_session(request: Request, response: Response):
 
 @api_router.get("/auth/me")
 async def get_me(user: User = Depends(get_current_user)):
-    return user
+    return fast_json(user)
 
 @api_router.post("/auth/logout")
 async def logout(request: Request, response: Response):
@@ -212,6 +526,7 @@ async def logout(request: Request, response: Response):
     
     if session_token:
         await db.user_sessions.delete_one({"session_token": session_token})
+        session_cache.invalidate(session_token)
     
     response.delete_cookie(key="session_token", path="/")
     return {"message": "Logged out successfully"}
@@ -237,7 +552,6 @@ async def debug_login(response: Response):
         test_user = User(**existing_user)
     
     # Create session
-    import secrets
     session_token = secrets.token_urlsafe(32)
     expires_at = datetime.now(timezone.utc) + timedelta(days=7)
     
@@ -247,10 +561,9 @@ async def debug_login(response: Response):
         expires_at=expires_at
     )
     
-    session_dict = new_session.model_dump()
-    session_dict['expires_at'] = session_dict['expires_at'].isoformat()
-    session_dict['created_at'] = session_dict['created_at'].isoformat()
-    await db.user_sessions.insert_one(session_dict)
+    # Native datetimes so the TTL index on expires_at can purge the session
+    await db.user_sessions.insert_one(new_session.model_dump())
+    session_cache.invalidate(session_token)
     
     # Set cookie for local development
     response.set_cookie(
@@ -265,17 +578,62 @@ async def debug_login(response: Response):
     
     return {"user": test_user.model_dump(), "session_token": session_token}
 
+# Catalog cache: key -> (serialized body, strong ETag)
+catalog_cache = TTLCache(maxsize=CATALOG_CACHE_SIZE, ttl=CATALOG_CACHE_TTL)
+catalog_version = {"value": None, "checked_at": 0.0}
+
+async def sync_catalog_version():
+    now = time.monotonic()
+    if now - catalog_version["checked_at"] < CATALOG_VERSION_CHECK:
+        return
+    catalog_version["checked_at"] = now
+    meta = await db.app_meta.find_one({"_id": "catalog"}, {"version": 1})
+    version = (meta or {}).get("version", 0)
+    if version != catalog_version["value"]:
+        catalog_cache.clear()
+        catalog_version["value"] = version
+
+async def cached_catalog(key: str, model, load) -> tuple:
+    await sync_catalog_version()
+    entry = catalog_cache.get(key)
+    if entry is None:
+        # Validate and serialize once per fill instead of on every request
+        adapter = TypeAdapter(List[model])
+        body = adapter.dump_json(adapter.validate_python(await load()))
+        entry = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        catalog_cache[key] = entry
+    return entry
+
+def etag_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={CATALOG_MAX_AGE}, must-revalidate"}
+    
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    if_none_match = request.headers.get('if-none-match', '')
+    candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    if etag in candidates or '*' in candidates:
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
 # Interview Categories Routes
 @api_router.get("/categories", response_model=List[InterviewCategory])
-async def get_categories():
-    categories = await db.interview_categories.find({}, {"_id": 0}).to_list(1000)
-    return categories
+async def get_categories(request: Request):
+    body, etag = await cached_catalog(
+        "categories",
+        InterviewCategory,
+        lambda: db.interview_categories.find({}, {"_id": 0}).to_list(1000)
+    )
+    return etag_response(request, body, etag)
 
 # Questions Routes
 @api_router.get("/questions/{category_id}", response_model=List[Question])
-async def get_questions(category_id: str):
-    questions = await db.questions.find({"category_id": category_id}, {"_id": 0}).to_list(1000)
-    return questions
+async def get_questions(category_id: str, request: Request):
+    body, etag = await cached_catalog(
+        f"questions:{category_id}",
+        Question,
+        lambda: db.questions.find({"category_id": category_id}, {"_id": 0}).to_list(1000)
+    )
+    return etag_response(request, body, etag)
 
 @api_router.post("/questions", response_model=Question)
 async def create_question(question: QuestionCreate, user: User = Depends(get_current_user)):
@@ -288,8 +646,11 @@ async def create_question(question: QuestionCreate, user: User = Depends(get_cur
     question_dict = new_question.model_dump()
     question_dict['created_at'] = question_dict['created_at'].isoformat()
     await db.questions.insert_one(question_dict)
+    # Other processes see the new version on their next check and drop their cached copies
+    await db.app_meta.update_one({"_id": "catalog"}, {"$inc": {"version": 1}}, upsert=True)
+    catalog_cache.pop(f"questions:{question.category_id}", None)
     
-    return new_question
+    return fast_json(new_question)
 
 # Interview Routes
 @api_router.post("/interviews")
@@ -311,20 +672,73 @@ async def create_interview(data: dict, user: User = Depends(get_current_user)):
     interview_dict = new_interview.model_dump()
     interview_dict['started_at'] = interview_dict['started_at'].isoformat()
     await db.interviews.insert_one(interview_dict)
+    await stats.record_interview_started(db, user.id, category_id, category['name'])
     
-    return new_interview.model_dump()
+    return fast_json(new_interview)
 
 @api_router.get("/interviews", response_model=List[Interview])
-async def get_interviews(user: User = Depends(get_current_user)):
-    interviews = await db.interviews.find({"user_id": user.id}, {"_id": 0}).sort("started_at", -1).to_list(1000)
-    return interviews
+async def get_interviews(
+    response: Response,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|summary)$"),
+    user: User = Depends(get_current_user)
+):
+    interviews, next_cursor = await keyset_page(
+        db.interviews,
+        {"user_id": user.id},
+        "started_at",
+        True,
+        cursor,
+        limit,
+        INTERVIEW_SUMMARY_PROJECTION if view == "summary" else INTERVIEW_PROJECTION
+    )
+    return page_response(response, interviews, next_cursor, view == "summary")
+
+@api_router.get("/stats/me")
+async def get_my_stats(user: User = Depends(get_current_user)):
+    return fast_json(await stats.get_user_stats(db, user.id))
 
 @api_router.get("/interviews/{interview_id}")
 async def get_interview(interview_id: str, user: User = Depends(get_current_user)):
-    interview = await db.interviews.find_one({"id": interview_id, "user_id": user.id}, {"_id": 0})
+    interview = await db.interviews.find_one({"id": interview_id, "user_id": user.id}, INTERVIEW_PROJECTION)
     if not interview:
         raise HTTPException(status_code=404, detail="Interview not found")
-    return interview
+    return fast_json(interview)
+
+@api_router.get("/interviews/{interview_id}/bootstrap")
+async def get_interview_bootstrap(interview_id: str, user: User = Depends(get_current_user)):
+    """Everything the interview screen needs, assembled in a single aggregation."""
+    matches = await db.interviews.aggregate([
+        {"$match": {"id": interview_id, "user_id": user.id}},
+        {"$limit": 1},
+        {"$lookup": {"from": "interview_categories", "localField": "category_id", "foreignField": "id", "as": "category"}},
+        {"$lookup": {"from": "questions", "localField": "category_id", "foreignField": "category_id", "as": "questions"}},
+        {"$lookup": {"from": "interview_responses", "localField": "id", "foreignField": "interview_id", "as": "responses"}},
+        {"$project": {
+            "_id": 0,
+            "analysis": 0,
+            "category._id": 0,
+            "questions._id": 0,
+            "responses._id": 0,
+            "responses.analysis_data": 0
+        }}
+    ]).to_list(1)
+    
+    if not matches:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    
+    interview = matches[0]
+    category = interview.pop('category')
+    questions = interview.pop('questions')
+    responses = sorted(interview.pop('responses'), key=lambda r: (r['created_at'], r['id']))
+    
+    return fast_json({
+        "interview": interview,
+        "category": category[0] if category else None,
+        "questions": questions,
+        "responses": responses
+    })
 
 @api_router.post("/interviews/{interview_id}/responses")
 async def save_response(
@@ -336,80 +750,398 @@ async def save_response(
     user: User = Depends(get_current_user)
 ):
     # Verify interview belongs to user
-    interview = await db.interviews.find_one({"id": interview_id, "user_id": user.id})
+    interview = await db.interviews.find_one({"id": interview_id, "user_id": user.id}, {"_id": 1})
     if not interview:
         raise HTTPException(status_code=404, detail="Interview not found")
     
-    # Save files
-    video_path = None
-    audio_path = None
-    
-    if video:
-        video_filename = f"{interview_id}_{question_id}_{uuid.uuid4()}.webm"
-        video_path = str(UPLOAD_DIR / video_filename)
-        async with aiofiles.open(video_path, 'wb') as f:
-            content = await video.read()
-            await f.write(content)
-    
-    if audio:
-        audio_filename = f"{interview_id}_{question_id}_{uuid.uuid4()}.webm"
-        audio_path = str(UPLOAD_DIR / audio_filename)
-        async with aiofiles.open(audio_path, 'wb') as f:
-            content = await audio.read()
-            await f.write(content)
-    
-    # Create response record
-    response = InterviewResponse(
-        interview_id=interview_id,
-        question_id=question_id,
-        question_text=question_text,
-        video_path=video_path,
-        audio_path=audio_path
-    )
-    
-    response_dict = response.model_dump()
-    response_dict['created_at'] = response_dict['created_at'].isoformat()
-    await db.interview_responses.insert_one(response_dict)
+    # Stream files to the storage backend, then publish them under their content hash
+    saved = {}
+    try:
+        for kind, upload in (("video", video), ("audio", audio)):
+            if upload:
+                saved[kind] = await store_recording(await stream_upload(upload))
+        
+        response = await insert_response(interview_id, question_id, question_text, saved)
+    except BaseException:
+        # Give back the references taken for recordings that will not be saved
+        await release_recordings(saved)
+        raise
     
     return {"message": "Response saved", "response_id": response.id}
 
+@api_router.post("/interviews/{interview_id}/responses/bulk")
+async def save_responses_bulk(interview_id: str, request: Request, user: User = Depends(get_current_user)):
+    """Save several answers from one multipart request.
+    
+    The `manifest` field is a JSON list of {question_id, question_text, video, audio}, where
+    video/audio name the file fields holding that answer's recordings. All answers are
+    written with a single insert_many; on any error none of them is saved.
+    """
+    # Verify interview belongs to user
+    interview = await db.interviews.find_one({"id": interview_id, "user_id": user.id}, {"_id": 1})
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    
+    async with request.form(max_files=BULK_MAX_RESPONSES * 2, max_fields=BULK_MAX_RESPONSES * 2 + 1) as form:
+        try:
+            items = TypeAdapter(List[BulkResponseItem]).validate_json(form.get('manifest') or '')
+        except ValueError:
+            raise HTTPException(status_code=400, detail="manifest must be a JSON list of answers")
+        if not items or len(items) > BULK_MAX_RESPONSES:
+            raise HTTPException(status_code=400, detail=f"Submit between 1 and {BULK_MAX_RESPONSES} answers")
+        
+        # Check every answer before storing anything
+        uploads = []
+        used = set()
+        for item in items:
+            fields = {kind: getattr(item, kind) for kind in ("video", "audio") if getattr(item, kind)}
+            # Each file field is streamed once, so no two recordings may name the same one
+            if len(set(fields.values())) != len(fields) or any(
+                not isinstance(form.get(field), StarletteUploadFile) or field in used for field in fields.values()
+            ):
+                raise HTTPException(status_code=400, detail=f"Missing recording for question {item.question_id}")
+            used.update(fields.values())
+            uploads.append((item, {kind: form[field] for kind, field in fields.items()}))
+        
+        responses = []
+        saved = {}
+        try:
+            for index, (item, files) in enumerate(uploads):
+                recordings = {}
+                for kind, upload in files.items():
+                    recordings[kind] = saved[(index, kind)] = await store_recording(await stream_upload(upload))
+                responses.append(new_response(interview_id, item.question_id, item.question_text, recordings))
+            
+            await db.interview_responses.insert_many([response_document(response) for response in responses])
+        except BaseException:
+            # Give back the references taken for recordings that will not be saved
+            await release_recordings(saved)
+            raise
+    
+    return {"message": "Responses saved", "response_ids": [response.id for response in responses]}
+
 @api_router.get("/interviews/{interview_id}/responses")
-async def get_responses(interview_id: str, user: User = Depends(get_current_user)):
+async def get_responses(
+    interview_id: str,
+    response: Response,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|summary)$"),
+    user: User = Depends(get_current_user)
+):
     # Verify interview belongs to user
-    interview = await db.interviews.find_one({"id": interview_id, "user_id": user.id})
+    interview = await db.interviews.find_one({"id": interview_id, "user_id": user.id}, {"_id": 1})
     if not interview:
         raise HTTPException(status_code=404, detail="Interview not found")
     
-    responses = await db.interview_responses.find({"interview_id": interview_id}, {"_id": 0}).to_list(1000)
-    return responses
+    responses, next_cursor = await keyset_page(
+        db.interview_responses,
+        {"interview_id": interview_id},
+        "created_at",
+        False,
+        cursor,
+        limit,
+        RESPONSE_SUMMARY_PROJECTION if view == "summary" else {"_id": 0}
+    )
+    return page_response(response, responses, next_cursor, view == "summary")
 
-@api_router.post("/interviews/{interview_id}/analyze")
-async def analyze_interview(interview_id: str, data: dict, user: User = Depends(get_current_user)):
+# Resumable Upload Routes
+async def get_upload_session(interview_id: str, upload_id: str, user: User) -> UploadSession:
+    session = await db.upload_sessions.find_one(
+        {"id": upload_id, "interview_id": interview_id, "user_id": user.id},
+        {"_id": 0}
+    )
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return UploadSession(**session)
+
+def partial_upload_path(upload_id: str) -> Path:
+    return PARTIAL_UPLOAD_DIR / f"{upload_id}.part"
+
+@api_router.post("/interviews/{interview_id}/uploads")
+async def create_upload_session(interview_id: str, data: UploadSessionCreate, user: User = Depends(get_current_user)):
     # Verify interview belongs to user
-    interview = await db.interviews.find_one({"id": interview_id, "user_id": user.id})
+    interview = await db.interviews.find_one({"id": interview_id, "user_id": user.id}, {"_id": 1})
     if not interview:
         raise HTTPException(status_code=404, detail="Interview not found")
     
-    # Here you would integrate with your custom analysis code
-    # For now, we'll use the provided data from frontend
-    overall_stress = data.get('overall_stress', 0)
-    overall_confidence = data.get('overall_confidence', 0)
-    detailed_metrics = data.get('detailed_metrics', {})
+    if data.kind not in ("video", "audio"):
+        raise HTTPException(status_code=400, detail="kind must be 'video' or 'audio'")
     
-    # Update interview
-    await db.interviews.update_one(
-        {"id": interview_id},
+    session = UploadSession(
+        interview_id=interview_id,
+        user_id=user.id,
+        question_id=data.question_id,
+        question_text=data.question_text,
+        kind=data.kind
+    )
+    
+    session_dict = session.model_dump()
+    session_dict['created_at'] = session_dict['created_at'].isoformat()
+    await db.upload_sessions.insert_one(session_dict)
+    partial_upload_path(session.id).touch()
+    
+    return session.model_dump()
+
+@api_router.get("/interviews/{interview_id}/uploads/{upload_id}")
+async def get_upload_status(interview_id: str, upload_id: str, user: User = Depends(get_current_user)):
+    session = await get_upload_session(interview_id, upload_id, user)
+    return session.model_dump()
+
+@api_router.put("/interviews/{interview_id}/uploads/{upload_id}/chunks/{chunk_index}")
+async def upload_chunk(
+    interview_id: str,
+    upload_id: str,
+    chunk_index: int,
+    request: Request,
+    user: User = Depends(get_current_user)
+):
+    session = await get_upload_session(interview_id, upload_id, user)
+    
+    if session.status != "open":
+        raise HTTPException(status_code=409, detail="Upload session is no longer open")
+    
+    # Retried chunk that was already acknowledged
+    if chunk_index < session.next_chunk:
+        return {"next_chunk": session.next_chunk, "received_bytes": session.received_bytes}
+    
+    if chunk_index > session.next_chunk:
+        raise HTTPException(status_code=409, detail=f"Expected chunk {session.next_chunk}")
+    
+    # Append after the last acknowledged byte, discarding any half-written retry
+    received_bytes = session.received_bytes
+    started = time.perf_counter()
+    outcome = "failed"
+    try:
+        async with aiofiles.open(partial_upload_path(upload_id), 'r+b') as f:
+            await f.truncate(received_bytes)
+            await f.seek(received_bytes)
+            async for chunk in request.stream():
+                received_bytes += len(chunk)
+                if received_bytes > MAX_UPLOAD_BYTES:
+                    outcome = "too_large"
+                    raise HTTPException(status_code=413, detail="Upload exceeds maximum allowed size")
+                await f.write(chunk)
+        outcome = "stored"
+    finally:
+        metrics.record_upload("chunk", received_bytes - session.received_bytes, time.perf_counter() - started, outcome)
+    
+    result = await db.upload_sessions.update_one(
+        {"id": upload_id, "status": "open", "next_chunk": chunk_index},
+        {"$set": {"received_bytes": received_bytes, "updated_at": datetime.now(timezone.utc)}, "$inc": {"next_chunk": 1}}
+    )
+    if result.modified_count == 0:
+        raise HTTPException(status_code=409, detail="Chunk was acknowledged concurrently")
+    
+    return {"next_chunk": chunk_index + 1, "received_bytes": received_bytes}
+
+@api_router.post("/interviews/{interview_id}/uploads/{upload_id}/complete")
+async def complete_upload(interview_id: str, upload_id: str, user: User = Depends(get_current_user)):
+    session = await get_upload_session(interview_id, upload_id, user)
+    
+    if session.status == "completed":
+        return {"message": "Response saved", "response_id": session.response_id}
+    
+    # Claim the session so a duplicate finalize cannot create a second response; a claim
+    # whose lease ran out belongs to a finalize that died and can be taken over
+    now = datetime.now(timezone.utc)
+    claimed = await db.upload_sessions.find_one_and_update(
         {
-            "$set": {
-                "status": "completed",
-                "completed_at": datetime.now(timezone.utc).isoformat(),
-                "overall_stress_score": overall_stress,
-                "overall_confidence_score": overall_confidence
-            }
-        }
+            "id": upload_id,
+            "$or": [
+                {"status": {"$in": ["open", "stored"]}},
+                {"status": "finalizing", "finalizing_at": {"$lt": now - timedelta(seconds=UPLOAD_FINALIZE_LEASE)}}
+            ]
+        },
+        {"$set": {"status": "finalizing", "finalizing_at": now, "updated_at": now}}
+    )
+    if not claimed:
+        raise HTTPException(status_code=409, detail="Upload session is already being finalized")
+    
+    # A previous attempt may already have moved the bytes into the blob store
+    stored = claimed.get('stored')
+    try:
+        if not stored:
+            # Hash the acknowledged bytes and move them into the blob store
+            partial_path = partial_upload_path(upload_id)
+            hasher = hashlib.sha256()
+            async with aiofiles.open(partial_path, 'r+b') as f:
+                await f.truncate(session.received_bytes)
+                while True:
+                    chunk = await f.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+            
+            sha256 = hasher.hexdigest()
+            location = await storage.store_file(db, blob_store, partial_path, sha256, session.received_bytes)
+            stored = {"path": location, "size": session.received_bytes, "sha256": sha256}
+            # The session holds the blob's reference until a response takes it over
+            await db.upload_sessions.update_one({"id": upload_id}, {"$set": {"stored": stored}})
+        
+        response = await insert_response(interview_id, session.question_id, session.question_text, {session.kind: stored})
+    except BaseException:
+        # Hand the session back so the client can retry; once stored, no more chunks are accepted
+        await db.upload_sessions.update_one(
+            {"id": upload_id, "status": "finalizing", "finalizing_at": now},
+            {"$set": {"status": "stored" if stored else "open", "stored": stored}, "$unset": {"finalizing_at": ""}}
+        )
+        raise
+    
+    await db.upload_sessions.update_one(
+        {"id": upload_id},
+        {"$set": {"status": "completed", "response_id": response.id, "updated_at": datetime.now(timezone.utc)}}
     )
     
-    # Save analysis result
+    return {"message": "Response saved", "response_id": response.id}
+
+# Playback
+@api_router.get("/responses/{response_id}/media")
+async def get_response_media(
+    response_id: str,
+    request: Request,
+    kind: Optional[str] = Query(None, pattern="^(video|audio)$"),
+    user: User = Depends(get_current_user)
+):
+    # Find the response and verify its interview belongs to user in one round-trip
+    matches = await db.interview_responses.aggregate([
+        {"$match": {"id": response_id}},
+        {"$limit": 1},
+        {"$lookup": {"from": "interviews", "localField": "interview_id", "foreignField": "id", "as": "interview"}},
+        {"$match": {"interview.user_id": user.id}},
+        {"$project": {"_id": 0, "video_path": 1, "video_sha256": 1, "audio_path": 1, "audio_sha256": 1}}
+    ]).to_list(1)
+    if not matches:
+        raise HTTPException(status_code=404, detail="Response not found")
+    
+    stored = matches[0]
+    kind = kind or ("video" if stored.get('video_path') else "audio")
+    location = stored.get(f"{kind}_path")
+    if not location:
+        raise HTTPException(status_code=404, detail="Recording not found")
+    
+    media_type = media.MEDIA_TYPES[kind]
+    url = blob_store.media_url(location, media_type)
+    if url:
+        return RedirectResponse(url, status_code=307)
+    
+    return await media.serve_file(
+        request,
+        Path(location),
+        media_type,
+        etag=stored.get(f"{kind}_sha256"),
+        accel_root=UPLOAD_DIR,
+        accel_prefix=MEDIA_ACCEL_REDIRECT_PREFIX
+    )
+
+# Analysis
+async def analyze_stored_video(location: str) -> Optional[dict]:
+    async with blob_store.localize(location) as local_path:
+        return await video.analyze_video(str(local_path))
+
+async def score_interview(interview_id: str, data: dict, report_progress: Optional[jobs.ProgressCallback] = None):
+    """Score every stored recording of an interview and aggregate the results.
+    
+    Falls back to the client-supplied values when no recording could be analyzed. Also
+    returns (response_id, question_id, new scores) for every re-scored answer.
+    """
+    responses = await db.interview_responses.find({"interview_id": interview_id}, {"_id": 0}).to_list(1000)
+    
+    # Every video goes to the process pool up front and is decoded while the audio is scored
+    video_results = {
+        response['id']: asyncio.ensure_future(analyze_stored_video(response['video_path']))
+        for response in responses
+        if response.get('video_path') and video.available()
+    }
+    
+    scored = []
+    updates = []
+    answers = []
+    try:
+        for index, response in enumerate(responses):
+            if report_progress:
+                await report_progress(index, len(responses))
+            
+            path = response.get('audio_path') or response.get('video_path')
+            if not path:
+                continue
+            
+            try:
+                async with blob_store.localize(path) as local_path:
+                    result = await asyncio.to_thread(analyze_recording, str(local_path))
+            except AudioDecodeError as e:
+                logger.warning(f"Could not analyze response {response['id']}: {e}")
+                result = None
+            
+            video_features = await video_results[response['id']] if response['id'] in video_results else None
+            
+            if result is None:
+                if video_features:
+                    updates.append(UpdateOne(
+                        {"id": response['id']},
+                        {"$set": {"analysis_data.video": video_features}}
+                    ))
+                continue
+            
+            analysis_data = {"audio": result['features']}
+            if video_features:
+                analysis_data["video"] = video_features
+            
+            updates.append(UpdateOne(
+                {"id": response['id']},
+                {
+                    "$set": {
+                        "stress_score": result['stress_score'],
+                        "confidence_score": result['confidence_score'],
+                        "analysis_data": analysis_data
+                    }
+                }
+            ))
+            answers.append((response['id'], response['question_id'], rankings.scores_of(result)))
+            
+            if result['stress_score'] is not None:
+                scored.append({
+                    "response_id": response['id'],
+                    "question": response['question_text'],
+                    "stress": result['stress_score'],
+                    "confidence": result['confidence_score'],
+                    "speech_seconds": result['features']['speech_seconds'],
+                    "features": result['features'],
+                    "video": video_features
+                })
+    except BaseException:
+        # Audio scoring failed or the job was cancelled: stop the videos still queued in the pool
+        for future in video_results.values():
+            future.cancel()
+        raise
+    
+    # Per-answer scores go out in one round trip
+    if updates:
+        await db.interview_responses.bulk_write(updates, ordered=False)
+    
+    if not scored:
+        return (
+            data.get('overall_stress', 0),
+            data.get('overall_confidence', 0),
+            {**data.get('detailed_metrics', {}), "source": "client"},
+            answers
+        )
+    
+    # Weight each answer by how much the candidate actually spoke
+    total_speech = sum(item['speech_seconds'] for item in scored)
+    overall_stress = round(sum(item['stress'] * item['speech_seconds'] for item in scored) / total_speech, 1)
+    overall_confidence = round(sum(item['confidence'] * item['speech_seconds'] for item in scored) / total_speech, 1)
+    
+    return overall_stress, overall_confidence, {"source": "server", "responses": scored}, answers
+
+async def process_analysis_job(job: dict, report_progress: jobs.ProgressCallback):
+    interview_id = job['interview_id']
+    # Pinned before scoring overwrites any answer, so a retry after a crash still applies
+    # the rollup deltas against what the rollups actually hold
+    interview = await stats.pin_rollup_baseline(db, interview_id)
+    baseline = interview['rollup_baseline']
+    overall_stress, overall_confidence, detailed_metrics, scores = await score_interview(interview_id, job['payload'], report_progress)
+    
     result = AnalysisResult(
         interview_id=interview_id,
         overall_stress=overall_stress,
@@ -419,32 +1151,303 @@ async def analyze_interview(interview_id: str, data: dict, user: User = Depends(
     
     result_dict = result.model_dump()
     result_dict['created_at'] = result_dict['created_at'].isoformat()
-    await db.analysis_results.insert_one(result_dict)
     
-    return {"message": "Analysis saved", "result": result.model_dump()}
+    # Status, scores and the analysis result land in one atomic write to the interview
+    await db.interviews.update_one(
+        {"id": interview_id},
+        {
+            "$set": {
+                "status": "completed",
+                "completed_at": datetime.now(timezone.utc).isoformat(),
+                "overall_stress_score": overall_stress,
+                "overall_confidence_score": overall_confidence,
+                "analysis": result_dict
+            }
+        }
+    )
+    
+    # Each rollup skips a job it already holds, so a retry finishes what a crash interrupted
+    previous = {**interview, **baseline}
+    answers = [
+        (question_id, tuple(baseline['answers'][response_id]) if response_id in baseline['answers'] else None, current)
+        for response_id, question_id, current in scores
+    ]
+    await stats.record_interview_scored(db, previous, overall_stress, overall_confidence, job['id'])
+    await rankings.record_interview_scored(db, previous, overall_stress, overall_confidence, answers, job['id'])
+    await stats.clear_rollup_baseline(db, interview_id)
+    
+    # Shrink the stored recordings now that the originals are no longer needed for scoring
+    if tiering.TIERING_ENABLED:
+        await jobs.enqueue_analysis_job(db, interview_id, job['user_id'], {}, job_type=jobs.TIERING_JOB)
+    
+    await report_progress(1, 1)
+
+async def process_tiering_job(job: dict, report_progress: jobs.ProgressCallback):
+    await tiering.tier_interview(db, blob_store, PARTIAL_UPLOAD_DIR, job['interview_id'], report_progress)
+    await report_progress(1, 1)
+
+JOB_HANDLERS = {
+    jobs.ANALYSIS_JOB: process_analysis_job,
+    jobs.TIERING_JOB: process_tiering_job
+}
+
+async def process_job(job: dict, report_progress: jobs.ProgressCallback):
+    await JOB_HANDLERS[job.get('type', jobs.ANALYSIS_JOB)](job, report_progress)
+
+@api_router.post("/interviews/{interview_id}/analyze", status_code=202)
+async def analyze_interview(interview_id: str, data: dict, user: User = Depends(get_current_user)):
+    # Verify interview belongs to user
+    interview = await db.interviews.find_one({"id": interview_id, "user_id": user.id}, {"_id": 1})
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    
+    # Scoring decodes every recording, so it runs on an analysis worker
+    job = await jobs.enqueue_analysis_job(db, interview_id, user.id, data)
+    
+    return {"message": "Analysis queued", "job": jobs.public_job(job)}
+
+@api_router.get("/interviews/{interview_id}/analysis/status")
+async def get_analysis_status(interview_id: str, user: User = Depends(get_current_user)):
+    # Verify interview belongs to user
+    interview = await db.interviews.find_one({"id": interview_id, "user_id": user.id}, {"_id": 1, "status": 1})
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    
+    job = await jobs.get_latest_job(db, interview_id)
+    if job:
+        return jobs.public_job(job)
+    
+    # Interviews analyzed before the job queue existed
+    if interview['status'] == 'completed':
+        return {"interview_id": interview_id, "status": "completed"}
+    
+    raise HTTPException(status_code=404, detail="Analysis not requested")
 
 @api_router.get("/interviews/{interview_id}/analysis")
 async def get_analysis(interview_id: str, user: User = Depends(get_current_user)):
     # Verify interview belongs to user
-    interview = await db.interviews.find_one({"id": interview_id, "user_id": user.id})
+    interview = await db.interviews.find_one({"id": interview_id, "user_id": user.id}, {"_id": 1, "analysis": 1})
     if not interview:
         raise HTTPException(status_code=404, detail="Interview not found")
     
-    analysis = await db.analysis_results.find_one({"interview_id": interview_id}, {"_id": 0})
+    # Analyses stored before results were embedded in the interview
+    analysis = interview.get('analysis') or await db.analysis_results.find_one({"interview_id": interview_id}, {"_id": 0})
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
-    return analysis
+    return fast_json(analysis)
+
+@api_router.get("/interviews/{interview_id}/ranking")
+async def get_ranking(interview_id: str, user: User = Depends(get_current_user)):
+    """Percentile of the interview and each answer among everyone in its category."""
+    interview = await db.interviews.find_one(
+        {"id": interview_id, "user_id": user.id},
+        {"_id": 0, "id": 1, "category_id": 1, "status": 1, "overall_stress_score": 1, "overall_confidence_score": 1}
+    )
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    
+    if interview['status'] != 'completed':
+        raise HTTPException(status_code=409, detail="Interview has not been analyzed yet")
+    
+    return fast_json(await rankings.get_interview_ranking(db, interview))
+
+# Live Scoring
+# Sockets currently streaming in this process, capped at live.LIVE_MAX_CONNECTIONS
+live_sockets = set()
+
+def live_origin_allowed(websocket: WebSocket) -> bool:
+    # Browsers send cookies on cross-site WebSocket handshakes, so CORS_ORIGINS is enforced here too
+    allowed = os.environ.get('CORS_ORIGINS', '*').split(',')
+    origin = websocket.headers.get('origin')
+    return '*' in allowed or origin is None or origin in allowed
+
+async def send_live_scores(websocket: WebSocket, scorer: live.LiveScorer, lock: asyncio.Lock, drained: asyncio.Event):
+    try:
+        while True:
+            await asyncio.sleep(live.LIVE_SCORE_INTERVAL)
+            
+            # Scoring runs off the event loop; the lock keeps pushes out of the buffers meanwhile
+            async with lock:
+                result = await asyncio.to_thread(scorer.update)
+            drained.set()
+            
+            if result and result['stress_score'] is not None:
+                await websocket.send_json({
+                    "type": "score",
+                    "stress_score": result['stress_score'],
+                    "confidence_score": result['confidence_score'],
+                    "audio_seconds": result['audio_seconds'],
+                    "speech_rate": result['features']['speech_rate'],
+                    "pause_ratio": result['features']['pause_ratio']
+                })
+    finally:
+        # Never leave the receive loop parked on backpressure after a failed send
+        drained.set()
+
+@api_router.websocket("/interviews/{interview_id}/live")
+async def live_scoring(websocket: WebSocket, interview_id: str):
+    """Stream 16 kHz mono s16le PCM as binary messages; score updates come back as JSON."""
+    if not live_origin_allowed(websocket):
+        await websocket.close(code=1008)
+        return
+    
+    # Browsers cannot set headers on WebSocket handshakes: cookie first, then ?token=
+    session_token = websocket.cookies.get('session_token') or websocket.query_params.get('token')
+    try:
+        if not session_token:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        user = await resolve_session_user(session_token)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    
+    # Verify interview belongs to user
+    interview = await db.interviews.find_one({"id": interview_id, "user_id": user.id}, {"_id": 1})
+    if not interview:
+        await websocket.close(code=1008)
+        return
+    
+    if len(live_sockets) >= live.LIVE_MAX_CONNECTIONS:
+        await websocket.close(code=1013)
+        return
+    
+    await websocket.accept()
+    live_sockets.add(websocket)
+    
+    scorer = live.LiveScorer()
+    lock = asyncio.Lock()
+    drained = asyncio.Event()
+    scoring = asyncio.create_task(send_live_scores(websocket, scorer, lock, drained))
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            # Text messages (client keepalives) carry no audio
+            data = message.get("bytes")
+            if not data:
+                continue
+            
+            if len(data) > live.LIVE_MAX_MESSAGE_BYTES:
+                await websocket.close(code=1009)
+                break
+            if len(data) % 2:
+                await websocket.close(code=1003)
+                break
+            
+            # Backpressure: stop reading until the scorer has drained the buffer
+            while not scorer.has_room(len(data) // 2) and not scoring.done():
+                drained.clear()
+                await drained.wait()
+            if scoring.done():
+                break
+            
+            async with lock:
+                scorer.push(data)
+    finally:
+        scoring.cancel()
+        await asyncio.gather(scoring, return_exceptions=True)
+        live_sockets.discard(websocket)
+
+# Prometheus scrape endpoint and probes, outside /api so they can be reached directly
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return metrics.metrics_response()
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is serving. Does not touch the database."""
+    return {
+        "status": "ok",
+        "mongo_pool": database.pool_monitor.stats(),
+        "session_cache": session_cache.stats(),
+        "admission": admission.stats()
+    }
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: MongoDB answers and the connection pool has headroom."""
+    ready, reason = await database.check_ready(db)
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": reason, "mongo_pool": database.pool_monitor.stats()}
+    )
+
+# Exports
+def export_response(request: Request, match: dict, format: str, name: str) -> StreamingResponse:
+    """Stream matching interviews with their responses and analysis, gzipped when the client accepts it."""
+    compress = "gzip" in request.headers.get("accept-encoding", "")
+    headers = {
+        "Content-Disposition": f'attachment; filename="{name}.{format}"',
+        "Vary": "Accept-Encoding"
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    
+    return StreamingResponse(
+        export.stream_export(export.export_cursor(db, match), format, compress),
+        media_type=export.EXPORT_FORMATS[format],
+        headers=headers
+    )
+
+@api_router.get("/export/me")
+async def export_my_history(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    user: User = Depends(get_current_user)
+):
+    return export_response(request, {"user_id": user.id}, format, "interviews")
+
+@api_router.get("/admin/export", dependencies=[Depends(require_admin)])
+async def export_all(
+    request: Request,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$")
+):
+    """Every user's interviews started in [start, end); naive datetimes are taken as UTC."""
+    return export_response(request, export.date_range(start, end), format, "interviews-all")
+
+# Request profiles captured by profiling.ProfilingMiddleware, in speedscope format
+@api_router.get("/admin/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    profiles = sorted(profiling.PROFILE_DIR.glob('*.speedscope.json'), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [
+        {"id": path.name.removesuffix('.speedscope.json'), "size": path.stat().st_size,
+         "created_at": datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)}
+        for path in profiles
+    ]
+
+@api_router.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: str):
+    path = profiling.PROFILE_DIR / f"{profile_id}.speedscope.json"
+    if '/' in profile_id or not path.is_file():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=path.name)
 
 # Include the router in the main app
 app.include_router(api_router)
 
+# Route-class concurrency limits; inside the metrics middleware so rejections are counted per route
+app.add_middleware(admission.AdmissionMiddleware, known_session=session_cache.contains)
+
+# Added before CORS so it sits inside it and times only the routed request
+app.add_middleware(metrics.MetricsMiddleware, routes=app.router.routes)
+metrics.track_pool(database.pool_monitor)
+
+# Opt-in: X-Profile with X-Admin-Token, or a PROFILE_SAMPLE_RATE fraction of requests
+app.add_middleware(profiling.ProfilingMiddleware, admin_token=ADMIN_TOKEN)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Content-Range", "Accept-Ranges"],
 )
 
 # Configure logging
@@ -456,54 +1459,32 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 async def startup_db():
-    # Seed interview categories
-    existing_categories = await db.interview_categories.count_documents({})
-    if existing_categories == 0:
-        categories = [
-            {
-                "id": "technical",
-                "name": "Technical Interview",
-                "description": "Assess technical knowledge and problem-solving skills",
-                "created_at": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": "hr",
-                "name": "HR Interview",
-                "description": "Evaluate communication and cultural fit",
-                "created_at": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "id": "behavioral",
-                "name": "Behavioral Interview",
-                "description": "Understand past experiences and behavioral patterns",
-                "created_at": datetime.now(timezone.utc).isoformat()
-            }
-        ]
-        await db.interview_categories.insert_many(categories)
-        
-        # Seed questions
-        questions = [
-            # Technical
-            {"id": str(uuid.uuid4()), "category_id": "technical", "text": "Explain the difference between process and thread.", "is_custom": False, "created_at": datetime.now(timezone.utc).isoformat()},
-            {"id": str(uuid.uuid4()), "category_id": "technical", "text": "What is the time complexity of binary search?", "is_custom": False, "created_at": datetime.now(timezone.utc).isoformat()},
-            {"id": str(uuid.uuid4()), "category_id": "technical", "text": "Describe RESTful API design principles.", "is_custom": False, "created_at": datetime.now(timezone.utc).isoformat()},
-            {"id": str(uuid.uuid4()), "category_id": "technical", "text": "What are the SOLID principles in software design?", "is_custom": False, "created_at": datetime.now(timezone.utc).isoformat()},
-            {"id": str(uuid.uuid4()), "category_id": "technical", "text": "Explain database normalization and its importance.", "is_custom": False, "created_at": datetime.now(timezone.utc).isoformat()},
-            # HR
-            {"id": str(uuid.uuid4()), "category_id": "hr", "text": "Tell me about yourself.", "is_custom": False, "created_at": datetime.now(timezone.utc).isoformat()},
-            {"id": str(uuid.uuid4()), "category_id": "hr", "text": "Why do you want to work for our company?", "is_custom": False, "created_at": datetime.now(timezone.utc).isoformat()},
-            {"id": str(uuid.uuid4()), "category_id": "hr", "text": "What are your greatest strengths and weaknesses?", "is_custom": False, "created_at": datetime.now(timezone.utc).isoformat()},
-            {"id": str(uuid.uuid4()), "category_id": "hr", "text": "Where do you see yourself in 5 years?", "is_custom": False, "created_at": datetime.now(timezone.utc).isoformat()},
-            {"id": str(uuid.uuid4()), "category_id": "hr", "text": "Why should we hire you?", "is_custom": False, "created_at": datetime.now(timezone.utc).isoformat()},
-            # Behavioral
-            {"id": str(uuid.uuid4()), "category_id": "behavioral", "text": "Describe a time when you faced a challenging situation at work.", "is_custom": False, "created_at": datetime.now(timezone.utc).isoformat()},
-            {"id": str(uuid.uuid4()), "category_id": "behavioral", "text": "Tell me about a time you worked on a team project.", "is_custom": False, "created_at": datetime.now(timezone.utc).isoformat()},
-            {"id": str(uuid.uuid4()), "category_id": "behavioral", "text": "Give an example of a goal you set and how you achieved it.", "is_custom": False, "created_at": datetime.now(timezone.utc).isoformat()},
-            {"id": str(uuid.uuid4()), "category_id": "behavioral", "text": "Describe a situation where you had to deal with a difficult colleague.", "is_custom": False, "created_at": datetime.now(timezone.utc).isoformat()},
-            {"id": str(uuid.uuid4()), "category_id": "behavioral", "text": "Tell me about a time when you had to adapt to a significant change.", "is_custom": False, "created_at": datetime.now(timezone.utc).isoformat()}
-        ]
-        await db.questions.insert_many(questions)
+    # Connections are opened before the app starts accepting traffic
+    await database.warm_up(db)
+    await migrate_session_timestamps(db)
+    await ensure_indexes(db)
+    await seed_catalog(db)
+    await stats.ensure_user_stats(db)
+
+@app.on_event("startup")
+async def start_embedded_workers():
+    app.state.analysis_workers = [
+        asyncio.create_task(jobs.run_worker(db, process_job))
+        for _ in range(ANALYSIS_EMBEDDED_WORKERS)
+    ]
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    app.state.loop_monitor = None
+    if profiling.LOOP_LAG_THRESHOLD > 0:
+        app.state.loop_monitor = profiling.LoopLagMonitor()
+        app.state.loop_monitor.start()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if app.state.loop_monitor:
+        app.state.loop_monitor.stop()
+    for task in app.state.analysis_workers:
+        task.cancel()
+    video.shutdown_pool()
     client.close()
@@ -0,0 +1,221 @@
+import logging
+import os
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+
+from pymongo.errors import DuplicateKeyError
+
+import database
+
+logger = logging.getLogger(__name__)
+
+# Analysis jobs whose delta a rollup already holds, newest last; a retried job finds its id
+# there and skips the delta. Only needs to outlast a job's lease plus its retry backoff.
+APPLIED_JOBS_KEPT = 200
+
+# Bump to rebuild every rollup once on the next boot (e.g. after changing the rollup shape)
+BACKFILL_VERSION = 1
+BACKFILL_LOCK_TTL = timedelta(minutes=30)
+
+# One rollup document per user in user_stats, maintained with $inc so reads are O(1):
+#   interview_count, completed_count, stress_sum, confidence_sum,
+#   best_stress / worst_stress / best_confidence / worst_confidence,
+#   categories.<category_id>.{category_name, interview_count, completed_count, stress_sum, confidence_sum}
+
+async def record_interview_started(db, user_id: str, category_id: str, category_name: str):
+    category = f"categories.{category_id}"
+    await db.user_stats.update_one(
+        {"user_id": user_id},
+        {
+            "$inc": {"interview_count": 1, f"{category}.interview_count": 1},
+            "$set": {f"{category}.category_name": category_name, "updated_at": datetime.now(timezone.utc)}
+        },
+        upsert=True
+    )
+
+async def pin_rollup_baseline(db, interview_id: str) -> Optional[dict]:
+    """The interview with `rollup_baseline`: its state as the rollups currently count it.
+
+    The baseline (status, overall scores and each answer's scores) is saved on the interview
+    before an analysis writes anything and cleared once every rollup holds the new result,
+    so a job retried after a crash in between still applies its delta from what was counted,
+    not from the scores its failed attempt already stored.
+    """
+    interview = await db.interviews.find_one({"id": interview_id}, {"_id": 0, "analysis": 0})
+    if interview is None or interview.get('rollup_baseline') is not None:
+        return interview
+
+    responses = await db.interview_responses.find(
+        {"interview_id": interview_id, "stress_score": {"$ne": None}},
+        {"_id": 0, "id": 1, "stress_score": 1, "confidence_score": 1}
+    ).to_list(1000)
+    baseline = {
+        "status": interview.get('status'),
+        "overall_stress_score": interview.get('overall_stress_score'),
+        "overall_confidence_score": interview.get('overall_confidence_score'),
+        "answers": {response['id']: [response['stress_score'], response['confidence_score']] for response in responses}
+    }
+    # Conditional: of two attempts racing here, the first baseline wins
+    await db.interviews.update_one({"id": interview_id, "rollup_baseline": None}, {"$set": {"rollup_baseline": baseline}})
+    return await db.interviews.find_one({"id": interview_id}, {"_id": 0, "analysis": 0})
+
+async def clear_rollup_baseline(db, interview_id: str):
+    await db.interviews.update_one({"id": interview_id}, {"$unset": {"rollup_baseline": ""}})
+
+def applied_once(job_id: str) -> dict:
+    return {"$push": {"applied_jobs": {"$each": [job_id], "$slice": -APPLIED_JOBS_KEPT}}}
+
+async def record_interview_scored(db, previous: dict, overall_stress: float, overall_confidence: float, job_id: str):
+    """Fold a finished analysis into the owner's rollup, once per job.
+
+    `previous` is the interview as the rollup counts it (see pin_rollup_baseline).
+    Re-analyzing an already completed interview only shifts the sums by the score delta;
+    best/worst values are monotonic and are only corrected by backfill_user_stats.
+    """
+    category = f"categories.{previous['category_id']}"
+    first_completion = previous.get('status') != 'completed'
+    stress_delta = overall_stress - (0 if first_completion else previous.get('overall_stress_score') or 0)
+    confidence_delta = overall_confidence - (0 if first_completion else previous.get('overall_confidence_score') or 0)
+
+    inc = {
+        "stress_sum": stress_delta,
+        "confidence_sum": confidence_delta,
+        f"{category}.stress_sum": stress_delta,
+        f"{category}.confidence_sum": confidence_delta
+    }
+    if first_completion:
+        inc["completed_count"] = 1
+        inc[f"{category}.completed_count"] = 1
+
+    try:
+        await db.user_stats.update_one(
+            {"user_id": previous['user_id'], "applied_jobs": {"$ne": job_id}},
+            {
+                "$inc": inc,
+                "$min": {"best_stress": overall_stress, "worst_confidence": overall_confidence},
+                "$max": {"worst_stress": overall_stress, "best_confidence": overall_confidence},
+                "$set": {"updated_at": datetime.now(timezone.utc)},
+                **applied_once(job_id)
+            },
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # The rollup exists and already holds this job: the upsert collided with it
+        pass
+
+def average(total: float, count: int) -> float:
+    return round(total / count, 1) if count else 0.0
+
+def summarize(rollup: Optional[dict]) -> dict:
+    """Shape a rollup document for the API, deriving averages from the running sums."""
+    rollup = rollup or {}
+    completed = rollup.get('completed_count', 0)
+
+    return {
+        "interview_count": rollup.get('interview_count', 0),
+        "completed_count": completed,
+        "in_progress_count": rollup.get('interview_count', 0) - completed,
+        "average_stress": average(rollup.get('stress_sum', 0), completed),
+        "average_confidence": average(rollup.get('confidence_sum', 0), completed),
+        "best_stress": rollup.get('best_stress'),
+        "worst_stress": rollup.get('worst_stress'),
+        "best_confidence": rollup.get('best_confidence'),
+        "worst_confidence": rollup.get('worst_confidence'),
+        "categories": [
+            {
+                "category_id": category_id,
+                "category_name": category.get('category_name'),
+                "interview_count": category.get('interview_count', 0),
+                "completed_count": category.get('completed_count', 0),
+                "average_stress": average(category.get('stress_sum', 0), category.get('completed_count', 0)),
+                "average_confidence": average(category.get('confidence_sum', 0), category.get('completed_count', 0))
+            }
+            for category_id, category in rollup.get('categories', {}).items()
+        ]
+    }
+
+async def get_user_stats(db, user_id: str) -> dict:
+    return summarize(await db.user_stats.find_one({"user_id": user_id}, {"_id": 0}))
+
+def completed_score(field: str) -> dict:
+    """The score when the interview is completed, otherwise null (ignored by $min/$max)."""
+    return {"$cond": [{"$eq": ["$status", "completed"]}, {"$ifNull": [f"${field}", None]}, None]}
+
+def completed_sum(field: str) -> dict:
+    return {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, {"$ifNull": [f"${field}", 0]}, 0]}}
+
+async def backfill_user_stats(db):
+    """Rebuild every user's rollup from the interviews collection in one server-side pipeline."""
+    await db.interviews.aggregate([
+        {"$group": {
+            "_id": {"user_id": "$user_id", "category_id": "$category_id"},
+            "category_name": {"$last": "$category_name"},
+            "interview_count": {"$sum": 1},
+            "completed_count": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
+            "stress_sum": completed_sum("overall_stress_score"),
+            "confidence_sum": completed_sum("overall_confidence_score"),
+            "best_stress": {"$min": completed_score("overall_stress_score")},
+            "worst_stress": {"$max": completed_score("overall_stress_score")},
+            "best_confidence": {"$max": completed_score("overall_confidence_score")},
+            "worst_confidence": {"$min": completed_score("overall_confidence_score")}
+        }},
+        {"$group": {
+            "_id": "$_id.user_id",
+            "interview_count": {"$sum": "$interview_count"},
+            "completed_count": {"$sum": "$completed_count"},
+            "stress_sum": {"$sum": "$stress_sum"},
+            "confidence_sum": {"$sum": "$confidence_sum"},
+            "best_stress": {"$min": "$best_stress"},
+            "worst_stress": {"$max": "$worst_stress"},
+            "best_confidence": {"$max": "$best_confidence"},
+            "worst_confidence": {"$min": "$worst_confidence"},
+            "categories": {"$push": {
+                "k": "$_id.category_id",
+                "v": {
+                    "category_name": "$category_name",
+                    "interview_count": "$interview_count",
+                    "completed_count": "$completed_count",
+                    "stress_sum": "$stress_sum",
+                    "confidence_sum": "$confidence_sum"
+                }
+            }}
+        }},
+        {"$project": {
+            "_id": 0,
+            "user_id": "$_id",
+            "interview_count": 1,
+            "completed_count": 1,
+            "stress_sum": 1,
+            "confidence_sum": 1,
+            "best_stress": 1,
+            "worst_stress": 1,
+            "best_confidence": 1,
+            "worst_confidence": 1,
+            "categories": {"$arrayToObject": "$categories"},
+            "updated_at": "$$NOW"
+        }},
+        {"$merge": {"into": "user_stats", "on": "user_id", "whenMatched": "replace", "whenNotMatched": "insert"}}
+    ]).to_list(None)
+
+    logger.info(f"Rebuilt rollups for {await db.user_stats.count_documents({})} users")
+
+async def ensure_user_stats(db):
+    """Build the rollups once per BACKFILL_VERSION, so existing users do not see empty stats.
+
+    Same pattern as seed_catalog: a version marker in app_meta lets later boots skip this
+    with one lookup, and a lock keeps workers booting together from all running it.
+    """
+    if await db.app_meta.find_one({"_id": "stats_backfill", "version": BACKFILL_VERSION}):
+        return
+
+    owner = f"{os.getpid()}-{uuid.uuid4()}"
+    if not await database.acquire_lock(db, "stats_backfill", owner, BACKFILL_LOCK_TTL):
+        logger.info("Stats backfill is running in another worker")
+        return
+
+    try:
+        await backfill_user_stats(db)
+        await db.app_meta.update_one({"_id": "stats_backfill"}, {"$set": {"version": BACKFILL_VERSION}}, upsert=True)
+    finally:
+        await database.release_lock(db, "stats_backfill", owner)
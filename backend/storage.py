@@ -0,0 +1,520 @@
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import aiofiles
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+# Recordings are stored once per distinct content under a key derived from their sha256
+# (ab/cd/<sha256>). Each blob has a document in `blobs` counting the interview_responses
+# fields (video/audio) that point at it. Where the bytes live is up to the backend:
+#   STORAGE_BACKEND=local  files under uploads/blobs (default)
+#   STORAGE_BACKEND=s3     objects in S3_BUCKET, on AWS or any S3-compatible endpoint
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'local')
+S3_BUCKET = os.environ.get('S3_BUCKET')
+S3_PREFIX = os.environ.get('S3_PREFIX', 'recordings/')
+S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL')  # e.g. a MinIO server
+S3_REGION = os.environ.get('S3_REGION')
+# Uploads are buffered one part at a time; S3 requires parts of at least 5 MiB (except the last)
+S3_PART_SIZE = max(int(os.environ.get('S3_PART_SIZE', 8 * 1024 * 1024)), 5 * 1024 * 1024)
+S3_MAX_CONCURRENCY = int(os.environ.get('S3_MAX_CONCURRENCY', 4))
+# Playback redirects to a presigned URL valid for this long
+S3_PRESIGN_SECONDS = int(os.environ.get('S3_PRESIGN_SECONDS', 300))
+# Where archived originals go: a directory (local, default uploads/archive) or a storage class (S3)
+ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR')
+S3_ARCHIVE_STORAGE_CLASS = os.environ.get('S3_ARCHIVE_STORAGE_CLASS', 'GLACIER_IR')
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def blob_key(sha256: str) -> str:
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+def blob_path(root: Path, sha256: str) -> Path:
+    return root / blob_key(sha256)
+
+class LocalWriter:
+    """Streams an upload into a staging file next to the blob directory."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.file = None
+
+    async def write(self, chunk: bytes):
+        if self.file is None:
+            self.file = await aiofiles.open(self.path, 'wb')
+        await self.file.write(chunk)
+
+    async def close(self):
+        if self.file is None:
+            self.path.touch()
+        else:
+            await self.file.close()
+
+    async def abort(self):
+        if self.file is not None:
+            await self.file.close()
+        # Never leave a truncated recording behind
+        self.path.unlink(missing_ok=True)
+
+class LocalBackend:
+    def __init__(self, root: Path, staging: Path, archive_root: Optional[Path] = None):
+        self.root = root
+        self.staging = staging
+        self.archive_root = archive_root or root.parent / 'archive'
+
+    def location(self, sha256: str) -> str:
+        return str(blob_path(self.root, sha256))
+
+    def create_writer(self) -> LocalWriter:
+        return LocalWriter(self.staging / f"{uuid.uuid4()}.upload")
+
+    async def exists(self, sha256: str) -> bool:
+        return blob_path(self.root, sha256).exists()
+
+    async def publish(self, writer: LocalWriter, sha256: str) -> str:
+        return await self.publish_file(writer.path, sha256)
+
+    async def publish_file(self, path: Path, sha256: str) -> str:
+        """Move a finished local file into place, or drop it if the content is already stored."""
+        destination = blob_path(self.root, sha256)
+        if destination.exists():
+            path.unlink(missing_ok=True)
+        else:
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(path, destination)
+        return str(destination)
+
+    async def import_file(self, path: Path, sha256: str) -> str:
+        """Like publish_file, but leaves `path` in place."""
+        destination = blob_path(self.root, sha256)
+        if not destination.exists():
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            os.link(path, destination)
+        return str(destination)
+
+    async def quarantine(self, sha256: str):
+        path = blob_path(self.root, sha256)
+        if path.exists():
+            os.replace(path, path.with_name(path.name + '.deleting'))
+
+    async def restore(self, sha256: str):
+        path = blob_path(self.root, sha256)
+        doomed = path.with_name(path.name + '.deleting')
+        if doomed.exists():
+            os.replace(doomed, path)
+
+    async def purge(self, sha256: str):
+        path = blob_path(self.root, sha256)
+        path.with_name(path.name + '.deleting').unlink(missing_ok=True)
+
+    async def archive(self, sha256: str) -> str:
+        """Copy a blob out of the hot store; the copy is not reference counted."""
+        destination = blob_path(self.archive_root, sha256)
+        if not destination.exists():
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = destination.with_name(destination.name + '.tmp')
+            # The archive is usually another filesystem, so copy rather than link
+            await asyncio.to_thread(shutil.copyfile, blob_path(self.root, sha256), temp_path)
+            os.replace(temp_path, destination)
+        return str(destination)
+
+    def media_url(self, location: str, media_type: str) -> Optional[str]:
+        # Served by the API itself
+        return None
+
+    @asynccontextmanager
+    async def localize(self, location: str) -> AsyncIterator[Path]:
+        yield Path(location)
+
+class S3Writer:
+    """Streams an upload to S3 with multipart upload, S3_PART_SIZE bytes at a time.
+
+    At most S3_MAX_CONCURRENCY parts are in flight; write() waits for a free slot, so
+    memory stays at roughly part size x (concurrency + 1) whatever the file size.
+    Uploads smaller than one part are sent with a single PutObject.
+    """
+
+    def __init__(self, backend: 'S3Backend', key: str):
+        self.backend = backend
+        self.key = key
+        self.buffer = bytearray()
+        self.upload_id = None
+        self.part_count = 0
+        self.parts = {}
+        self.in_flight = set()
+        self.slots = asyncio.Semaphore(backend.max_concurrency)
+
+    async def write(self, chunk: bytes):
+        self.buffer += chunk
+        while len(self.buffer) >= self.backend.part_size:
+            part = bytes(self.buffer[:self.backend.part_size])
+            del self.buffer[:self.backend.part_size]
+            await self.submit(part)
+
+    async def submit(self, data: bytes):
+        client = self.backend.client
+        if self.upload_id is None:
+            created = await asyncio.to_thread(client.create_multipart_upload, Bucket=self.backend.bucket, Key=self.key)
+            self.upload_id = created['UploadId']
+
+        await self.slots.acquire()
+        # Surface a failed part now instead of after streaming the rest of the file
+        for task in [task for task in self.in_flight if task.done()]:
+            self.in_flight.discard(task)
+            task.result()
+
+        self.part_count += 1
+        self.in_flight.add(asyncio.create_task(self.upload_part(self.part_count, data)))
+
+    async def upload_part(self, number: int, data: bytes):
+        try:
+            uploaded = await asyncio.to_thread(
+                self.backend.client.upload_part,
+                Bucket=self.backend.bucket, Key=self.key, UploadId=self.upload_id, PartNumber=number, Body=data
+            )
+            self.parts[number] = uploaded['ETag']
+        finally:
+            self.slots.release()
+
+    async def close(self):
+        client = self.backend.client
+        if self.upload_id is None:
+            await asyncio.to_thread(client.put_object, Bucket=self.backend.bucket, Key=self.key, Body=bytes(self.buffer))
+            return
+
+        if self.buffer:
+            await self.submit(bytes(self.buffer))
+            self.buffer.clear()
+        await asyncio.gather(*self.in_flight)
+        self.in_flight.clear()
+        await asyncio.to_thread(
+            client.complete_multipart_upload,
+            Bucket=self.backend.bucket, Key=self.key, UploadId=self.upload_id,
+            MultipartUpload={"Parts": [{"PartNumber": number, "ETag": etag} for number, etag in sorted(self.parts.items())]}
+        )
+
+    async def abort(self):
+        for task in self.in_flight:
+            task.cancel()
+        await asyncio.gather(*self.in_flight, return_exceptions=True)
+        if self.upload_id is not None:
+            await asyncio.to_thread(
+                self.backend.client.abort_multipart_upload,
+                Bucket=self.backend.bucket, Key=self.key, UploadId=self.upload_id
+            )
+
+class S3Backend:
+    def __init__(self, bucket: str, prefix: str = S3_PREFIX, endpoint_url: Optional[str] = S3_ENDPOINT_URL,
+                 region: Optional[str] = S3_REGION, part_size: int = S3_PART_SIZE, max_concurrency: int = S3_MAX_CONCURRENCY):
+        # Imported here so local-disk deployments do not need boto3
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.part_size = part_size
+        self.max_concurrency = max_concurrency
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url,
+            region_name=region,
+            config=Config(max_pool_connections=max(10, max_concurrency * 2))
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=part_size,
+            multipart_chunksize=part_size,
+            max_concurrency=max_concurrency
+        )
+
+    def key(self, sha256: str) -> str:
+        return f"{self.prefix}blobs/{blob_key(sha256)}"
+
+    def location(self, sha256: str) -> str:
+        return f"s3://{self.bucket}/{self.key(sha256)}"
+
+    def create_writer(self) -> S3Writer:
+        # The content hash is only known once the upload is complete, so stream to a staging key
+        return S3Writer(self, f"{self.prefix}staging/{uuid.uuid4()}")
+
+    async def object_exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    async def exists(self, sha256: str) -> bool:
+        return await self.object_exists(self.key(sha256))
+
+    async def move(self, source_key: str, key: str):
+        # Managed copy switches to multipart copy above the part size (CopyObject stops at 5 GB)
+        await asyncio.to_thread(
+            self.client.copy, {"Bucket": self.bucket, "Key": source_key}, self.bucket, key, Config=self.transfer_config
+        )
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=source_key)
+
+    async def publish(self, writer: S3Writer, sha256: str) -> str:
+        if await self.exists(sha256):
+            await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=writer.key)
+        else:
+            await self.move(writer.key, self.key(sha256))
+        return self.location(sha256)
+
+    async def import_file(self, path: Path, sha256: str) -> str:
+        if not await self.exists(sha256):
+            await asyncio.to_thread(self.client.upload_file, str(path), self.bucket, self.key(sha256), Config=self.transfer_config)
+        return self.location(sha256)
+
+    async def publish_file(self, path: Path, sha256: str) -> str:
+        location = await self.import_file(path, sha256)
+        path.unlink(missing_ok=True)
+        return location
+
+    async def quarantine(self, sha256: str):
+        if await self.exists(sha256):
+            await self.move(self.key(sha256), f"{self.prefix}deleting/{sha256}")
+
+    async def restore(self, sha256: str):
+        if await self.object_exists(f"{self.prefix}deleting/{sha256}"):
+            await self.move(f"{self.prefix}deleting/{sha256}", self.key(sha256))
+
+    async def purge(self, sha256: str):
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=f"{self.prefix}deleting/{sha256}")
+
+    async def archive(self, sha256: str) -> str:
+        key = f"{self.prefix}archive/{blob_key(sha256)}"
+        if not await self.object_exists(key):
+            await asyncio.to_thread(
+                self.client.copy, {"Bucket": self.bucket, "Key": self.key(sha256)}, self.bucket, key,
+                ExtraArgs={"StorageClass": S3_ARCHIVE_STORAGE_CLASS}, Config=self.transfer_config
+            )
+        return f"s3://{self.bucket}/{key}"
+
+    def media_url(self, location: str, media_type: str) -> Optional[str]:
+        """A short-lived GET URL so playback and seeking go straight to the object store."""
+        if not location.startswith('s3://'):
+            return None
+        bucket, key = location[len('s3://'):].split('/', 1)
+        return self.client.generate_presigned_url(
+            'get_object',
+            Params={"Bucket": bucket, "Key": key, "ResponseContentType": media_type},
+            ExpiresIn=S3_PRESIGN_SECONDS
+        )
+
+    @asynccontextmanager
+    async def localize(self, location: str) -> AsyncIterator[Path]:
+        """Yield a local path for a stored recording, downloading objects to a temporary file."""
+        if not location.startswith('s3://'):
+            # Recorded before the switch to S3
+            yield Path(location)
+            return
+
+        bucket, key = location[len('s3://'):].split('/', 1)
+        fd, temp_path = tempfile.mkstemp(suffix='.webm')
+        os.close(fd)
+        try:
+            await asyncio.to_thread(self.client.download_file, bucket, key, temp_path, Config=self.transfer_config)
+            yield Path(temp_path)
+        finally:
+            os.unlink(temp_path)
+
+def create_backend(root: Path, staging: Path):
+    if STORAGE_BACKEND == 's3':
+        if not S3_BUCKET:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+        return S3Backend(S3_BUCKET)
+    if STORAGE_BACKEND != 'local':
+        raise RuntimeError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+    return LocalBackend(root, staging, Path(ARCHIVE_DIR) if ARCHIVE_DIR else None)
+
+async def take_reference(db, sha256: str, size: int):
+    await db.blobs.update_one(
+        {"sha256": sha256},
+        {
+            "$inc": {"refcount": 1},
+            "$setOnInsert": {"size": size, "created_at": datetime.now(timezone.utc)},
+            "$unset": {"released_at": ""}
+        },
+        upsert=True
+    )
+
+async def store_blob(db, backend, writer, sha256: str, size: int) -> str:
+    """Take a reference to the blob with this content and publish the closed writer's bytes.
+
+    The staged copy is consumed either way: when an identical blob is already stored it is
+    simply dropped. Returns the blob's location.
+    """
+    # The reference is taken before the backend checks for the blob, so a concurrent garbage
+    # collection cannot remove it between the check and the caller recording the location
+    await take_reference(db, sha256, size)
+    try:
+        return await backend.publish(writer, sha256)
+    except BaseException:
+        await release_blob(db, sha256)
+        raise
+
+async def store_file(db, backend, path: Path, sha256: str, size: int) -> str:
+    """store_blob for bytes that are already in a local file."""
+    await take_reference(db, sha256, size)
+    try:
+        return await backend.publish_file(path, sha256)
+    except BaseException:
+        await release_blob(db, sha256)
+        raise
+
+async def release_blob(db, sha256: str):
+    """Drop one reference; unreferenced blobs are deleted later by collect_garbage."""
+    blob = await db.blobs.find_one_and_update(
+        {"sha256": sha256},
+        {"$inc": {"refcount": -1}},
+        return_document=ReturnDocument.AFTER
+    )
+    if blob and blob['refcount'] <= 0:
+        await db.blobs.update_one(
+            {"sha256": sha256, "refcount": {"$lte": 0}},
+            {"$set": {"released_at": datetime.now(timezone.utc)}}
+        )
+
+async def collect_garbage(db, backend, grace: timedelta) -> dict:
+    """Delete blobs that have had no references for at least `grace`.
+
+    The bytes are moved aside before the document is removed; if an upload of the same
+    content took a new reference in the meantime, they are put back.
+    """
+    cutoff = datetime.now(timezone.utc) - grace
+    deleted = 0
+    reclaimed = 0
+    async for blob in db.blobs.find({"refcount": {"$lte": 0}, "released_at": {"$lt": cutoff}}, {"_id": 0}):
+        await backend.quarantine(blob['sha256'])
+
+        result = await db.blobs.delete_one({"sha256": blob['sha256'], "refcount": {"$lte": 0}})
+        if result.deleted_count:
+            await backend.purge(blob['sha256'])
+            deleted += 1
+            reclaimed += blob.get('size', 0)
+        else:
+            await backend.restore(blob['sha256'])
+
+    logger.info(f"Deleted {deleted} unreferenced blobs ({reclaimed} bytes)")
+    return {"deleted": deleted, "reclaimed_bytes": reclaimed}
+
+async def expire_upload_sessions(db, partial_dir: Path, max_age: timedelta) -> dict:
+    """Expire resumable upload sessions idle for longer than `max_age` and delete their partial files.
+
+    Sessions whose bytes already reached the blob store give their reference back. Partial
+    files with no live session (e.g. the session document was lost) are removed as well.
+    """
+    cutoff = datetime.now(timezone.utc) - max_age
+    expired = 0
+    async for session in db.upload_sessions.find(
+        {
+            "status": {"$in": ["open", "finalizing", "stored"]},
+            "$or": [
+                {"updated_at": {"$lt": cutoff}},
+                # Sessions from before updated_at was recorded
+                {"updated_at": {"$exists": False}, "created_at": {"$lt": cutoff.isoformat()}}
+            ]
+        },
+        {"_id": 0, "id": 1, "status": 1, "stored": 1}
+    ):
+        result = await db.upload_sessions.update_one(
+            {"id": session['id'], "status": session['status']},
+            {"$set": {"status": "expired", "updated_at": datetime.now(timezone.utc)}}
+        )
+        if not result.modified_count:
+            continue
+        if session.get('stored'):
+            await release_blob(db, session['stored']['sha256'])
+        (partial_dir / f"{session['id']}.part").unlink(missing_ok=True)
+        expired += 1
+
+    removed = 0
+    for path in partial_dir.glob('*.part'):
+        if datetime.fromtimestamp(path.stat().st_mtime, timezone.utc) >= cutoff:
+            continue
+        if await db.upload_sessions.count_documents({"id": path.stem, "status": {"$in": ["open", "finalizing"]}}):
+            continue
+        path.unlink(missing_ok=True)
+        removed += 1
+
+    logger.info(f"Expired {expired} upload sessions; removed {removed} orphaned partial files")
+    return {"expired": expired, "orphaned_files": removed}
+
+def hash_file(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+async def count_references(db, sha256: str) -> int:
+    # Originals kept after tiering (see tiering.py) hold a reference until they expire
+    return sum([
+        await db.interview_responses.count_documents({field: sha256})
+        for field in ("video_sha256", "audio_sha256", "originals.sha256")
+    ])
+
+async def migrate_flat_uploads(db, upload_dir: Path, backend, dry_run: bool = False) -> dict:
+    """Move recordings from the legacy flat upload directory into the blob store.
+
+    Safe to re-run after an interruption: the blob is stored before any response is
+    repointed, reference counts are recomputed rather than incremented, and the flat
+    file is only removed once nothing points at it any more.
+    """
+    migrated = 0
+    orphaned = 0
+    for old_path in sorted(upload_dir.glob('*.webm')):
+        referencing = {"$or": [{"video_path": str(old_path)}, {"audio_path": str(old_path)}]}
+        if dry_run:
+            if await db.interview_responses.count_documents(referencing):
+                migrated += 1
+            else:
+                orphaned += 1
+            continue
+
+        sha256 = await asyncio.to_thread(hash_file, old_path)
+        size = old_path.stat().st_size
+
+        # Also counts responses repointed by an interrupted earlier run
+        if not await db.interview_responses.count_documents(referencing) and not await count_references(db, sha256):
+            # Not referenced by any response: leave it where it is for manual review
+            orphaned += 1
+            continue
+
+        location = await backend.import_file(old_path, sha256)
+        for kind in ("video", "audio"):
+            await db.interview_responses.update_many(
+                {f"{kind}_path": str(old_path)},
+                {"$set": {f"{kind}_path": location, f"{kind}_size": size, f"{kind}_sha256": sha256}}
+            )
+
+        # $max never lowers a count that live uploads of the same content have raised meanwhile
+        await db.blobs.update_one(
+            {"sha256": sha256},
+            {
+                "$max": {"refcount": await count_references(db, sha256)},
+                "$setOnInsert": {"size": size, "created_at": datetime.now(timezone.utc)},
+                "$unset": {"released_at": ""}
+            },
+            upsert=True
+        )
+        old_path.unlink()
+        migrated += 1
+
+    logger.info(f"{'Would migrate' if dry_run else 'Migrated'} {migrated} recordings; {orphaned} unreferenced files left in place")
+    return {"migrated": migrated, "orphaned": orphaned}
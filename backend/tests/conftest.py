@@ -0,0 +1,48 @@
+import os
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+# server.py reads these at import time; tests swap its database for an in-memory one
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'stress_analyzer_test')
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+@pytest.fixture
+def db():
+    return AsyncMongoMockClient()['stress_analyzer_test']
+
+@pytest.fixture
+def server(db, tmp_path, monkeypatch):
+    """The API module wired to an in-memory database and a temporary blob store."""
+    import server
+    import storage
+
+    partial = tmp_path / 'partial'
+    blobs = tmp_path / 'blobs'
+    partial.mkdir()
+    blobs.mkdir()
+    monkeypatch.setattr(server, 'db', db)
+    monkeypatch.setattr(server, 'UPLOAD_DIR', tmp_path)
+    monkeypatch.setattr(server, 'PARTIAL_UPLOAD_DIR', partial)
+    monkeypatch.setattr(server, 'BLOB_DIR', blobs)
+    monkeypatch.setattr(server, 'blob_store', storage.LocalBackend(blobs, partial))
+    return server
+
+@pytest.fixture
+async def api(server):
+    """An authenticated client for the test user."""
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        login = await client.post("/api/auth/debug-login")
+        client.headers["Authorization"] = f"Bearer {login.json()['session_token']}"
+        yield client
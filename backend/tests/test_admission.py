@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+import admission
+
+pytestmark = pytest.mark.anyio
+
+def limiter(limit=1, max_queue=8, max_client_queue=4, timeout=5.0) -> admission.FairLimiter:
+    return admission.FairLimiter("test", limit, max_queue, max_client_queue, timeout)
+
+async def settle():
+    # A granted waiter resumes through wait_for, which takes a few loop iterations
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+async def queue_up(fair: admission.FairLimiter, client: str, admitted: list) -> asyncio.Task:
+    async def wait():
+        await fair.acquire(client)
+        admitted.append(client)
+
+    task = asyncio.create_task(wait())
+    await settle()
+    return task
+
+async def test_freed_slots_rotate_between_clients():
+    fair = limiter()
+    await fair.acquire("holder")
+    admitted = []
+    tasks = [await queue_up(fair, client, admitted) for client in ("a", "a", "a", "b")]
+
+    for _ in tasks:
+        fair.release()
+        await settle()
+
+    assert admitted == ["a", "b", "a", "a"]
+    assert fair.stats() == {"limit": 1, "running": 1, "queued": 0, "clients_waiting": 0}
+
+async def test_full_queues_reject_straight_away():
+    fair = limiter(max_queue=2, max_client_queue=1)
+    await fair.acquire("holder")
+    admitted = []
+    tasks = [await queue_up(fair, "a", admitted), await queue_up(fair, "b", admitted)]
+
+    with pytest.raises(admission.Rejected) as queue_full:
+        await fair.acquire("c")
+    assert queue_full.value.reason == "queue_full"
+
+    fair.release()
+    await settle()
+    with pytest.raises(admission.Rejected) as client_queue_full:
+        await fair.acquire("b")
+    assert client_queue_full.value.reason == "client_queue_full"
+
+    for task in tasks:
+        task.cancel()
+
+async def test_waiters_time_out():
+    fair = limiter(timeout=0.01)
+    await fair.acquire("holder")
+
+    with pytest.raises(admission.Rejected) as rejected:
+        await fair.acquire("a")
+
+    assert rejected.value.reason == "timeout"
+    assert fair.stats() == {"limit": 1, "running": 1, "queued": 0, "clients_waiting": 0}
+
+async def test_slot_handed_over_at_the_timeout_is_released(monkeypatch):
+    fair = limiter()
+    await fair.acquire("holder")
+
+    async def handed_over_as_it_times_out(future, timeout):
+        fair.release()
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr(admission.asyncio, "wait_for", handed_over_as_it_times_out)
+    with pytest.raises(admission.Rejected):
+        await fair.acquire("a")
+
+    assert fair.stats()["running"] == 0
+
+def scope(headers: dict, host: str = "203.0.113.7") -> dict:
+    return {
+        "type": "http",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": (host, 50000)
+    }
+
+def test_only_known_session_tokens_become_their_own_client():
+    known = {"real-session"}.__contains__
+
+    assert admission.client_key(scope({"Authorization": "Bearer real-session"}), known) == "session:real-session"
+    assert admission.client_key(scope({"Cookie": "session_token=real-session"}), known) == "session:real-session"
+    # Made-up tokens all share their address's queue
+    assert admission.client_key(scope({"Authorization": "Bearer random-1"}), known) == "ip:203.0.113.7"
+    assert admission.client_key(scope({"Authorization": "Bearer random-2"}), known) == "ip:203.0.113.7"
+    assert admission.client_key(scope({}), known) == "ip:203.0.113.7"
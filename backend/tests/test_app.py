@@ -0,0 +1,25 @@
+import httpx
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+async def test_debug_login_session_resolves(api):
+    response = await api.get("/api/auth/me")
+    assert response.status_code == 200
+    assert response.json()["email"] == "test@example.com"
+
+async def test_healthz(api):
+    health = (await api.get("/healthz")).json()
+    assert health["status"] == "ok"
+    assert "mongo_pool" in health and "admission" in health
+
+async def test_repeated_session_post_refreshes_the_session(server):
+    # A unique index on session_token, as in production, must not turn the retry into a 500
+    await server.db.user_sessions.create_index("session_token", unique=True)
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.post("/api/auth/session", json={"session_id": "session-1"})
+        again = await client.post("/api/auth/session", json={"session_id": "session-1"})
+
+    assert first.status_code == again.status_code == 200
+    assert await server.db.user_sessions.count_documents({"session_token": "session-1"}) == 1
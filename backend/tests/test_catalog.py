@@ -0,0 +1,29 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def catalog(server, monkeypatch):
+    monkeypatch.setattr(server, "catalog_version", {"value": None, "checked_at": 0.0})
+    server.catalog_cache.clear()
+    yield server
+    server.catalog_cache.clear()
+
+async def test_question_added_by_another_worker_is_served(api, catalog, monkeypatch):
+    await catalog.db.questions.insert_one({"id": "q1", "category_id": "general", "text": "One", "created_at": "2026-01-01T00:00:00"})
+    assert len((await api.get("/api/questions/general")).json()) == 1
+
+    # Another process adds a question: its cache pop does not reach this one, the version does
+    await catalog.db.questions.insert_one({"id": "q2", "category_id": "general", "text": "Two", "created_at": "2026-01-01T00:00:00"})
+    await catalog.db.app_meta.update_one({"_id": "catalog"}, {"$inc": {"version": 1}}, upsert=True)
+    assert len((await api.get("/api/questions/general")).json()) == 1
+
+    monkeypatch.setattr(catalog, "CATALOG_VERSION_CHECK", 0)
+    assert len((await api.get("/api/questions/general")).json()) == 2
+
+async def test_creating_a_question_bumps_the_catalog_version(api, catalog):
+    response = await api.post("/api/questions", json={"category_id": "general", "text": "Why us?"})
+
+    assert response.status_code == 200
+    assert (await catalog.db.app_meta.find_one({"_id": "catalog"}))["version"] == 1
+    assert [question["text"] for question in (await api.get("/api/questions/general")).json()] == ["Why us?"]
@@ -0,0 +1,43 @@
+import csv
+import io
+import json
+
+import pytest
+
+import export
+
+pytestmark = pytest.mark.anyio
+
+async def exported(db, format: str) -> str:
+    chunks = [chunk async for chunk in export.stream_export(export.export_cursor(db, {"user_id": "u1"}), format)]
+    return b"".join(chunks).decode()
+
+@pytest.fixture
+async def interview(db):
+    await db.interviews.insert_one({
+        "id": "i1", "user_id": "u1", "category_id": "general", "category_name": "General",
+        "status": "completed", "started_at": "2026-01-01T00:00:00+00:00"
+    })
+    await db.interview_responses.insert_one({
+        "id": "r1", "interview_id": "i1", "question_id": "q1", "question_text": "=HYPERLINK(\"http://evil\")",
+        "video_path": "s3://bucket/recordings/blobs/ab/abcd", "video_sha256": "abcd", "video_size": 10,
+        "originals": [{"kind": "video", "path": "/uploads/blobs/ab/abcd", "sha256": "abcd", "size": 10}],
+        "stress_score": 40.0, "confidence_score": 60.0, "created_at": "2026-01-01T00:01:00+00:00"
+    })
+
+async def test_ndjson_leaves_out_storage_fields(db, interview):
+    line = json.loads(await exported(db, "ndjson"))
+
+    response = line["responses"][0]
+    assert response["id"] == "r1" and response["stress_score"] == 40.0
+    assert not set(export.INTERNAL_RESPONSE_FIELDS) & set(response)
+
+async def test_csv_neutralizes_formulas(db, interview):
+    rows = list(csv.DictReader(io.StringIO(await exported(db, "csv"))))
+
+    assert len(rows) == 1
+    assert rows[0]["question_text"] == "'=HYPERLINK(\"http://evil\")"
+    assert rows[0]["stress_score"] == "40.0"
+
+def test_csv_cell():
+    assert [export.csv_cell(value) for value in ("+1", "-1", "@sum", "plain", -1.5, None)] == ["'+1", "'-1", "'@sum", "plain", -1.5, None]
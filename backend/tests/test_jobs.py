@@ -0,0 +1,54 @@
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+import indexes
+import jobs
+
+pytestmark = pytest.mark.anyio
+
+async def test_enqueue_reuses_the_active_job(db):
+    first = await jobs.enqueue_analysis_job(db, "interview-1", "user-1", {})
+    again = await jobs.enqueue_analysis_job(db, "interview-1", "user-1", {})
+    tiering = await jobs.enqueue_analysis_job(db, "interview-1", "user-1", {}, jobs.TIERING_JOB)
+
+    assert again["id"] == first["id"]
+    assert tiering["id"] != first["id"]
+    assert await db.analysis_jobs.count_documents({}) == 2
+
+async def test_enqueue_after_completion_queues_a_new_job(db):
+    first = await jobs.enqueue_analysis_job(db, "interview-1", "user-1", {})
+    await db.analysis_jobs.update_one({"id": first["id"]}, {"$set": {"status": "completed"}})
+
+    second = await jobs.enqueue_analysis_job(db, "interview-1", "user-1", {})
+
+    assert second["id"] != first["id"]
+    assert second["status"] == "queued"
+
+async def test_enqueue_race_returns_the_winning_job(db, monkeypatch):
+    winner = await jobs.enqueue_analysis_job(db, "interview-1", "user-1", {})
+    upsert = jobs.upsert_active_job
+    calls = []
+
+    async def lose_the_race(*args):
+        # The first attempt collides with the winner's insert on the unique active-job index
+        calls.append(args)
+        if len(calls) == 1:
+            raise DuplicateKeyError("E11000 duplicate key error")
+        return await upsert(*args)
+
+    monkeypatch.setattr(jobs, "upsert_active_job", lose_the_race)
+    job = await jobs.enqueue_analysis_job(db, "interview-1", "user-1", {})
+
+    assert len(calls) == 2
+    assert job["id"] == winner["id"]
+    assert await db.analysis_jobs.count_documents({}) == 1
+
+@pytest.mark.parametrize("version, created", [([5, 0, 5], False), ([6, 0, 1], True)])
+async def test_active_job_index_needs_mongodb_6(db, monkeypatch, version, created):
+    async def build_info(command):
+        return {"version": ".".join(map(str, version)), "versionArray": version}
+
+    monkeypatch.setattr(db, "command", build_info)
+    await indexes.ensure_indexes(db)
+
+    assert ("interview_id_1_type_1_active" in await db.analysis_jobs.index_information()) is created
@@ -0,0 +1,73 @@
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+
+import media
+
+pytestmark = pytest.mark.anyio
+
+BODY = bytes(range(100))
+
+@pytest.fixture
+async def client(tmp_path):
+    (tmp_path / "answer.webm").write_bytes(BODY)
+    (tmp_path / "empty.webm").write_bytes(b"")
+    app = FastAPI()
+
+    @app.get("/{name}")
+    async def recording(name: str, request: Request):
+        return await media.serve_file(request, tmp_path / name, "video/webm", etag="abc123")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+async def test_full_body(client):
+    response = await client.get("/answer.webm")
+
+    assert response.status_code == 200
+    assert response.content == BODY
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"] == '"abc123"'
+
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=10-19", 10, 19),
+    ("bytes=90-", 90, 99),
+    ("bytes=-5", 95, 99),
+    ("bytes=-500", 0, 99),
+    ("bytes=95-500", 95, 99)
+])
+async def test_ranges(client, header, start, end):
+    response = await client.get("/answer.webm", headers={"Range": header})
+
+    assert response.status_code == 206
+    assert response.content == BODY[start:end + 1]
+    assert response.headers["content-range"] == f"bytes {start}-{end}/100"
+    assert response.headers["content-length"] == str(end - start + 1)
+
+@pytest.mark.parametrize("name, header, size", [
+    ("answer.webm", "bytes=100-", 100),
+    ("empty.webm", "bytes=0-", 0),
+    ("empty.webm", "bytes=-10", 0)
+])
+async def test_unsatisfiable_ranges(client, name, header, size):
+    response = await client.get(f"/{name}", headers={"Range": header})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{size}"
+
+@pytest.mark.parametrize("header", ["bytes=5-1", "bytes=0-1,5-6", "items=0-1"])
+async def test_unsupported_ranges_send_the_whole_file(client, header):
+    response = await client.get("/answer.webm", headers={"Range": header})
+
+    assert response.status_code == 200
+    assert response.content == BODY
+
+async def test_if_range(client):
+    current = await client.get("/answer.webm", headers={"Range": "bytes=0-9", "If-Range": '"abc123"'})
+    stale = await client.get("/answer.webm", headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+
+    assert current.status_code == 206 and current.content == BODY[:10]
+    assert stale.status_code == 200 and stale.content == BODY
+
+async def test_if_none_match(client):
+    assert (await client.get("/answer.webm", headers={"If-None-Match": '"abc123"'})).status_code == 304
@@ -0,0 +1,28 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+async def test_cursor_walks_every_interview_once(api, server):
+    await server.db.interview_categories.insert_one({"id": "general", "name": "General"})
+    created = {(await api.post("/api/interviews", json={"category_id": "general"})).json()["id"] for _ in range(3)}
+
+    first = await api.get("/api/interviews", params={"limit": 2})
+    cursor = first.headers["X-Next-Cursor"]
+    second = await api.get("/api/interviews", params={"limit": 2, "cursor": cursor})
+
+    assert len(first.json()) == 2 and len(second.json()) == 1
+    assert "X-Next-Cursor" not in second.headers
+    assert {interview["id"] for interview in first.json() + second.json()} == created
+
+@pytest.mark.parametrize("values", [
+    [{"$ne": None}, "x"],
+    ["2026-01-01T00:00:00+00:00", {"$gt": ""}],
+    [1, "x"],
+    ["2026-01-01T00:00:00+00:00"]
+])
+async def test_malformed_cursors_are_rejected(api, server, values):
+    response = await api.get("/api/interviews", params={"cursor": server.encode_cursor(*values)})
+    assert response.status_code == 400
+
+async def test_undecodable_cursor_is_rejected(api):
+    assert (await api.get("/api/interviews", params={"cursor": "not base64!"})).status_code == 400
@@ -0,0 +1,76 @@
+import pytest
+
+import rankings
+
+pytestmark = pytest.mark.anyio
+
+def increments(update) -> dict:
+    return update._doc["$inc"]
+
+def test_sketch_update_moves_a_rescored_sample():
+    assert increments(rankings.sketch_update("c", None, None, (42.0, 80.0), "job-1")) == {"count": 1, "stress.42": 1, "confidence.80": 1}
+    assert increments(rankings.sketch_update("c", "q", (42.0, 80.0), (10.0, 80.5), "job-1")) == {"stress.42": -1, "stress.10": 1}
+    assert rankings.sketch_update("c", "q", (42.0, 80.0), (42.5, 80.9), "job-1") is None
+    assert rankings.sketch_update("c", "q", None, None, "job-1") is None
+
+def test_percentile_interpolates_within_the_bin():
+    sketch = {"count": 4, "stress": {"10": 1, "50": 2, "90": 1}}
+
+    assert rankings.percentile(sketch, "stress", 5.0) == 0.0
+    assert rankings.percentile(sketch, "stress", 50.5) == 50.0
+    assert rankings.percentile(sketch, "stress", 99.9) == 100.0
+    assert rankings.percentile({"count": 0}, "stress", 50.0) is None
+    assert rankings.percentile(None, "stress", 50.0) is None
+
+async def sketch(db, question_id=None) -> dict:
+    return await db.category_score_sketches.find_one({"_id": rankings.sketch_id("general", question_id)})
+
+async def test_retry_after_a_partial_write_counts_answers_once(db):
+    interview = {"id": "i1", "category_id": "general", "status": "in_progress", "overall_stress_score": None}
+    # The failed attempt already wrote (30, 70) to the answer before the interview completed
+    answers = [("q1", (30.0, 70.0), (30.0, 70.0))]
+
+    await rankings.record_interview_scored(db, interview, 30.0, 70.0, answers, "job-1")
+
+    answer = await sketch(db, "q1")
+    assert answer["count"] == 1
+    assert answer["stress"] == {"30": 1} and answer["confidence"] == {"70": 1}
+    assert (await sketch(db))["count"] == 1
+
+async def test_a_job_is_folded_in_once(db):
+    interview = {"id": "i1", "category_id": "general", "status": "in_progress", "overall_stress_score": None}
+    answers = [("q1", None, (30.0, 70.0))]
+
+    await rankings.record_interview_scored(db, interview, 30.0, 70.0, answers, "job-1")
+    # The job is retried after crashing before it could finish
+    await rankings.record_interview_scored(db, interview, 30.0, 70.0, answers, "job-1")
+
+    assert (await sketch(db))["count"] == 1
+    assert (await sketch(db, "q1"))["count"] == 1
+
+async def test_reanalysis_moves_samples(db):
+    interview = {"id": "i1", "category_id": "general", "status": "in_progress", "overall_stress_score": None}
+    await rankings.record_interview_scored(db, interview, 30.0, 70.0, [("q1", None, (30.0, 70.0))], "job-1")
+
+    completed = {**interview, "status": "completed", "overall_stress_score": 30.0, "overall_confidence_score": 70.0}
+    await rankings.record_interview_scored(db, completed, 60.0, 40.0, [("q1", (30.0, 70.0), (60.0, 40.0))], "job-2")
+
+    for current in (await sketch(db), await sketch(db, "q1")):
+        assert current["count"] == 1
+        assert {key: count for key, count in current["stress"].items() if count} == {"60": 1}
+        assert min(current["stress"].values()) >= 0
+
+async def test_rebuild_only_counts_completed_interviews(db):
+    await db.interviews.insert_many([
+        {"id": "done", "category_id": "general", "status": "completed", "overall_stress_score": 30.0, "overall_confidence_score": 70.0},
+        {"id": "failed", "category_id": "general", "status": "in_progress", "overall_stress_score": None}
+    ])
+    await db.interview_responses.insert_many([
+        {"id": "r1", "interview_id": "done", "question_id": "q1", "stress_score": 30.0, "confidence_score": 70.0},
+        {"id": "r2", "interview_id": "failed", "question_id": "q1", "stress_score": 55.0, "confidence_score": 20.0}
+    ])
+
+    assert await rankings.rebuild_sketches(db) == 2
+
+    answer = await sketch(db, "q1")
+    assert answer["count"] == 1 and answer["stress"] == {"30": 1}
@@ -0,0 +1,74 @@
+import pytest
+
+import stats
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def rollups(db):
+    await db.user_stats.create_index("user_id", unique=True)
+    await stats.record_interview_started(db, "u1", "general", "General")
+    return db
+
+async def rollup(db) -> dict:
+    return await stats.get_user_stats(db, "u1")
+
+async def test_a_job_is_folded_in_once(rollups):
+    interview = {"user_id": "u1", "category_id": "general", "status": "in_progress"}
+
+    await stats.record_interview_scored(rollups, interview, 30.0, 70.0, "job-1")
+    # The job is retried after crashing before it cleared its baseline
+    await stats.record_interview_scored(rollups, interview, 30.0, 70.0, "job-1")
+
+    summary = await rollup(rollups)
+    assert summary["completed_count"] == 1
+    assert summary["average_stress"] == 30.0
+
+async def test_retry_applies_its_delta_from_the_baseline(rollups):
+    await rollups.interviews.insert_one({
+        "id": "i1", "user_id": "u1", "category_id": "general", "status": "in_progress",
+        "overall_stress_score": None, "overall_confidence_score": None
+    })
+    await rollups.interview_responses.insert_one({"id": "r1", "interview_id": "i1", "stress_score": None, "confidence_score": None})
+
+    interview = await stats.pin_rollup_baseline(rollups, "i1")
+    # The first attempt stores its scores, then dies before touching the rollup
+    await rollups.interviews.update_one({"id": "i1"}, {"$set": {"status": "completed", "overall_stress_score": 30.0, "overall_confidence_score": 70.0}})
+
+    retried = await stats.pin_rollup_baseline(rollups, "i1")
+    assert retried["rollup_baseline"] == interview["rollup_baseline"]
+    assert retried["rollup_baseline"]["status"] == "in_progress"
+
+    await stats.record_interview_scored(rollups, {**retried, **retried["rollup_baseline"]}, 30.0, 70.0, "job-2")
+    await stats.clear_rollup_baseline(rollups, "i1")
+
+    assert (await rollup(rollups))["completed_count"] == 1
+    assert "rollup_baseline" not in await rollups.interviews.find_one({"id": "i1"})
+
+async def test_backfill_runs_once_per_version(db, monkeypatch):
+    runs = []
+
+    async def backfill(db):
+        runs.append(1)
+
+    monkeypatch.setattr(stats, "backfill_user_stats", backfill)
+    await stats.ensure_user_stats(db)
+    await stats.ensure_user_stats(db)
+    assert len(runs) == 1
+    assert await db.locks.find_one({"_id": "stats_backfill"}) is None
+
+    monkeypatch.setattr(stats, "BACKFILL_VERSION", stats.BACKFILL_VERSION + 1)
+    await stats.ensure_user_stats(db)
+    assert len(runs) == 2
+
+async def test_backfill_is_left_to_the_worker_holding_the_lock(db, monkeypatch):
+    runs = []
+
+    async def backfill(db):
+        runs.append(1)
+
+    monkeypatch.setattr(stats, "backfill_user_stats", backfill)
+    assert await stats.database.acquire_lock(db, "stats_backfill", "other", stats.BACKFILL_LOCK_TTL)
+
+    await stats.ensure_user_stats(db)
+    assert runs == []
@@ -0,0 +1,75 @@
+import hashlib
+import io
+from datetime import datetime, timezone, timedelta
+
+import pytest
+from fastapi import HTTPException
+from moto import mock_aws
+from starlette.datastructures import UploadFile
+
+import storage
+
+pytestmark = pytest.mark.anyio
+
+BUCKET = "recordings-test"
+PART_SIZE = 5 * 1024 * 1024
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        backend = storage.S3Backend(BUCKET, region="us-east-1", part_size=PART_SIZE, max_concurrency=2)
+        backend.client.create_bucket(Bucket=BUCKET)
+        yield backend
+
+def keys(backend, prefix: str = "") -> list:
+    listed = backend.client.list_objects_v2(Bucket=BUCKET, Prefix=backend.prefix + prefix)
+    return [item["Key"] for item in listed.get("Contents", [])]
+
+async def upload(db, backend, data: bytes) -> str:
+    writer = backend.create_writer()
+    for start in range(0, len(data), 1024 * 1024):
+        await writer.write(data[start:start + 1024 * 1024])
+    await writer.close()
+    return await storage.store_blob(db, backend, writer, hashlib.sha256(data).hexdigest(), len(data))
+
+async def test_streams_in_parts_and_dedupes_by_content(db, s3):
+    data = bytes(range(256)) * (11 * 1024 * 1024 // 256)
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    first = await upload(db, s3, data)
+    again = await upload(db, s3, data)
+
+    assert first == again == s3.location(sha256)
+    stored = s3.client.get_object(Bucket=BUCKET, Key=s3.key(sha256))
+    assert stored["Body"].read() == data
+    # 5 + 5 + 1 MiB
+    assert stored["ETag"].strip('"').endswith("-3")
+    assert keys(s3, "staging/") == []
+    assert (await db.blobs.find_one({"sha256": sha256}))["refcount"] == 2
+
+async def test_oversized_upload_aborts_the_multipart_upload(server, s3, monkeypatch):
+    monkeypatch.setattr(server, "blob_store", s3)
+    monkeypatch.setattr(server, "MAX_UPLOAD_BYTES", PART_SIZE + 1024 * 1024)
+    recording = UploadFile(io.BytesIO(b"\0" * (11 * 1024 * 1024)), filename="answer.webm")
+
+    with pytest.raises(HTTPException) as raised:
+        await server.stream_upload(recording)
+
+    assert raised.value.status_code == 413
+    assert s3.client.list_multipart_uploads(Bucket=BUCKET).get("Uploads", []) == []
+    assert keys(s3) == []
+
+async def test_garbage_collection_deletes_unreferenced_blobs(db, s3):
+    kept, dropped = b"kept recording", b"dropped recording"
+    await upload(db, s3, kept)
+    await upload(db, s3, dropped)
+    await storage.release_blob(db, hashlib.sha256(dropped).hexdigest())
+    await db.blobs.update_many({"refcount": 0}, {"$set": {"released_at": datetime.now(timezone.utc) - timedelta(hours=2)}})
+
+    result = await storage.collect_garbage(db, s3, timedelta(hours=1))
+
+    assert result == {"deleted": 1, "reclaimed_bytes": len(dropped)}
+    assert keys(s3) == [s3.key(hashlib.sha256(kept).hexdigest())]
+    assert await db.blobs.count_documents({}) == 1
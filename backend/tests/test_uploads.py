@@ -0,0 +1,138 @@
+import json
+import os
+import time
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+import storage
+
+pytestmark = pytest.mark.anyio
+
+async def start_upload(api, server, data=b"recording-bytes"):
+    await server.db.interview_categories.insert_one({"id": "general", "name": "General"})
+    interview = (await api.post("/api/interviews", json={"category_id": "general"})).json()
+    session = (await api.post(
+        f"/api/interviews/{interview['id']}/uploads",
+        json={"question_id": "q1", "question_text": "Tell us about yourself", "kind": "audio"}
+    )).json()
+    base = f"/api/interviews/{interview['id']}/uploads/{session['id']}"
+    assert (await api.put(f"{base}/chunks/0", content=data)).status_code == 200
+    return base, session['id']
+
+async def test_complete_upload_creates_one_response(api, server):
+    base, upload_id = await start_upload(api, server)
+
+    first = await api.post(f"{base}/complete")
+    again = await api.post(f"{base}/complete")
+
+    assert first.status_code == 200
+    assert again.json()["response_id"] == first.json()["response_id"]
+    assert await server.db.interview_responses.count_documents({}) == 1
+    assert not server.partial_upload_path(upload_id).exists()
+
+async def test_failure_before_storing_reopens_the_session(api, server, monkeypatch):
+    base, upload_id = await start_upload(api, server)
+    store_file = storage.store_file
+
+    async def failing_store_file(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(storage, "store_file", failing_store_file)
+    with pytest.raises(OSError):
+        await api.post(f"{base}/complete")
+
+    session = await server.db.upload_sessions.find_one({"id": upload_id})
+    assert session["status"] == "open"
+    assert server.partial_upload_path(upload_id).exists()
+
+    monkeypatch.setattr(storage, "store_file", store_file)
+    assert (await api.post(f"{base}/complete")).status_code == 200
+    assert await server.db.interview_responses.count_documents({}) == 1
+
+async def test_failure_after_storing_keeps_the_blob_for_the_retry(api, server, monkeypatch):
+    base, upload_id = await start_upload(api, server)
+    insert_response = server.insert_response
+
+    async def failing_insert_response(*args):
+        raise RuntimeError("primary stepped down")
+
+    monkeypatch.setattr(server, "insert_response", failing_insert_response)
+    with pytest.raises(RuntimeError):
+        await api.post(f"{base}/complete")
+
+    session = await server.db.upload_sessions.find_one({"id": upload_id})
+    assert session["status"] == "stored"
+    # The bytes are in the blob store now, so the session no longer takes chunks
+    assert (await api.put(f"{base}/chunks/1", content=b"more")).status_code == 409
+
+    monkeypatch.setattr(server, "insert_response", insert_response)
+    response = await api.post(f"{base}/complete")
+    assert response.status_code == 200
+
+    blob = await server.db.blobs.find_one({"sha256": session["stored"]["sha256"]})
+    assert blob["refcount"] == 1
+    assert await server.db.interview_responses.count_documents({}) == 1
+
+async def test_stale_finalize_claim_can_be_taken_over(api, server):
+    base, upload_id = await start_upload(api, server)
+    await server.db.upload_sessions.update_one({"id": upload_id}, {"$set": {"status": "finalizing", "finalizing_at": datetime.now(timezone.utc)}})
+    assert (await api.post(f"{base}/complete")).status_code == 409
+
+    stale = datetime.now(timezone.utc) - timedelta(seconds=server.UPLOAD_FINALIZE_LEASE + 1)
+    await server.db.upload_sessions.update_one({"id": upload_id}, {"$set": {"finalizing_at": stale}})
+    assert (await api.post(f"{base}/complete")).status_code == 200
+
+async def test_expire_upload_sessions(api, server):
+    _, upload_id = await start_upload(api, server)
+    old = time.time() - 3 * 24 * 3600
+    os.utime(server.partial_upload_path(upload_id), (old, old))
+
+    # Recently active sessions keep their partial file, however old the file is
+    assert await storage.expire_upload_sessions(server.db, server.PARTIAL_UPLOAD_DIR, timedelta(hours=48)) == {"expired": 0, "orphaned_files": 0}
+    assert server.partial_upload_path(upload_id).exists()
+
+    orphan = server.PARTIAL_UPLOAD_DIR / "lost-session.part"
+    orphan.write_bytes(b"x")
+    os.utime(orphan, (old, old))
+
+    await server.db.upload_sessions.update_one({"id": upload_id}, {"$set": {"updated_at": datetime.now(timezone.utc) - timedelta(days=3)}})
+    result = await storage.expire_upload_sessions(server.db, server.PARTIAL_UPLOAD_DIR, timedelta(hours=48))
+
+    assert result == {"expired": 1, "orphaned_files": 1}
+    assert (await server.db.upload_sessions.find_one({"id": upload_id}))["status"] == "expired"
+    assert not server.partial_upload_path(upload_id).exists()
+    assert not orphan.exists()
+
+async def bulk_submit(api, server, manifest: list):
+    await server.db.interview_categories.insert_one({"id": "general", "name": "General"})
+    interview = (await api.post("/api/interviews", json={"category_id": "general"})).json()
+    files = {
+        "manifest": (None, json.dumps(manifest)),
+        "first": ("first.webm", b"first-recording", "audio/webm"),
+        "second": ("second.webm", b"second-recording", "audio/webm")
+    }
+    return await api.post(f"/api/interviews/{interview['id']}/responses/bulk", files=files)
+
+async def test_bulk_saves_every_answer(api, server):
+    response = await bulk_submit(api, server, [
+        {"question_id": "q1", "question_text": "One", "audio": "first"},
+        {"question_id": "q2", "question_text": "Two", "video": "second"}
+    ])
+
+    assert response.status_code == 200
+    assert len(response.json()["response_ids"]) == 2
+    assert await server.db.blobs.count_documents({"refcount": 1}) == 2
+
+@pytest.mark.parametrize("manifest", [
+    # One field for both recordings of an answer
+    [{"question_id": "q1", "question_text": "One", "video": "first", "audio": "first"}],
+    # One field shared by two answers
+    [{"question_id": "q1", "question_text": "One", "audio": "first"}, {"question_id": "q2", "question_text": "Two", "audio": "first"}]
+])
+async def test_bulk_rejects_reused_file_fields(api, server, manifest):
+    response = await bulk_submit(api, server, manifest)
+
+    assert response.status_code == 400
+    assert await server.db.interview_responses.count_documents({}) == 0
+    assert await server.db.blobs.count_documents({}) == 0
@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import video
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def pool(monkeypatch):
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(video, "available", lambda: True)
+    monkeypatch.setattr(video, "pool", executor)
+    yield executor
+    executor.shutdown()
+
+@pytest.mark.parametrize("error", [RuntimeError("cv2.error: bad frame"), video.VideoDecodeError("corrupt")])
+async def test_analysis_errors_are_swallowed(pool, monkeypatch, error):
+    def fail(path):
+        raise error
+
+    monkeypatch.setattr(video, "analyze_video_file", fail)
+    assert await video.analyze_video("answer.webm") is None
+    assert video.pool is pool
+
+async def test_broken_pool_is_replaced(pool, monkeypatch):
+    def crash(path):
+        raise BrokenProcessPool("worker died")
+
+    monkeypatch.setattr(video, "analyze_video_file", crash)
+    assert await video.analyze_video("answer.webm") is None
+    assert video.pool is None
+
+def stub_ffmpeg(tmp_path, monkeypatch, script: str):
+    ffmpeg = tmp_path / "ffmpeg"
+    ffmpeg.write_text("#!/bin/sh\n" + script + "\n")
+    ffmpeg.chmod(0o755)
+    monkeypatch.setattr(video, "FFMPEG_BINARY", str(ffmpeg))
+    recording = tmp_path / "answer.webm"
+    recording.write_bytes(b"not a webm")
+    return str(recording)
+
+def test_decode_errors_beyond_a_pipe_buffer_do_not_deadlock(tmp_path, monkeypatch):
+    # A megabyte of errors and no frames, as ffmpeg prints for a corrupt recording
+    recording = stub_ffmpeg(tmp_path, monkeypatch, "head -c 1000000 /dev/zero | tr '\\0' e >&2; exit 1")
+
+    with pytest.raises(video.VideoDecodeError, match="^eee"):
+        video.sample_video(recording)
+
+def test_hung_ffmpeg_is_killed(tmp_path, monkeypatch):
+    recording = stub_ffmpeg(tmp_path, monkeypatch, "exec sleep 30")
+    monkeypatch.setattr(video, "FFMPEG_TIMEOUT", 0.2)
+
+    started = time.monotonic()
+    with pytest.raises(video.VideoDecodeError, match="timed out"):
+        video.sample_video(recording)
+    assert time.monotonic() - started < 5
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import os
+import shutil
+import subprocess
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Optional
+
+import storage
+from analysis import FFMPEG_BINARY, FFMPEG_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Once an interview is analyzed its answers are re-encoded to a compact mono Opus track
+# (and optionally a low-bitrate video proxy) that playback and re-analysis use instead.
+# The originals keep their blob reference until TIERING_RETENTION_DAYS have passed and
+# `manage.py expire-originals` deletes or archives them.
+TIERING_ENABLED = os.environ.get('TIERING_ENABLED', 'true').lower() == 'true'
+TIERING_AUDIO_BITRATE = os.environ.get('TIERING_AUDIO_BITRATE', '24k')
+TIERING_VIDEO_PROXY = os.environ.get('TIERING_VIDEO_PROXY', 'false').lower() == 'true'
+TIERING_PROXY_HEIGHT = int(os.environ.get('TIERING_PROXY_HEIGHT', 240))
+TIERING_PROXY_BITRATE = os.environ.get('TIERING_PROXY_BITRATE', '150k')
+TIERING_RETENTION_DAYS = float(os.environ.get('TIERING_RETENTION_DAYS', 30))
+# What happens to originals after retention: delete, or archive (ARCHIVE_DIR / S3_ARCHIVE_STORAGE_CLASS)
+TIERING_ORIGINALS = os.environ.get('TIERING_ORIGINALS', 'delete')
+
+RECORDING_KINDS = ("video", "audio")
+
+class TranscodeError(Exception):
+    pass
+
+def audio_arguments() -> list:
+    # VoIP tuning favours speech intelligibility at low bitrates
+    return ['-vn', '-ac', '1', '-c:a', 'libopus', '-b:a', TIERING_AUDIO_BITRATE, '-application', 'voip']
+
+def proxy_arguments() -> list:
+    return [
+        '-vf', f"scale=-2:'min({TIERING_PROXY_HEIGHT},ih)'",
+        '-c:v', 'libvpx', '-b:v', TIERING_PROXY_BITRATE, '-deadline', 'realtime', '-cpu-used', '8',
+        '-ac', '1', '-c:a', 'libopus', '-b:a', TIERING_AUDIO_BITRATE
+    ]
+
+def transcode(source: Path, destination: Path, arguments: list):
+    ffmpeg = shutil.which(FFMPEG_BINARY)
+    if not ffmpeg:
+        raise TranscodeError("ffmpeg is not installed")
+
+    try:
+        proc = subprocess.run(
+            [ffmpeg, '-nostdin', '-v', 'error', '-y', '-i', str(source), *arguments, '-f', 'webm', str(destination)],
+            capture_output=True,
+            timeout=FFMPEG_TIMEOUT
+        )
+    except subprocess.TimeoutExpired:
+        raise TranscodeError(f"ffmpeg timed out after {FFMPEG_TIMEOUT:g}s")
+    if proc.returncode != 0:
+        raise TranscodeError(proc.stderr.decode(errors='replace').strip() or "ffmpeg failed")
+
+async def store_transcoded(db, backend, staging: Path, source: Path, arguments: list) -> dict:
+    """Transcode a local recording into the blob store, taking a reference to the result."""
+    temp_path = staging / f"{uuid.uuid4()}.tier.webm"
+    try:
+        await asyncio.to_thread(transcode, source, temp_path, arguments)
+        sha256 = await asyncio.to_thread(storage.hash_file, temp_path)
+        size = temp_path.stat().st_size
+        location = await storage.store_file(db, backend, temp_path, sha256, size)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    return {"path": location, "size": size, "sha256": sha256}
+
+async def tier_response(db, backend, staging: Path, response: dict) -> int:
+    """Re-encode one response and keep its originals until retention ends.
+
+    Returns the bytes the hot store will shed once the originals expire.
+    """
+    originals = [
+        {
+            "kind": kind,
+            "path": response[f"{kind}_path"],
+            "size": response.get(f"{kind}_size", 0),
+            "sha256": response[f"{kind}_sha256"]
+        }
+        for kind in RECORDING_KINDS
+        if response.get(f"{kind}_sha256")
+    ]
+    if not originals:
+        # Flat uploads from before the blob store are tiered once migrated
+        return 0
+
+    # Same source the analysis reads the answer's audio from
+    sources = {original['kind']: original['path'] for original in originals}
+    targets = [("audio", sources.get('audio', sources.get('video')), audio_arguments())]
+    if TIERING_VIDEO_PROXY and 'video' in sources:
+        targets.append(("video", sources['video'], proxy_arguments()))
+
+    stored = {}
+    try:
+        # Download each source once even when it feeds both outputs
+        for path in dict.fromkeys(path for _, path, _ in targets):
+            async with backend.localize(path) as local_path:
+                for kind, source, arguments in targets:
+                    if source == path:
+                        stored[kind] = await store_transcoded(db, backend, staging, local_path, arguments)
+    except BaseException:
+        for blob in stored.values():
+            await storage.release_blob(db, blob['sha256'])
+        raise
+
+    now = datetime.now(timezone.utc)
+    fields = {
+        "originals": originals,
+        "tiered_at": now,
+        "originals_expire_at": now + timedelta(days=TIERING_RETENTION_DAYS)
+    }
+    for kind, blob in stored.items():
+        fields.update({f"{kind}_path": blob['path'], f"{kind}_size": blob['size'], f"{kind}_sha256": blob['sha256']})
+
+    # The originals' references move from the path fields to `originals`
+    result = await db.interview_responses.update_one({"id": response['id'], "tiered_at": None}, {"$set": fields})
+    if not result.modified_count:
+        # Tiered concurrently by another worker
+        for blob in stored.values():
+            await storage.release_blob(db, blob['sha256'])
+        return 0
+
+    return sum(original['size'] for original in originals) - sum(blob['size'] for blob in stored.values())
+
+async def tier_interview(db, backend, staging: Path, interview_id: str, report_progress=None) -> int:
+    responses = await db.interview_responses.find(
+        {"interview_id": interview_id, "tiered_at": None},
+        {"_id": 0}
+    ).to_list(1000)
+
+    saved = 0
+    for index, response in enumerate(responses):
+        if report_progress:
+            await report_progress(index, len(responses))
+        try:
+            saved += await tier_response(db, backend, staging, response)
+        except TranscodeError as e:
+            # Left untiered rather than failing the other answers
+            logger.warning(f"Could not tier response {response['id']}: {e}")
+
+    logger.info(f"Tiered {len(responses)} responses of interview {interview_id}; {saved} bytes to reclaim after retention")
+    return saved
+
+async def enqueue_untiered(db, enqueue) -> int:
+    """Queue tiering for completed interviews whose answers were never tiered."""
+    interview_ids = await db.interview_responses.distinct(
+        "interview_id",
+        {"tiered_at": None, "$or": [{f"{kind}_sha256": {"$ne": None}} for kind in RECORDING_KINDS]}
+    )
+    queued = 0
+    async for interview in db.interviews.find({"id": {"$in": interview_ids}, "status": "completed"}, {"_id": 0, "id": 1, "user_id": 1}):
+        await enqueue(interview['id'], interview['user_id'])
+        queued += 1
+    return queued
+
+async def expire_originals(db, backend, archive: bool = False, now: Optional[datetime] = None) -> dict:
+    """Release (after archiving, if asked) originals whose retention has ended.
+
+    Originals that were never replaced (no video proxy) are removed from the response
+    too. The bytes are reclaimed by the next collect_garbage once no other response
+    shares the blob.
+    """
+    now = now or datetime.now(timezone.utc)
+    expired = 0
+    released = 0
+    async for response in db.interview_responses.find(
+        {"originals_expire_at": {"$lte": now}},
+        {"_id": 0, "id": 1, "originals": 1, "video_sha256": 1, "audio_sha256": 1}
+    ):
+        unset = {"originals": "", "originals_expire_at": ""}
+        for original in response['originals']:
+            kind = original['kind']
+            if response.get(f"{kind}_sha256") == original['sha256']:
+                unset.update({f"{kind}_path": "", f"{kind}_size": "", f"{kind}_sha256": ""})
+
+        update = {"$unset": unset}
+        if archive:
+            archived = [
+                {**original, "path": await backend.archive(original['sha256'])}
+                for original in response['originals']
+            ]
+            update["$set"] = {"archived_originals": archived}
+
+        result = await db.interview_responses.update_one({"id": response['id'], "originals_expire_at": {"$lte": now}}, update)
+        if not result.modified_count:
+            continue
+
+        for original in response['originals']:
+            await storage.release_blob(db, original['sha256'])
+            released += original['size']
+        expired += 1
+
+    logger.info(f"{'Archived' if archive else 'Released'} originals of {expired} responses ({released} bytes)")
+    return {"expired": expired, "released_bytes": released}
@@ -0,0 +1,243 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from analysis import FFMPEG_BINARY, FFMPEG_TIMEOUT
+
+try:
+    import cv2
+except ImportError:  # optional: without OpenCV only the audio track is analyzed
+    cv2 = None
+
+logger = logging.getLogger(__name__)
+
+VIDEO_ANALYSIS_ENABLED = os.environ.get('VIDEO_ANALYSIS_ENABLED', 'true').lower() == 'true'
+
+# Frames are sampled at a few fps and downscaled to grayscale by ffmpeg before detection
+VIDEO_SAMPLE_FPS = float(os.environ.get('VIDEO_SAMPLE_FPS', 5))
+FRAME_WIDTH = int(os.environ.get('VIDEO_FRAME_WIDTH', 320))
+FRAME_HEIGHT = int(os.environ.get('VIDEO_FRAME_HEIGHT', 240))
+VIDEO_BATCH_FRAMES = int(os.environ.get('VIDEO_BATCH_FRAMES', 64))
+VIDEO_ANALYSIS_PROCESSES = int(os.environ.get('VIDEO_ANALYSIS_PROCESSES', min(4, os.cpu_count() or 1)))
+
+MIN_FACE_SIZE = 48
+EYE_REGION_WIDTH = 96  # eye cascade needs ~20 px eyes; the upper face is upscaled to this width
+GAZE_AWAY_OFFSET = 0.35  # face centre displacement from its median, in face widths
+MAX_BLINK_SECONDS = 0.5  # longer eye closures are not counted as blinks
+
+class VideoDecodeError(Exception):
+    pass
+
+def available() -> bool:
+    return VIDEO_ANALYSIS_ENABLED and cv2 is not None
+
+# Per-process detector state, loaded once by the pool initializer
+face_detector = None
+eye_detector = None
+
+def load_detectors():
+    global face_detector, eye_detector
+    # Parallelism comes from the pool; one OpenCV thread per process avoids oversubscription
+    cv2.setNumThreads(1)
+    face_detector = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    eye_detector = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
+
+def largest(faces):
+    return max(faces, key=lambda face: face[2] * face[3]) if len(faces) else None
+
+def find_face(frame: np.ndarray, previous) -> Optional[tuple]:
+    # Faces barely move between samples: search around the last one before scanning the whole frame
+    if previous is not None:
+        x, y, w, h = previous
+        x0, y0 = max(x - w // 2, 0), max(y - h // 2, 0)
+        face = largest(face_detector.detectMultiScale(
+            frame[y0:y + h + h // 2, x0:x + w + w // 2],
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(int(w * 0.7), int(h * 0.7)),
+            maxSize=(int(w * 1.4), int(h * 1.4))
+        ))
+        if face is not None:
+            return face[0] + x0, face[1] + y0, face[2], face[3]
+
+    return largest(face_detector.detectMultiScale(frame, scaleFactor=1.2, minNeighbors=5, minSize=(MIN_FACE_SIZE, MIN_FACE_SIZE)))
+
+def detect_batch(frames: np.ndarray, previous=None):
+    """Detect faces and eyes in a batch of frames.
+
+    Returns per-frame face centre x/y and width (fractions of frame width) and open-eye
+    count, NaN without a face, plus the last face box to continue tracking from.
+    """
+    results = np.full((len(frames), 4), np.nan, dtype=np.float32)
+    for i, frame in enumerate(frames):
+        face = find_face(frame, previous)
+        previous = face
+        if face is None:
+            continue
+
+        x, y, w, h = face
+        # Eyes sit in the upper half of the face box; closed eyes are not detected by the cascade
+        upper = cv2.resize(frame[y:y + h // 2, x:x + w], (EYE_REGION_WIDTH, EYE_REGION_WIDTH // 2))
+        eyes = eye_detector.detectMultiScale(upper, scaleFactor=1.1, minNeighbors=3)
+        results[i] = ((x + w / 2) / FRAME_WIDTH, (y + h / 2) / FRAME_WIDTH, w / FRAME_WIDTH, min(len(eyes), 2))
+    return results, previous
+
+def sample_video(path: str) -> np.ndarray:
+    """Decode a recording at VIDEO_SAMPLE_FPS and run detection over it batch by batch.
+
+    Runs in a pool process. ffmpeg keeps decoding into the pipe while a batch is being
+    analyzed, so decoding and detection overlap.
+    """
+    ffmpeg = shutil.which(FFMPEG_BINARY)
+    if not ffmpeg:
+        raise VideoDecodeError("ffmpeg is not installed")
+
+    if not Path(path).exists():
+        raise VideoDecodeError(f"Recording not found: {path}")
+
+    scale = (
+        f"fps={VIDEO_SAMPLE_FPS},"
+        f"scale={FRAME_WIDTH}:{FRAME_HEIGHT}:force_original_aspect_ratio=decrease,"
+        f"pad={FRAME_WIDTH}:{FRAME_HEIGHT}:(ow-iw)/2:(oh-ih)/2,format=gray"
+    )
+    frame_bytes = FRAME_WIDTH * FRAME_HEIGHT
+    batches = []
+    face = None
+    timed_out = threading.Event()
+    # stderr goes to a file: a pipe only read at the end would fill up on a corrupt recording
+    # and block ffmpeg while we wait for frames
+    with tempfile.TemporaryFile() as errors:
+        proc = subprocess.Popen(
+            [ffmpeg, '-nostdin', '-v', 'error', '-i', str(path), '-an', '-vf', scale, '-f', 'rawvideo', '-'],
+            stdout=subprocess.PIPE,
+            stderr=errors
+        )
+
+        def expire():
+            timed_out.set()
+            proc.kill()
+
+        # Reads block on the pipe, so the deadline is enforced by killing ffmpeg
+        watchdog = threading.Timer(FFMPEG_TIMEOUT, expire)
+        watchdog.start()
+        try:
+            while True:
+                data = proc.stdout.read(frame_bytes * VIDEO_BATCH_FRAMES)
+                count = len(data) // frame_bytes
+                if count:
+                    frames = np.frombuffer(data, dtype=np.uint8, count=count * frame_bytes).reshape(count, FRAME_HEIGHT, FRAME_WIDTH)
+                    detections, face = detect_batch(frames, face)
+                    batches.append(detections)
+                if len(data) < frame_bytes * VIDEO_BATCH_FRAMES:
+                    break
+        finally:
+            watchdog.cancel()
+            proc.stdout.close()
+            proc.wait()
+
+        if timed_out.is_set():
+            raise VideoDecodeError(f"ffmpeg timed out after {FFMPEG_TIMEOUT:g}s")
+        if proc.returncode != 0:
+            errors.seek(0)
+            raise VideoDecodeError(errors.read().decode(errors='replace').strip() or "ffmpeg failed")
+
+    return np.concatenate(batches) if batches else np.empty((0, 4), dtype=np.float32)
+
+def summarize_video(samples: np.ndarray, fps: float = VIDEO_SAMPLE_FPS) -> Optional[dict]:
+    """Blink rate, gaze-away ratio and head-motion energy from per-frame detections."""
+    if len(samples) == 0:
+        return None
+
+    duration = len(samples) / fps
+    has_face = ~np.isnan(samples[:, 0])
+    faces = samples[has_face]
+    summary = {
+        "duration_seconds": round(duration, 2),
+        "sampled_frames": int(len(samples)),
+        "face_visible_ratio": round(float(has_face.mean()), 4)
+    }
+    if len(faces) < 2:
+        return {**summary, "gaze_away_ratio": 1.0, "blink_rate": None, "head_motion_energy": None}
+
+    # Away: no frontal face at all, or the face far from where the candidate usually sits
+    centre = np.median(faces[:, :2], axis=0)
+    face_width = np.median(faces[:, 2])
+    offset = np.hypot(*(faces[:, :2] - centre).T) / face_width
+    present = offset <= GAZE_AWAY_OFFSET
+    away = len(samples) - np.count_nonzero(present)
+
+    # A blink is a short run of eyes-not-found frames between eyes-open frames
+    closed = faces[:, 3] == 0
+    edges = np.diff(closed.astype(np.int8), prepend=0, append=0)
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    max_run = max(1, int(MAX_BLINK_SECONDS * fps))
+    interior = (starts > 0) & (ends < len(closed))
+    blinks = np.count_nonzero(interior & (ends - starts <= max_run))
+
+    # Mean squared speed of the face centre, in face widths per second, over consecutive
+    # samples that both found the face in place (jumps to a misdetection are not motion)
+    tracked = has_face.copy()
+    tracked[has_face] = present
+    pairs = tracked[1:] & tracked[:-1]
+    steps = np.diff(samples[:, :2], axis=0)[pairs] / face_width * fps
+    motion = float(np.mean(np.sum(steps ** 2, axis=1))) if len(steps) else 0.0
+
+    return {
+        **summary,
+        "gaze_away_ratio": round(float(away) / len(samples), 4),
+        "blink_rate": round(float(blinks) / (len(faces) / fps / 60), 1),
+        "head_motion_energy": round(motion, 4)
+    }
+
+def analyze_video_file(path: str) -> Optional[dict]:
+    return summarize_video(sample_video(path))
+
+pool = None
+
+def get_pool() -> ProcessPoolExecutor:
+    global pool
+    if pool is None:
+        # spawn rather than fork: the API process holds Mongo clients and threads
+        pool = ProcessPoolExecutor(
+            max_workers=VIDEO_ANALYSIS_PROCESSES,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=load_detectors
+        )
+    return pool
+
+def shutdown_pool():
+    global pool
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+        pool = None
+
+async def analyze_video(path: str) -> Optional[dict]:
+    """Visual cues for one recording, or None when video analysis is unavailable or fails."""
+    if not available():
+        return None
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(get_pool(), analyze_video_file, path)
+    except VideoDecodeError as e:
+        logger.warning(f"Could not analyze video {path}: {e}")
+        return None
+    except BrokenProcessPool:
+        # A worker died (e.g. OpenCV crashed); the pool is unusable, so start a fresh one next time
+        logger.exception(f"Video analysis pool broke on {path}")
+        shutdown_pool()
+        return None
+    except Exception:
+        # Video cues are optional: an OpenCV error or a bug must not fail the audio analysis
+        logger.exception(f"Video analysis failed for {path}")
+        return None
@@ -0,0 +1,52 @@
+"""Run analysis workers outside the API process.
+
+    python worker.py --processes 4 --concurrency 2
+
+Each process opens its own Mongo connection and runs up to --concurrency jobs at
+once, so total throughput scales with the number of processes (usually one per
+core). Set ANALYSIS_EMBEDDED_WORKERS=0 on the API nodes when running this.
+Workers also run the tiering jobs queued after each analysis (see tiering.py).
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+
+import jobs
+
+def run_process(concurrency: int):
+    # Imported here so every spawned process builds its own client and event loop
+    import server
+
+    asyncio.run(jobs.run_worker(server.db, server.process_job, concurrency))
+
+def main():
+    parser = argparse.ArgumentParser(description="Run interview analysis workers")
+    parser.add_argument('--processes', type=int, default=int(os.environ.get('ANALYSIS_WORKER_PROCESSES', os.cpu_count() or 1)))
+    parser.add_argument('--concurrency', type=int, default=jobs.WORKER_CONCURRENCY)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    # spawn rather than fork: Mongo clients must not be shared across processes
+    context = multiprocessing.get_context('spawn')
+    processes = [
+        context.Process(target=run_process, args=(args.concurrency,), name=f"analysis-worker-{i}")
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,13 @@ import { LogOut, Plus, History, BarChart3, Clock, CheckCircle } from 'lucide-rea
 import { API } from '@/App';
 import { toast } from 'sonner';
 
+const RECENT_INTERVIEWS = 20;
+
 const Dashboard = () => {
   const navigate = useNavigate();
   const [user, setUser] = useState(null);
   const [interviews, setInterviews] = useState([]);
+  const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
@@ -19,11 +22,13 @@ const Dashboard = () => {
 
   const fetchData = async () => {
     try {
-      const [userRes, interviewsRes] = await Promise.all([
+      const [userRes, statsRes, interviewsRes] = await Promise.all([
         axios.get(`${API}/auth/me`, { withCredentials: true }),
-        axios.get(`${API}/interviews`, { withCredentials: true })
+        axios.get(`${API}/stats/me`, { withCredentials: true }),
+        axios.get(`${API}/interviews`, { params: { view: 'summary', limit: RECENT_INTERVIEWS }, withCredentials: true })
       ]);
       setUser(userRes.data);
+      setStats(statsRes.data);
       setInterviews(interviewsRes.data);
     } catch (error) {
       toast.error('Failed to load data');
@@ -59,14 +64,11 @@ const Dashboard = () => {
     );
   }
 
-  const completedInterviews = interviews.filter(i => i.status === 'completed');
-  const inProgressInterviews = interviews.filter(i => i.status === 'in_progress');
-  const avgStress = completedInterviews.length > 0
-    ? (completedInterviews.reduce((sum, i) => sum + (i.overall_stress_score || 0), 0) / completedInterviews.length).toFixed(1)
-    : 0;
-  const avgConfidence = completedInterviews.length > 0
-    ? (completedInterviews.reduce((sum, i) => sum + (i.overall_confidence_score || 0), 0) / completedInterviews.length).toFixed(1)
-    : 0;
+  // Aggregates come from the server-side rollup, not from the (paginated) history
+  const totalInterviews = stats?.interview_count || 0;
+  const completedCount = stats?.completed_count || 0;
+  const avgStress = (stats?.average_stress || 0).toFixed(1);
+  const avgConfidence = (stats?.average_confidence || 0).toFixed(1);
 
   return (
     <div className="min-h-screen bg-gradient-to-br from-slate-50 via-teal-50 to-cyan-50">
@@ -114,7 +116,7 @@ const Dashboard = () => {
             <Card className="glass-card border-0 hover:shadow-xl transition-shadow" data-testid="total-interviews-card">
               <CardHeader className="pb-3">
                 <CardDescription className="text-slate-600">Total Interviews</CardDescription>
-                <CardTitle className="text-4xl font-bold text-teal-600">{interviews.length}</CardTitle>
+                <CardTitle className="text-4xl font-bold text-teal-600">{totalInterviews}</CardTitle>
               </CardHeader>
               <CardContent>
                 <div className="flex items-center text-sm text-slate-500">
@@ -127,7 +129,7 @@ const Dashboard = () => {
             <Card className="glass-card border-0 hover:shadow-xl transition-shadow" data-testid="completed-interviews-card">
               <CardHeader className="pb-3">
                 <CardDescription className="text-slate-600">Completed</CardDescription>
-                <CardTitle className="text-4xl font-bold text-green-600">{completedInterviews.length}</CardTitle>
+                <CardTitle className="text-4xl font-bold text-green-600">{completedCount}</CardTitle>
               </CardHeader>
               <CardContent>
                 <div className="flex items-center text-sm text-slate-500">
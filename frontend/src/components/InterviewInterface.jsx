@@ -8,13 +8,22 @@ import { Video, Mic, Circle, Square, AlertCircle, ArrowRight } from 'lucide-reac
 import { API } from '@/App';
 import { toast } from 'sonner';
 
+// Recorder chunks are trickled to the server while the candidate is answering
+const UPLOAD_TIMESLICE_MS = 2000;
+const MAX_CHUNK_RETRIES = 5;
+
+// Live scoring streams 16 kHz mono PCM over a WebSocket; audio is dropped, not queued, on slow links
+const LIVE_SAMPLE_RATE = 16000;
+const LIVE_MAX_BUFFERED_BYTES = 64 * 1024;
+
 const InterviewInterface = () => {
   const { interviewId } = useParams();
   const navigate = useNavigate();
   const videoRef = useRef(null);
   const mediaRecorderRef = useRef(null);
-  const chunksRef = useRef([]);
+  const uploadRef = useRef(null);
   const streamRef = useRef(null);
+  const liveRef = useRef(null);
 
   const [interview, setInterview] = useState(null);
   const [questions, setQuestions] = useState([]);
@@ -25,7 +34,7 @@ const InterviewInterface = () => {
   const [loading, setLoading] = useState(true);
   const [processing, setProcessing] = useState(false);
 
-  // Real-time metrics (simulated)
+  // Real-time metrics pushed by the live scoring socket
   const [currentStress, setCurrentStress] = useState(0);
   const [currentConfidence, setCurrentConfidence] = useState(0);
   const [responses, setResponses] = useState([]);
@@ -35,6 +44,7 @@ const InterviewInterface = () => {
     requestPermissions();
 
     return () => {
+      stopLiveScoring();
       if (streamRef.current) {
         streamRef.current.getTracks().forEach(track => track.stop());
       }
@@ -46,9 +56,6 @@ const InterviewInterface = () => {
     if (isRecording) {
       interval = setInterval(() => {
         setRecordingTime(prev => prev + 1);
-        // Simulate real-time stress and confidence updates
-        setCurrentStress(Math.random() * 100);
-        setCurrentConfidence(Math.random() * 100);
       }, 1000);
     }
     return () => clearInterval(interval);
@@ -56,17 +63,15 @@ const InterviewInterface = () => {
 
   const fetchInterviewData = async () => {
     try {
-      const [interviewRes, categoryRes] = await Promise.all([
-        axios.get(`${API}/interviews/${interviewId}`, { withCredentials: true }),
-        axios.get(`${API}/interviews/${interviewId}`, { withCredentials: true })
-      ]);
-
-      const interviewData = interviewRes.data;
-      setInterview(interviewData);
-
-      // Fetch questions for this category
-      const questionsRes = await axios.get(`${API}/questions/${interviewData.category_id}`, { withCredentials: true });
-      setQuestions(questionsRes.data);
+      // Interview, category, questions and saved answers in one round-trip
+      const res = await axios.get(`${API}/interviews/${interviewId}/bootstrap`, { withCredentials: true });
+      setInterview(res.data.interview);
+      setQuestions(res.data.questions);
+
+      // Resume at the first question that has not been answered yet
+      const answered = new Set(res.data.responses.map((response) => response.question_id));
+      const nextIndex = res.data.questions.findIndex((question) => !answered.has(question.id));
+      setCurrentQuestionIndex(nextIndex === -1 ? 0 : nextIndex);
     } catch (error) {
       toast.error('Failed to load interview');
       navigate('/dashboard');
@@ -91,30 +96,134 @@ const InterviewInterface = () => {
     }
   };
 
+  const uploadUrl = (uploadId) => `${API}/interviews/${interviewId}/uploads/${uploadId}`;
+
+  const sendPendingChunks = async (upload) => {
+    let failures = 0;
+    while (upload.pending.length > 0) {
+      const { index, blob } = upload.pending[0];
+      try {
+        const res = await axios.put(`${uploadUrl(upload.id)}/chunks/${index}`, blob, {
+          withCredentials: true,
+          headers: { 'Content-Type': 'application/octet-stream' }
+        });
+        upload.pending = upload.pending.filter((chunk) => chunk.index >= res.data.next_chunk);
+        failures = 0;
+      } catch (error) {
+        failures += 1;
+        if (failures > MAX_CHUNK_RETRIES) {
+          throw error;
+        }
+        await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** failures));
+
+        // Resume from the last chunk the server acknowledged
+        try {
+          const res = await axios.get(uploadUrl(upload.id), { withCredentials: true });
+          upload.pending = upload.pending.filter((chunk) => chunk.index >= res.data.next_chunk);
+        } catch (statusError) {
+          // Retry the same chunk on the next iteration
+        }
+      }
+    }
+  };
+
+  const scheduleUpload = (upload) => {
+    upload.chain = upload.chain.catch(() => {}).then(() => sendPendingChunks(upload));
+    return upload.chain;
+  };
+
+  const startLiveScoring = () => {
+    const socket = new WebSocket(`${API.replace(/^http/, 'ws')}/interviews/${interviewId}/live`);
+    socket.binaryType = 'arraybuffer';
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type === 'score') {
+        setCurrentStress(message.stress_score);
+        setCurrentConfidence(message.confidence_score);
+      }
+    };
+
+    // The browser resamples the microphone to 16 kHz; each callback becomes one s16le message
+    const audioContext = new AudioContext({ sampleRate: LIVE_SAMPLE_RATE });
+    const source = audioContext.createMediaStreamSource(streamRef.current);
+    const processor = audioContext.createScriptProcessor(4096, 1, 1);
+    processor.onaudioprocess = (event) => {
+      if (socket.readyState !== WebSocket.OPEN || socket.bufferedAmount > LIVE_MAX_BUFFERED_BYTES) {
+        return;
+      }
+      const input = event.inputBuffer.getChannelData(0);
+      const pcm = new Int16Array(input.length);
+      for (let i = 0; i < input.length; i++) {
+        pcm[i] = Math.max(-1, Math.min(1, input[i])) * 0x7fff;
+      }
+      socket.send(pcm.buffer);
+    };
+    source.connect(processor);
+    processor.connect(audioContext.destination);
+
+    liveRef.current = { socket, audioContext };
+  };
+
+  const stopLiveScoring = () => {
+    if (!liveRef.current) {
+      return;
+    }
+    liveRef.current.socket.close();
+    liveRef.current.audioContext.close();
+    liveRef.current = null;
+  };
+
   const startRecording = async () => {
     if (!streamRef.current) {
       toast.error('Please grant camera and microphone permissions');
       return;
     }
 
-    chunksRef.current = [];
+    try {
+      const res = await axios.post(
+        `${API}/interviews/${interviewId}/uploads`,
+        {
+          question_id: questions[currentQuestionIndex].id,
+          question_text: questions[currentQuestionIndex].text,
+          kind: 'video'
+        },
+        { withCredentials: true }
+      );
+      uploadRef.current = { id: res.data.id, nextIndex: 0, pending: [], chain: Promise.resolve() };
+    } catch (error) {
+      toast.error('Failed to start recording');
+      return;
+    }
+
+    const upload = uploadRef.current;
     const mediaRecorder = new MediaRecorder(streamRef.current, {
       mimeType: 'video/webm;codecs=vp8,opus'
     });
 
     mediaRecorder.ondataavailable = (event) => {
       if (event.data.size > 0) {
-        chunksRef.current.push(event.data);
+        upload.pending.push({ index: upload.nextIndex, blob: event.data });
+        upload.nextIndex += 1;
+        scheduleUpload(upload);
       }
     };
 
     mediaRecorderRef.current = mediaRecorder;
-    mediaRecorder.start();
+    mediaRecorder.start(UPLOAD_TIMESLICE_MS);
+
+    // Live scores are best-effort; the recording itself does not depend on them
+    try {
+      startLiveScoring();
+    } catch (error) {
+      console.warn('Live scoring unavailable:', error?.message || error);
+    }
+
     setIsRecording(true);
     setRecordingTime(0);
   };
 
   const stopRecording = async () => {
+    stopLiveScoring();
     return new Promise((resolve) => {
       if (!mediaRecorderRef.current) {
         resolve();
@@ -122,8 +231,7 @@ const InterviewInterface = () => {
       }
 
       mediaRecorderRef.current.onstop = () => {
-        const blob = new Blob(chunksRef.current, { type: 'video/webm' });
-        resolve(blob);
+        resolve();
       };
 
       mediaRecorderRef.current.stop();
@@ -138,23 +246,13 @@ const InterviewInterface = () => {
     }
 
     setProcessing(true);
-    const videoBlob = await stopRecording();
+    await stopRecording();
 
-    // Save response
+    // Save response: only the tail of the recording is still in flight
     try {
-      const formData = new FormData();
-      formData.append('question_id', questions[currentQuestionIndex].id);
-      formData.append('question_text', questions[currentQuestionIndex].text);
-      formData.append('video', videoBlob, 'response.webm');
-
-      await axios.post(
-        `${API}/interviews/${interviewId}/responses`,
-        formData,
-        {
-          withCredentials: true,
-          headers: { 'Content-Type': 'multipart/form-data' }
-        }
-      );
+      const upload = uploadRef.current;
+      await scheduleUpload(upload);
+      await axios.post(`${uploadUrl(upload.id)}/complete`, {}, { withCredentials: true });
 
       // Store response metrics
       const newResponse = {
@@ -8,6 +8,10 @@ import { ArrowLeft, Home, TrendingUp, TrendingDown, BarChart3 } from 'lucide-rea
 import { API } from '@/App';
 import { toast } from 'sonner';
 
+const ANALYSIS_POLL_MS = 2000;
+// Stop polling after this long; a job still queued by then usually means no analysis worker is running
+const ANALYSIS_MAX_WAIT_MS = 10 * 60 * 1000;
+
 const ResultsDashboard = () => {
   const { interviewId } = useParams();
   const navigate = useNavigate();
@@ -20,8 +24,34 @@ const ResultsDashboard = () => {
     fetchResults();
   }, []);
 
+  // Analysis runs on a background worker; wait for it before loading results
+  const waitForAnalysis = async () => {
+    const deadline = Date.now() + ANALYSIS_MAX_WAIT_MS;
+    for (;;) {
+      const res = await axios.get(`${API}/interviews/${interviewId}/analysis/status`, { withCredentials: true });
+      if (res.data.status === 'completed') {
+        return;
+      }
+      if (res.data.status === 'failed') {
+        throw new Error(res.data.last_error || 'Analysis failed');
+      }
+      if (Date.now() >= deadline) {
+        const error = new Error(
+          res.data.status === 'queued'
+            ? 'Analysis is still queued; the analysis worker may not be running. Check back later.'
+            : 'Analysis is taking longer than expected. Check back later.'
+        );
+        error.pending = true;
+        throw error;
+      }
+      await new Promise((resolve) => setTimeout(resolve, ANALYSIS_POLL_MS));
+    }
+  };
+
   const fetchResults = async () => {
     try {
+      await waitForAnalysis();
+
       const [interviewRes, analysisRes, responsesRes] = await Promise.all([
         axios.get(`${API}/interviews/${interviewId}`, { withCredentials: true }),
         axios.get(`${API}/interviews/${interviewId}/analysis`, { withCredentials: true }),
@@ -32,7 +62,7 @@ const ResultsDashboard = () => {
       setAnalysis(analysisRes.data);
       setResponses(responsesRes.data);
     } catch (error) {
-      toast.error('Failed to load results');
+      toast.error(error.pending ? error.message : 'Failed to load results');
       navigate('/dashboard');
     } finally {
       setLoading(false);
@@ -246,6 +276,18 @@ const ResultsDashboard = () => {
                       </div>
                     </div>
 
+                    {/* Server-scored answers can be played back; the browser seeks with Range requests */}
+                    {response.response_id && (
+                      <video
+                        controls
+                        preload="metadata"
+                        crossOrigin="use-credentials"
+                        src={`${API}/responses/${response.response_id}/media`}
+                        data-testid={`response-playback-${index}`}
+                        className="w-full rounded-lg bg-slate-900"
+                      />
+                    )}
+
                     <div className="grid md:grid-cols-2 gap-4">
                       <div className="space-y-2">
                         <div className="flex justify-between text-sm">